@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+根据准星周围的背景自动选择对比色
+
+红色准星在红色、棕色的地图上几乎看不见。自适应模式下覆盖层以较低的频率截取
+准星周围的一小块屏幕区域，只统计准星范围之外的一圈像素的平均颜色，再从调色板
+中选出和背景对比最明显的颜色。
+
+调色板对背景的选择结果预先按 (亮度, 色相) 分档计算成查找表，每次采样只需要
+一次求平均和一次查表。像素数超过 MAX_SAMPLES 时按固定间隔抽样，单次采样的
+开销有上限。
+
+不依赖 Qt，像素数据为 32 位的 BGRA 字节（QImage.Format_RGB32 / ARGB32 在小端
+机器上的内存布局）。
+"""
+
+import math
+import colorsys
+from functools import lru_cache
+
+
+# 自适应颜色模式：off 使用配置中的颜色，contrast 根据背景选择对比色
+ADAPTIVE_MODES = ["off", "contrast"]
+
+# 默认的采样间隔（毫秒）和准星范围之外的采样宽度（逻辑像素）
+DEFAULT_INTERVAL_MS = 250
+DEFAULT_RADIUS = 12
+
+# 可选的对比色，配置中的颜色总是排在第一位
+DEFAULT_PALETTE = ("#FF0000", "#00FF00", "#00FFFF", "#FF00FF", "#FFFF00", "#FFFFFF", "#000000")
+
+# 每次采样最多统计的像素数
+MAX_SAMPLES = 4096
+
+# 查找表的分档：亮度 8 档，色相 12 档（每档 30 度），饱和度低于阈值的背景归为灰色档
+LIGHTNESS_BINS = 8
+HUE_BINS = 12
+GRAY_SATURATION = 0.25
+
+# 配置中的颜色和背景的对比分数不低于该值时保持不变
+KEEP_SCORE = 0.4
+
+# 连续多少次采样选中同一个新颜色后才切换，避免在分档边界上闪烁
+CONFIRM_SAMPLES = 2
+
+_LINEAR = [c / 255 / 12.92 if c <= 10 else ((c / 255 + 0.055) / 1.055) ** 2.4 for c in range(256)]
+
+
+def hex_rgb(color):
+    """"#RRGGBB" / "#RGB" 转换为 (r, g, b)，无法解析时返回 None"""
+    if not isinstance(color, str) or not color.startswith("#"):
+        return None
+    digits = color[1:]
+    if len(digits) == 3:
+        digits = "".join(c * 2 for c in digits)
+    elif len(digits) == 8:
+        digits = digits[2:]  # #AARRGGBB
+    if len(digits) != 6:
+        return None
+    try:
+        value = int(digits, 16)
+    except ValueError:
+        return None
+    return (value >> 16 & 0xFF, value >> 8 & 0xFF, value & 0xFF)
+
+
+def luminance(rgb):
+    """相对亮度（0~1）"""
+    r, g, b = (_LINEAR[min(255, max(0, int(round(c))))] for c in rgb)
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def describe(rgb):
+    """(相对亮度, 色相角度, 饱和度)"""
+    h, s, _ = colorsys.rgb_to_hsv(*(c / 255 for c in rgb))
+    return luminance(rgb), h * 360.0, s
+
+
+def contrast_score(color, background):
+    """两种颜色 (亮度, 色相, 饱和度) 的对比分数，大约在 0~1.5 之间
+
+    亮度对比按 WCAG 对比度的对数计，色度差按色相环上两点的距离计。
+    """
+    l1, h1, s1 = color
+    l2, h2, s2 = background
+    ratio = (max(l1, l2) + 0.05) / (min(l1, l2) + 0.05)
+    a1, a2 = math.radians(h1), math.radians(h2)
+    chroma = math.hypot(s1 * math.cos(a1) - s2 * math.cos(a2), s1 * math.sin(a1) - s2 * math.sin(a2)) / 2
+    return math.log(ratio) / math.log(21) + 0.5 * chroma
+
+
+def background_bin(rgb):
+    """背景颜色所在的 (亮度档, 色相档)，灰色的色相档为 HUE_BINS"""
+    lum, hue, saturation = describe(rgb)
+    lightness = lum ** (1 / 2.2)
+    lightness_bin = min(LIGHTNESS_BINS - 1, int(lightness * LIGHTNESS_BINS))
+    hue_bin = HUE_BINS if saturation < GRAY_SATURATION else int(hue / 360.0 * HUE_BINS) % HUE_BINS
+    return lightness_bin, hue_bin
+
+
+def _bin_background(lightness_bin, hue_bin):
+    """分档的代表颜色 (亮度, 色相, 饱和度)"""
+    lum = ((lightness_bin + 0.5) / LIGHTNESS_BINS) ** 2.2
+    if hue_bin == HUE_BINS:
+        return lum, 0.0, 0.0
+    return lum, (hue_bin + 0.5) * 360.0 / HUE_BINS, 0.6
+
+
+@lru_cache(maxsize=32)
+def contrast_table(base_color, palette=DEFAULT_PALETTE):
+    """预先计算每个背景分档应当使用的颜色，返回 {(亮度档, 色相档): 颜色}"""
+    candidates = [base_color] + [c for c in palette if c.upper() != base_color.upper()]
+    described = [(c, describe(hex_rgb(c))) for c in candidates if hex_rgb(c) is not None]
+    table = {}
+    for lightness_bin in range(LIGHTNESS_BINS):
+        for hue_bin in range(HUE_BINS + 1):
+            background = _bin_background(lightness_bin, hue_bin)
+            if described and described[0][0] == base_color and \
+                    contrast_score(described[0][1], background) >= KEEP_SCORE:
+                table[lightness_bin, hue_bin] = base_color
+                continue
+            table[lightness_bin, hue_bin] = max(described, key=lambda item: contrast_score(item[1], background))[0]
+    return table
+
+
+def band_mean(data, width, height, stride, inner, max_samples=MAX_SAMPLES):
+    """统计图像中心边长 2 * inner + 1 的方块之外的像素平均颜色 (r, g, b)
+
+    data 为 BGRA 字节，没有可统计的像素时返回 None。像素较多时按相同的行、列
+    间隔抽样，最多统计大约 max_samples 个像素。
+    """
+    cx, cy = width // 2, height // 2
+    left, right = max(0, cx - inner), min(width, cx + inner + 1)
+    top, bottom = max(0, cy - inner), min(height, cy + inner + 1)
+    band = width * height - max(0, right - left) * max(0, bottom - top)
+    if band <= 0:
+        return None
+    step = max(1, math.ceil(math.sqrt(band / max_samples)))
+    pixel_step = step * 4
+    right = -(-right // step) * step  # 右侧从抽样网格上的列开始
+
+    spans = []
+    for y in range(0, height, step):
+        row = y * stride
+        if top <= y < bottom:
+            if left > 0:
+                spans.append((row, row + left * 4))
+            if right < width:
+                spans.append((row + right * 4, row + width * 4))
+        else:
+            spans.append((row, row + width * 4))
+
+    blue = green = red = count = 0
+    for start, end in spans:
+        chunk = data[start:end]
+        blue += sum(chunk[0::pixel_step])
+        green += sum(chunk[1::pixel_step])
+        red += sum(chunk[2::pixel_step])
+        count += (end - start + pixel_step - 4) // pixel_step
+    if not count:
+        return None
+    return (red / count, green / count, blue / count)
+
+
+class ContrastPicker:
+    """根据采样到的背景颜色选择准星颜色，带有防闪烁的确认次数"""
+
+    def __init__(self, base_color, palette=DEFAULT_PALETTE, confirm=CONFIRM_SAMPLES):
+        self.base_color = base_color
+        self.table = contrast_table(base_color, tuple(palette))
+        self.confirm = confirm
+        self.color = base_color
+        self._candidate = None
+        self._votes = 0
+        self.switches = 0
+
+    @property
+    def colors(self):
+        """可能选中的所有颜色"""
+        return sorted(set(self.table.values()))
+
+    def choose(self, rgb):
+        """背景颜色对应的调色板颜色（不考虑确认次数）"""
+        return self.table[background_bin(rgb)]
+
+    def update(self, rgb):
+        """记录一次采样结果，返回当前应当使用的颜色"""
+        if rgb is None:
+            return self.color
+        target = self.choose(rgb)
+        if target == self.color:
+            self._candidate = None
+            self._votes = 0
+            return self.color
+        if target != self._candidate:
+            self._candidate = target
+            self._votes = 0
+        self._votes += 1
+        if self._votes >= self.confirm:
+            self.color = target
+            self._candidate = None
+            self._votes = 0
+            self.switches += 1
+        return self.color
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+画面导出吞吐量基准测试
+
+测试内容:
+1. 写入端：覆盖层每次绘制时导出一帧（every 模式）的耗时和最大帧率
+2. 读取端：读取最新一帧（拷贝像素）的耗时和带宽
+3. 跨进程：写入端以固定频率导出动画准星时，另一个进程读取到的帧数、
+   丢弃的帧数、撕裂读取次数和不一致的帧（应为 0）
+
+示例:
+    python bench_frame_export.py
+    python bench_frame_export.py --size 512 --hz 144 --duration 5
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from frame_export import FrameExportWriter, FrameExportReader, ring_path
+
+
+# 使用 spawn 启动读取进程，避免在 Qt 初始化之后 fork
+_spawn = multiprocessing.get_context("spawn")
+
+
+BENCH_CONFIG = {
+    "size": 40,
+    "color": "#FF0000",
+    "shape": "hollow_cross_dot",
+    "thickness": 2,
+    "opacity": 0.8,
+    "hollow_gap": 8,
+    "position": {"x": "center", "y": "center"},
+    "power_profile": "performance",
+    "animation": "rotate",
+    "animation_frames": 60,
+}
+
+
+def create_overlay(app, name, size, mode):
+    """创建导出画面的覆盖层，等待动画图集构建完成"""
+    from overlay_window_pyside6 import OverlayWindow
+
+    overlay = OverlayWindow(dict(BENCH_CONFIG))
+    overlay.showFullScreen()
+    overlay.set_frame_export(name, mode, size)
+    deadline = time.perf_counter() + 5
+    while overlay.current_atlas is None and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    return overlay
+
+
+def bench_writer(app, name, size, count):
+    """覆盖层局部重绘并导出的耗时，和只重绘不导出比较"""
+    from PySide6.QtCore import QRect
+
+    overlay = create_overlay(app, name, size, "every")
+    x, y = overlay.crosshair_center()
+    rect = QRect(x - 64, y - 64, 129, 129)
+
+    start = time.perf_counter()
+    for _ in range(count):
+        overlay.repaint(rect)
+    exporting = time.perf_counter() - start
+    frames = overlay.frame_export.frame
+
+    overlay.set_frame_export(None)
+    start = time.perf_counter()
+    for _ in range(count):
+        overlay.repaint(rect)
+    plain = time.perf_counter() - start
+    overlay.close()
+    return {
+        "size": size,
+        "frames": frames,
+        "us_per_paint_with_export": exporting / count * 1e6,
+        "us_per_paint_without_export": plain / count * 1e6,
+        "us_per_export": (exporting - plain) / count * 1e6,
+        "max_export_fps": count / exporting,
+    }
+
+
+def bench_reader(name, size, count):
+    """读取最新帧（拷贝像素）的耗时"""
+    writer = FrameExportWriter(name, size, size)
+    reader = FrameExportReader(name)
+    start = time.perf_counter()
+    for i in range(count):
+        pixels = writer.begin_frame()
+        pixels[0] = i & 0xFF
+        pixels.release()
+        writer.commit_frame()
+        reader.read_latest()
+    elapsed = time.perf_counter() - start
+    frame_bytes = writer.stride * writer.height
+    writer.close()
+    reader.close()
+    return {
+        "frames": count,
+        "us_per_frame_read": elapsed / count * 1e6,
+        "mb_per_second": frame_bytes * count / elapsed / (1024 * 1024),
+    }
+
+
+def _reader_process(name, duration, queue):
+    """跨进程读取端：检查每一帧的槽位头和像素是否属于同一帧"""
+    reader = FrameExportReader(name)
+    reader.read_latest()  # 跳过已有的帧
+    inconsistent = 0
+    latencies = []
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        frame = reader.read_latest()
+        if frame is None:
+            time.sleep(0.0002)
+            continue
+        latencies.append(time.time() - frame.timestamp)
+        # 写入端把帧序号写在最后一个像素中
+        if int.from_bytes(frame.pixels[-4:], "little") != frame.number & 0xFFFFFFFF:
+            inconsistent += 1
+    reader.close()
+    latencies.sort()
+    queue.put({
+        "frames_read": reader.frames_read,
+        "frames_dropped": reader.frames_dropped,
+        "torn_reads": reader.torn_reads,
+        "inconsistent": inconsistent,
+        "latency_ms_p50": latencies[len(latencies) // 2] * 1000 if latencies else None,
+        "latency_ms_max": latencies[-1] * 1000 if latencies else None,
+    })
+
+
+def bench_cross_process(app, name, size, hz, duration):
+    """覆盖层以固定频率导出，另一个进程读取"""
+    overlay = create_overlay(app, name, size, "every")
+    writer = overlay.frame_export
+    commit_frame = writer.commit_frame
+
+    def commit_with_number(x=0, y=0):
+        """发布前在槽位的最后一个像素中记下帧序号，供读取端检查一致性"""
+        offset = writer.slot_offset(writer.slot) + 32 + writer.stride * writer.height - 4
+        writer.buffer[offset:offset + 4] = (writer.frame & 0xFFFFFFFF).to_bytes(4, "little")
+        commit_frame(x, y)
+
+    writer.commit_frame = commit_with_number
+
+    queue = _spawn.Queue()
+    process = _spawn.Process(target=_reader_process, args=(name, duration, queue))
+    process.start()
+    time.sleep(0.5)  # 等待读取进程启动
+
+    interval = 1.0 / hz
+    start = time.perf_counter()
+    next_time = start
+    written = 0
+    while process.is_alive():
+        overlay.repaint()
+        written += 1
+        next_time += interval
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    elapsed = time.perf_counter() - start
+    process.join()
+    overlay.close()
+
+    result = queue.get()
+    result.update({"target_hz": hz, "frames_written": written, "write_fps": written / elapsed})
+    return result
+
+
+def main(argv=None):
+    """主函数"""
+    parser = argparse.ArgumentParser(description="画面导出吞吐量基准测试")
+    parser.add_argument("--name", default=f"bench-{os.getpid()}")
+    parser.add_argument("--size", type=int, default=256, help="导出区域边长（物理像素）")
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--hz", type=float, default=240.0, help="跨进程测试的导出频率")
+    parser.add_argument("--duration", type=float, default=2.0)
+    options = parser.parse_args(argv)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])
+
+    report = {
+        "writer": bench_writer(app, options.name, options.size, options.count),
+        "reader": bench_reader(options.name, options.size, options.count),
+        "cross_process": bench_cross_process(app, options.name, options.size, options.hz, options.duration),
+    }
+
+    print(json.dumps(report, indent=2))
+    if sys.platform != "win32" and os.path.exists(ring_path(options.name)):
+        os.remove(ring_path(options.name))
+    return 0 if report["cross_process"]["inconsistent"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+实时参数块吞吐量基准测试
+
+测试内容:
+1. 写入端单次写入耗时和最大写入频率
+2. 读取端轮询耗时（无变化 / 有变化）
+3. 跨进程高频写入时读取端看到的更新数、撕裂读取次数和不一致数据（应为 0）
+4. --overlay: 在覆盖层中以指定频率写入，统计每秒实际应用到画面的更新数
+
+示例:
+    python bench_live_params.py
+    python bench_live_params.py --overlay --hz 240 --duration 5
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from live_params import LiveParamsWriter, LiveParamsReader, block_path
+
+
+# 使用 spawn 启动写入进程，避免在 Qt 初始化之后 fork
+_spawn = multiprocessing.get_context("spawn")
+
+
+def bench_writer(name, count):
+    """写入端耗时"""
+    writer = LiveParamsWriter(name)
+    start = time.perf_counter()
+    for i in range(count):
+        writer.write(size=i & 0xFF, hollow_gap=i & 0x3F)
+    elapsed = time.perf_counter() - start
+    writer.close()
+    return {"writes": count, "ns_per_write": elapsed / count * 1e9, "max_hz": count / elapsed}
+
+
+def bench_reader(name, count):
+    """读取端轮询耗时"""
+    writer = LiveParamsWriter(name)
+    reader = LiveParamsReader(name)
+    writer.write(size=20)
+    reader.poll()
+
+    start = time.perf_counter()
+    for _ in range(count):
+        reader.poll()
+    unchanged = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(count):
+        writer.write(size=i & 0xFF)
+        reader.poll()
+    changed = time.perf_counter() - start
+
+    writer.close()
+    reader.close()
+    return {
+        "polls": count,
+        "ns_per_poll_unchanged": unchanged / count * 1e9,
+        "ns_per_write_and_poll": changed / count * 1e9,
+    }
+
+
+def _writer_process(name, hz, duration):
+    """跨进程写入端：所有字段写入相同的值，便于读取端检查一致性"""
+    writer = LiveParamsWriter(name)
+    interval = 1.0 / hz if hz else 0.0
+    start = time.perf_counter()
+    next_time = start
+    i = 0
+    while time.perf_counter() - start < duration:
+        i += 1
+        value = i & 0x7FFF
+        writer.write(size=value, hollow_gap=value, thickness=value, hollow_length=value)
+        if interval:
+            next_time += interval
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    writer.close()
+
+
+def bench_cross_process(name, hz, duration):
+    """跨进程一致性和吞吐量"""
+    reader = LiveParamsReader(name)
+    reader.poll()  # 跳过之前测试留下的数据
+    process = _spawn.Process(target=_writer_process, args=(name, hz, duration))
+    process.start()
+
+    updates = 0
+    inconsistent = 0
+    polls = 0
+    start = time.perf_counter()
+    while process.is_alive():
+        polls += 1
+        result = reader.poll()
+        if result is not None:
+            updates += 1
+            values = result[1]
+            if not (values[0] == values[1] == values[2] == values[3]):
+                inconsistent += 1
+    elapsed = time.perf_counter() - start
+    process.join()
+    reader.close()
+    return {
+        "target_hz": hz or "unlimited",
+        "updates_seen": updates,
+        "updates_per_second": updates / elapsed,
+        "polls": polls,
+        "torn_reads_retried": reader.torn_reads,
+        "inconsistent": inconsistent,
+    }
+
+
+def bench_overlay(app, name, hz, duration):
+    """覆盖层每帧轮询时实际应用的更新数"""
+    from overlay_window_pyside6 import OverlayWindow
+
+    config = {
+        "size": 20,
+        "color": "#FF0000",
+        "shape": "hollow_cross",
+        "thickness": 2,
+        "opacity": 0.8,
+        "position": {"x": "center", "y": "center"},
+        "power_profile": "performance",
+        "live_params": name,
+    }
+    overlay = OverlayWindow(config)
+    overlay.showFullScreen()
+
+    process = _spawn.Process(target=_writer_process, args=(name, hz, duration))
+    process.start()
+    start = time.perf_counter()
+    while process.is_alive():
+        app.processEvents()
+        time.sleep(0.0005)
+    elapsed = time.perf_counter() - start
+    process.join()
+
+    result = {
+        "target_hz": hz,
+        "display_rate": overlay.governor.display_rate,
+        "applied_updates": overlay.live_update_count,
+        "applied_per_second": overlay.live_update_count / elapsed,
+        "governor": overlay.governor_stats(),
+    }
+    overlay.close()
+    return result
+
+
+def main(argv=None):
+    """主函数"""
+    parser = argparse.ArgumentParser(description="实时参数块吞吐量基准测试")
+    parser.add_argument("--name", default=f"bench-{os.getpid()}")
+    parser.add_argument("--count", type=int, default=200000)
+    parser.add_argument("--hz", type=float, default=0, help="跨进程写入频率，0 表示不限速")
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument("--overlay", action="store_true", help="同时测试覆盖层每帧轮询")
+    options = parser.parse_args(argv)
+
+    report = {
+        "writer": bench_writer(options.name, options.count),
+        "reader": bench_reader(options.name, options.count),
+        "cross_process": bench_cross_process(options.name, options.hz, options.duration),
+    }
+    if options.overlay:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PySide6.QtWidgets import QApplication
+        app = QApplication(sys.argv)
+        report["overlay"] = bench_overlay(app, options.name, options.hz or 240, options.duration)
+
+    print(json.dumps(report, indent=2))
+    if sys.platform != "win32" and os.path.exists(block_path(options.name)):
+        os.remove(block_path(options.name))
+    return 0 if report["cross_process"]["inconsistent"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+放大镜每帧开销基准测试
+
+测试内容:
+1. 放大镜关闭时每帧（帧时钟 + 局部重绘）的耗时和 CPU 时间，作为基线
+2. 放大镜开启、背景每帧变化时的耗时、CPU 时间和截取到绘制完成的延迟
+3. 放大镜开启、背景不变时（只截取和比较，不缩放不重绘）的耗时
+
+示例:
+    python bench_scope.py
+    python bench_scope.py --zoom 4 --size 240 --frames 2000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+BENCH_CONFIG = {
+    "size": 20,
+    "color": "#FF0000",
+    "shape": "cross",
+    "thickness": 2,
+    "opacity": 0.8,
+    "position": {"x": "center", "y": "center"},
+    "power_profile": "performance",
+}
+
+
+def run_frames(app, overlay, background, frames, changing):
+    """驱动 frames 帧，返回每帧的平均耗时和 CPU 时间（毫秒）"""
+    from PySide6.QtGui import QColor
+
+    x, y = overlay.crosshair_center()
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    for i in range(frames):
+        if changing:
+            background.setStyleSheet(f"background: {QColor.fromHsv(i * 7 % 360, 200, 200).name()};")
+            background.repaint()
+        overlay.on_frame_tick()
+        overlay.repaint(x - 32, y - 32, 65, 65)
+        if overlay.scope is not None:
+            overlay.repaint(overlay.scope.rect((x, y)))
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    return {
+        "frames": frames,
+        "ms_per_frame": round(elapsed / frames * 1000, 4),
+        "cpu_ms_per_frame": round(cpu / frames * 1000, 4),
+    }
+
+
+def main(argv=None):
+    """主函数"""
+    parser = argparse.ArgumentParser(description="放大镜每帧开销基准测试")
+    parser.add_argument("--zoom", type=int, default=3)
+    parser.add_argument("--size", type=int, default=160, help="放大镜显示边长（逻辑像素）")
+    parser.add_argument("--frames", type=int, default=1000)
+    options = parser.parse_args(argv)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication, QWidget
+    from overlay_window_pyside6 import OverlayWindow
+
+    app = QApplication(sys.argv[:1])
+    overlay = OverlayWindow(dict(BENCH_CONFIG))
+    overlay.showFullScreen()
+    background = QWidget()
+    background.setGeometry(QApplication.primaryScreen().geometry())
+    background.setStyleSheet("background: #406080;")
+    background.show()
+    app.processEvents()
+
+    report = {}
+    report["scope_off"] = run_frames(app, overlay, background, options.frames, changing=True)
+    scope_config = dict(BENCH_CONFIG, scope="on", scope_zoom=options.zoom, scope_size=options.size)
+    overlay.updateConfig(dict(scope_config))
+    report["scope_on_changing"] = run_frames(app, overlay, background, options.frames, changing=True)
+    report["scope_on_changing"]["scope"] = overlay.scope_stats()
+    # 关闭再开启，重新统计
+    overlay.updateConfig(dict(BENCH_CONFIG))
+    overlay.updateConfig(dict(scope_config))
+    report["scope_on_static"] = run_frames(app, overlay, background, options.frames, changing=False)
+    report["scope_on_static"]["scope"] = overlay.scope_stats()
+    report["added_ms_per_frame"] = round(
+        report["scope_on_changing"]["ms_per_frame"] - report["scope_off"]["ms_per_frame"], 4)
+
+    overlay.close()
+    background.close()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+长时间运行的内存和句柄增长测试（soak）
+
+模拟长时间游戏会话：反复绘制（覆盖层重绘和每种形状的矢量绘制）、切换拖动模式、
+切换预设和修改配置。每完成一段工作采样一次常驻内存、句柄数、Python 对象数和
+tracemalloc 的已分配内存，最后和第一次采样（预热之后）比较，超出预算时返回 1，
+并列出 tracemalloc 中增长最多的分配位置。
+
+示例:
+    python bench_soak.py                                  # 100 万次绘制，约几分钟
+    python bench_soak.py --paints 20000 --toggles 200 --presets 200 --updates 2000
+    python bench_soak.py --no-tracemalloc --max-rss-mb-growth 10
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from resource_usage import rss_mb, handle_count
+
+
+# 默认预算：预热之后到结束时允许的增长
+DEFAULT_BUDGETS = {
+    "rss_mb": 32.0,
+    "handles": 16,
+    "objects": 5000,
+    "traced_mb": 4.0,
+}
+
+# 轮流切换的预设，覆盖静态、空心和动画准星
+SOAK_PRESETS = {
+    "cross": {"shape": "cross", "size": 20, "color": "#FF0000"},
+    "hollow": {"shape": "hollow_cross_dot", "hollow_gap": 8, "hollow_length": 30, "color": "#00FF00"},
+    "circle": {"shape": "circle", "size": 12, "opacity": 0.6, "color": "#FFFFFF"},
+    "pulse": {"shape": "hollow_square", "size": 24, "animation": "pulse", "animation_frames": 12},
+}
+
+
+def take_sample(step, started, trace):
+    """采样一次资源占用"""
+    gc.collect()
+    sample = {
+        "step": step,
+        "elapsed_s": round(time.perf_counter() - started, 2),
+        "rss_mb": rss_mb(),
+        "handles": handle_count(),
+        "objects": len(gc.get_objects()),
+        "traced_mb": tracemalloc.get_traced_memory()[0] / (1024 * 1024) if trace else None,
+    }
+    return sample
+
+
+def check_growth(baseline, final, budgets):
+    """比较第一次和最后一次采样，返回 {指标: {growth, limit, pass}}"""
+    checks = {}
+    for key, limit in budgets.items():
+        if baseline.get(key) is None or final.get(key) is None:
+            checks[key] = {"growth": None, "limit": limit, "pass": None}
+            continue
+        growth = final[key] - baseline[key]
+        checks[key] = {"growth": round(growth, 3), "limit": limit, "pass": growth <= limit}
+    return checks
+
+
+class SoakDriver:
+    """在守护模式控制器上执行各类操作"""
+
+    def __init__(self):
+        from PySide6.QtCore import Qt, QRect
+        from PySide6.QtGui import QImage, QPainter
+        from overlay_daemon_pyside6 import OverlayDaemon
+        from preset_storage import MemoryStorage
+        from preset_io import default_config
+
+        storage = MemoryStorage()
+        for name, fields in SOAK_PRESETS.items():
+            config = default_config()
+            config.update(fields)
+            storage.save(name, config)
+        self.preset_names = list(SOAK_PRESETS)
+        self.daemon = OverlayDaemon(self.preset_names[0], storage)
+        self.daemon.show_crosshair()
+        self.overlay = self.daemon.overlay_window
+
+        # 矢量绘制每种形状的配置和画布
+        from preset_schema import SHAPES
+        self.shape_configs = []
+        for shape in SHAPES:
+            config = default_config()
+            config["shape"] = shape
+            self.shape_configs.append(config)
+        self.canvas = QImage(128, 128, QImage.Format_ARGB32_Premultiplied)
+        self.canvas.fill(Qt.transparent)
+        self.QPainter = QPainter
+        self.QRect = QRect
+        self.preset_index = 0
+        self.update_index = 0
+
+    def paint(self, count):
+        """覆盖层局部重绘和矢量绘制交替进行"""
+        from crosshair_renderer_pyside6 import draw_crosshair
+
+        x, y = self.overlay.get_crosshair_position()
+        rect = self.QRect(x - 64, y - 64, 129, 129)
+        painter = self.QPainter(self.canvas)
+        try:
+            for i in range(count):
+                if i % 2:
+                    self.overlay.repaint(rect)
+                else:
+                    config = self.shape_configs[(i // 2) % len(self.shape_configs)]
+                    draw_crosshair(painter, config, (64, 64))
+        finally:
+            painter.end()
+
+    def toggle_drag(self, count):
+        """切换拖动模式（成对进行，结束时回到普通模式）"""
+        for _ in range(count * 2):
+            self.overlay.toggleDragMode()
+
+    def switch_presets(self, count):
+        for _ in range(count):
+            self.preset_index = (self.preset_index + 1) % len(self.preset_names)
+            self.daemon.apply_preset(self.preset_names[self.preset_index])
+
+    def update_config(self, count):
+        for _ in range(count):
+            self.update_index += 1
+            self.daemon.set_config_field("size", 10 + self.update_index % 40)
+            self.daemon.set_config_field("opacity", 0.5 + (self.update_index % 5) / 10)
+
+
+def run_soak(paints, toggles, presets, updates, samples, budgets, trace=True, progress=True):
+    """运行 soak 测试，返回报告（需要已经创建 QApplication）"""
+    from PySide6.QtWidgets import QApplication
+
+    app = QApplication.instance()
+    driver = SoakDriver()
+    if trace:
+        tracemalloc.start(10)
+
+    def work(fraction):
+        driver.paint(max(1, int(paints * fraction)))
+        driver.toggle_drag(max(1, int(toggles * fraction)))
+        driver.switch_presets(max(1, int(presets * fraction)))
+        driver.update_config(max(1, int(updates * fraction)))
+        app.processEvents()
+
+    # 预热：构建图集缓存、导入延迟加载的模块，之后的采样作为基线
+    started = time.perf_counter()
+    work(1 / samples)
+    history = [take_sample(0, started, trace)]
+    first_snapshot = tracemalloc.take_snapshot() if trace else None
+    for step in range(1, samples + 1):
+        work(1 / samples)
+        history.append(take_sample(step, started, trace))
+        if progress:
+            print(f"[{step}/{samples}] {json.dumps(history[-1])}", file=sys.stderr)
+
+    top_growth = []
+    if trace:
+        stats = tracemalloc.take_snapshot().compare_to(first_snapshot, "lineno")
+        top_growth = [str(stat) for stat in stats[:10] if stat.size_diff > 0]
+        tracemalloc.stop()
+
+    driver.overlay.close()
+    checks = check_growth(history[0], history[-1], budgets)
+    return {
+        "workload": {"paints": paints, "drag_toggles": toggles, "preset_switches": presets,
+                     "config_updates": updates},
+        "samples": history,
+        "checks": checks,
+        "top_growth": top_growth,
+        "passed": all(check["pass"] is not False for check in checks.values()),
+    }
+
+
+def main(argv=None):
+    """主函数"""
+    parser = argparse.ArgumentParser(description="长时间运行的内存和句柄增长测试")
+    parser.add_argument("--paints", type=int, default=1000000, help="绘制次数")
+    parser.add_argument("--toggles", type=int, default=2000, help="拖动模式进入/退出次数")
+    parser.add_argument("--presets", type=int, default=5000, help="预设切换次数")
+    parser.add_argument("--updates", type=int, default=20000, help="配置修改次数")
+    parser.add_argument("--samples", type=int, default=10, help="采样次数")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="不使用 tracemalloc（运行更快）")
+    for key, limit in DEFAULT_BUDGETS.items():
+        parser.add_argument(f"--max-{key.replace('_', '-')}-growth", dest=key, type=float, default=limit,
+                            help=f"允许的 {key} 增长（默认 {limit}）")
+    parser.add_argument("--report", default=None, help="报告写入的文件（默认输出到标准输出）")
+    options = parser.parse_args(argv)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])
+
+    budgets = {key: getattr(options, key) for key in DEFAULT_BUDGETS}
+    report = run_soak(options.paints, options.toggles, options.presets, options.updates,
+                      max(1, options.samples), budgets, trace=not options.no_tracemalloc)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if options.report:
+        with open(options.report, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    for key, check in report["checks"].items():
+        if check["pass"] is False:
+            print(f"超出预算：{key} 增长 {check['growth']}（预算 {check['limit']}）", file=sys.stderr)
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+启动时间和内存占用基准测试
+
+分别以完整界面模式和守护模式（--no-ui）在子进程中启动，统计:
+1. init_ms: 从进程开始到控制器创建完成的时间（包括导入 PySide6）
+2. first_frame_ms: 到覆盖层第一次绘制完成的时间
+3. rss_mb: 空转一段时间后的常驻内存
+
+示例:
+    python bench_startup.py --runs 5
+    python bench_startup.py --storage memory    # 不读写预设文件夹
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from resource_usage import rss_mb
+
+
+def run_child(no_ui, preset, settle_ms, storage_kind="disk"):
+    """子进程：按 crosshair_pyside6 的方式启动，测量后输出一行 JSON"""
+    start = time.perf_counter()
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import QTimer
+    from crosshair_pyside6 import parse_args, create_controller
+
+    argv = ["--preset", preset] + (["--no-ui"] if no_ui else [])
+    options = parse_args(argv)
+    storage = None
+    if storage_kind == "memory":
+        from preset_storage import MemoryStorage
+        storage = MemoryStorage()
+    app = QApplication(sys.argv[:1])
+    app.setStyle("Fusion")
+    controller = create_controller(options, storage)
+    init_ms = (time.perf_counter() - start) * 1000
+
+    if controller.overlay_window is None:
+        controller.show_crosshair()
+    result = {"mode": "no-ui" if no_ui else "ui", "init_ms": init_ms}
+
+    def on_first_frame():
+        if "first_frame_ms" not in result:
+            result["first_frame_ms"] = (time.perf_counter() - start) * 1000
+            QTimer.singleShot(settle_ms, app.quit)
+
+    controller.overlay_window.frame_painted.connect(on_first_frame)
+    QTimer.singleShot(5000, app.quit)
+    app.exec()
+    result["rss_mb"] = rss_mb()
+    print(json.dumps(result))
+    controller.overlay_window.close()
+    return 0
+
+
+def run_mode(no_ui, preset, runs, settle_ms, storage_kind="disk"):
+    """多次启动子进程并汇总"""
+    samples = []
+    command = [sys.executable, os.path.abspath(__file__), "--child", "--preset", preset,
+               "--settle-ms", str(settle_ms), "--storage", storage_kind] + (["--no-ui"] if no_ui else [])
+    for _ in range(runs):
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    summary = {"mode": samples[0]["mode"], "runs": runs}
+    for key in ("init_ms", "first_frame_ms", "rss_mb"):
+        values = [s[key] for s in samples if s.get(key) is not None]
+        if values:
+            summary[key] = round(statistics.median(values), 2)
+    return summary
+
+
+def main(argv=None):
+    """主函数"""
+    parser = argparse.ArgumentParser(description="启动时间和内存占用基准测试")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--preset", default="default")
+    parser.add_argument("--settle-ms", type=int, default=500, help="第一帧之后空转多久再统计内存")
+    parser.add_argument("--storage", choices=["disk", "memory"], default="disk", help="预设存储后端")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--no-ui", action="store_true", help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.child:
+        return run_child(options.no_ui, options.preset, options.settle_ms, options.storage)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    report = [
+        run_mode(False, options.preset, options.runs, options.settle_ms, options.storage),
+        run_mode(True, options.preset, options.runs, options.settle_ms, options.storage),
+    ]
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
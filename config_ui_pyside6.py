@@ -2,8 +2,6 @@
 # -*- coding: utf-8 -*-
 
 import os
-import json
-import glob
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
     QLabel, QPushButton, QComboBox, QSlider, QLineEdit,
@@ -13,12 +11,34 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QFont, QColor
 
+from frame_governor import POWER_PROFILES, DEFAULT_POWER_PROFILE
+from adaptive_color import ADAPTIVE_MODES
+from preset_cache import PresetCache
+from preset_io import default_storage, preset_name_from_path, write_preset
+from preset_browser_pyside6 import PresetComboBox
+from preset_storage import FileSystemStorage
+from preset_schema import ANIMATIONS, SCOPE_MODES, SHAPES, IMAGE_SHAPE, SCHEMA, normalize_preset
+import profiling
+import stall_watchdog_pyside6
+from preset_watcher_pyside6 import PresetWatcher, changed_fields
+
 
 class ConfigUI(QMainWindow):
-    def __init__(self):
+    def __init__(self, storage=None, auto_show=True):
         super().__init__()
         self.overlay_window = None
         self.is_shown = False
+        # 守护模式下按需打开界面，关闭界面时保留准星
+        self.keep_overlay_on_close = False
+        # 覆盖层在独立的子进程中运行，界面的模态对话框不会阻塞准星绘制
+        self.isolate_overlay = False
+        # 画面导出参数 (名称, 模式, 边长)，见 OverlayWindow.set_frame_export
+        self.frame_export = None
+        # 传给覆盖层子进程的公共控制服务地址（界面进程崩溃后由子进程接管）、
+        # 性能分析模式和卡顿检测阈值
+        self.public_address = None
+        self.profile = None
+        self.stall_threshold_ms = 0
         
         # 语言配置
         self.language = "zh"
@@ -53,7 +73,13 @@ class ConfigUI(QMainWindow):
                 "hollow_gap": "中心距离:",
                 "hollow_length": "直线长度:",
                 "hollow_thickness": "直线粗细:",
+                "animation": "动画:",
+                "animation_frames": "动画帧数:",
+                "power_profile": "电源模式:",
+                "adaptive_color": "自适应颜色:",
+                "scope": "放大镜:",
                 "save_current": "保存当前配置",
+                "import_image": "导入图片",
                 "language": "语言:",
                 "invalid_address": "地址无效！",
                 "warning": "警告",
@@ -72,6 +98,9 @@ class ConfigUI(QMainWindow):
                 "cannot_open_folder": "无法打开文件夹：{error}",
                 "new_preset_name": "请输入预设名称：",
                 "program_error": "程序运行出错：{error}",
+                "export_stalls": "导出卡顿记录",
+                "stalls_saved": "已记录 {count} 次卡顿，保存到：{path}",
+                "stalls_disabled": "卡顿检测未启用（启动时加上 --stall-threshold 250 启用）",
             },
             "en": {
                 "title": "Crosshair Program",
@@ -97,7 +126,13 @@ class ConfigUI(QMainWindow):
                 "center": "Center",
                 "drag_mode": "Drag Mode",
                 "normal_mode": "Normal Mode",
+                "animation": "Animation:",
+                "animation_frames": "Frames:",
+                "power_profile": "Power Profile:",
+                "adaptive_color": "Adaptive Color:",
+                "scope": "Scope:",
                 "save_current": "Save Current Config",
+                "import_image": "Import Image",
                 "language": "Language:",
                 "invalid_address": "Invalid Address!",
                 "warning": "Warning",
@@ -116,14 +151,18 @@ class ConfigUI(QMainWindow):
                 "cannot_open_folder": "Cannot open folder: {error}",
                 "new_preset_name": "Please enter preset name:",
                 "program_error": "Program error: {error}",
+                "export_stalls": "Export Stall Log",
+                "stalls_saved": "{count} stalls recorded, saved to: {path}",
+                "stalls_disabled": "Stall detection is off (start with --stall-threshold 250 to enable it)",
             }
         }
         
-        # 配置文件管理
-        self.config_dir = os.path.join(os.environ['APPDATA'], 'CrosshairApp')
-        os.makedirs(self.config_dir, exist_ok=True)
+        # 配置文件管理（存储后端可以替换，测试使用内存存储）
+        self.storage = storage or default_storage()
+        # 已解析预设的缓存，切换预设后在后台预取相邻的预设
+        self.preset_cache = PresetCache(self.storage)
         self.current_config_file = "default.json"
-        self.config_file_path = os.path.join(self.config_dir, self.current_config_file)
+        self.config_file_path = self.get_config_path(self.current_config_file)
         
         # 默认配置
         self.config = {
@@ -135,11 +174,17 @@ class ConfigUI(QMainWindow):
             "position": {"x": "center", "y": "center"}
         }
         
+        # 当前预设文件被外部修改时自动重新加载
+        self.preset_watcher = PresetWatcher(self)
+        self.preset_watcher.reloaded.connect(self.on_preset_file_changed)
+        
         self.load_config()
         self.setup_ui()
+        self.watch_preset_file()
         
-        # 程序启动后默认显示准星
-        QTimer.singleShot(500, self.show_crosshair)
+        # 程序启动后默认显示准星（守护模式打开界面时沿用守护进程的显示状态）
+        if auto_show:
+            QTimer.singleShot(500, self.show_crosshair)
         
     def t(self, key):
         """获取当前语言的字符串"""
@@ -154,42 +199,40 @@ class ConfigUI(QMainWindow):
     
     def get_config_path(self, config_name):
         """获取指定配置文件的完整路径"""
-        if not config_name.endswith('.json'):
-            return os.path.join(self.config_dir, config_name + '.json')
-        else:
-            return os.path.join(self.config_dir, config_name)
+        return self.storage.path(config_name)
     
     def load_config(self):
         """加载配置文件"""
         try:
-            if os.path.exists(self.config_file_path):
-                with open(self.config_file_path, 'r', encoding='utf-8') as f:
-                    self.config.update(json.load(f))
+            data = self.storage.load(preset_name_from_path(self.config_file_path))
+            if data is not None:
+                config, issues = normalize_preset(data)
+                for issue in issues:
+                    print(f"配置文件 {self.config_file_path}: {issue}")
+                self.config.update(config)
         except Exception as e:
             print(f"加载配置文件失败: {e}")
     
+    @profiling.hook
     def save_config(self):
         """保存配置文件"""
         try:
-            with open(self.config_file_path, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            preset_name = preset_name_from_path(self.config_file_path)
+            self.preset_cache.invalidate(preset_name)
+            write_preset(self.storage, preset_name, self.config)
+            self.preset_model.invalidate_thumbnail(preset_name)
         except Exception as e:
             print(f"保存配置文件失败: {e}")
     
     def get_available_presets(self):
         """获取可用的预设配置列表"""
-        preset_files = glob.glob(os.path.join(self.config_dir, '*.json'))
-        presets = []
-        for file in preset_files:
-            preset_name = os.path.basename(file)[:-5]
-            presets.append(preset_name)
-        return sorted(presets)
+        return self.storage.list_presets()
     
     def setup_ui(self):
         """设置用户界面"""
         self.setWindowTitle(f"{self.t('title')} v1.1.1")
-        self.setGeometry(100, 100, 570, 780)
-        self.setFixedSize(570, 780)
+        self.setGeometry(100, 100, 570, 870)
+        self.setFixedSize(570, 870)
         
         # 设置字体
         self.setup_fonts()
@@ -233,7 +276,8 @@ class ConfigUI(QMainWindow):
         preset_layout = QHBoxLayout()
         preset_layout.addWidget(QLabel(self.t("preset_config")))
         self.preset_var = self.current_config_file.replace('.json', '')
-        self.preset_combo = QComboBox()
+        self.preset_combo = PresetComboBox(self.storage)
+        self.preset_model = self.preset_combo.preset_model
         self.update_preset_list()
         self.preset_combo.currentTextChanged.connect(self.on_preset_selected)
         preset_layout.addWidget(self.preset_combo)
@@ -285,10 +329,15 @@ class ConfigUI(QMainWindow):
         settings_layout.addWidget(QLabel(self.t("shape")), 0, 0)
         self.shape_var = self.config["shape"]
         self.shape_combo = QComboBox()
-        self.shape_combo.addItems(["cross", "dot", "square", "circle", "triangle", "hollow_cross", "hollow_square", "hollow_cross_dot"])
+        self.shape_combo.addItems(SHAPES + [IMAGE_SHAPE])
         self.shape_combo.setCurrentText(self.shape_var)
         self.shape_combo.currentTextChanged.connect(self.on_shape_changed)
-        settings_layout.addWidget(self.shape_combo, 0, 1, 1, 2)
+        settings_layout.addWidget(self.shape_combo, 0, 1)
+        
+        # 导入 PNG / SVG 图片准星
+        import_image_button = QPushButton(self.t("import_image"))
+        import_image_button.clicked.connect(lambda: self.import_crosshair_image())
+        settings_layout.addWidget(import_image_button, 0, 2)
         
         # 大小设置
         settings_layout.addWidget(QLabel(self.t("size")), 1, 0)
@@ -404,6 +453,49 @@ class ConfigUI(QMainWindow):
         position_layout.addStretch()
         settings_layout.addLayout(position_layout, 7, 0, 1, 3)
         
+        # 动画设置
+        settings_layout.addWidget(QLabel(self.t("animation")), 8, 0)
+        self.animation_combo = QComboBox()
+        self.animation_combo.addItems(ANIMATIONS)
+        self.animation_combo.setCurrentText(self.config.get("animation", "none"))
+        self.animation_combo.currentTextChanged.connect(self.on_animation_changed)
+        settings_layout.addWidget(self.animation_combo, 8, 1, 1, 2)
+        
+        settings_layout.addWidget(QLabel(self.t("animation_frames")), 9, 0)
+        self.animation_frames_var = self.config.get("animation_frames", 24)
+        self.animation_frames_slider = QSlider(Qt.Horizontal)
+        self.animation_frames_slider.setRange(4, 120)
+        self.animation_frames_slider.setValue(int(self.animation_frames_var))
+        self.animation_frames_slider.valueChanged.connect(self.update_animation_frames_label)
+        self.animation_frames_entry = QLineEdit(str(self.animation_frames_var))
+        self.animation_frames_entry.setFixedWidth(60)
+        settings_layout.addWidget(self.animation_frames_slider, 9, 1)
+        settings_layout.addWidget(self.animation_frames_entry, 9, 2)
+        
+        # 电源模式（限制重绘帧率）
+        settings_layout.addWidget(QLabel(self.t("power_profile")), 10, 0)
+        self.power_profile_combo = QComboBox()
+        self.power_profile_combo.addItems(list(POWER_PROFILES))
+        self.power_profile_combo.setCurrentText(self.config.get("power_profile", DEFAULT_POWER_PROFILE))
+        self.power_profile_combo.currentTextChanged.connect(self.on_power_profile_changed)
+        settings_layout.addWidget(self.power_profile_combo, 10, 1, 1, 2)
+        
+        # 自适应颜色（按准星周围的背景切换对比色）
+        settings_layout.addWidget(QLabel(self.t("adaptive_color")), 11, 0)
+        self.adaptive_color_combo = QComboBox()
+        self.adaptive_color_combo.addItems(ADAPTIVE_MODES)
+        self.adaptive_color_combo.setCurrentText(self.config.get("adaptive_color", "off"))
+        self.adaptive_color_combo.currentTextChanged.connect(self.on_adaptive_color_changed)
+        settings_layout.addWidget(self.adaptive_color_combo, 11, 1, 1, 2)
+        
+        # 放大镜
+        settings_layout.addWidget(QLabel(self.t("scope")), 12, 0)
+        self.scope_combo = QComboBox()
+        self.scope_combo.addItems(SCOPE_MODES)
+        self.scope_combo.setCurrentText(self.config.get("scope", "off"))
+        self.scope_combo.currentTextChanged.connect(self.on_scope_changed)
+        settings_layout.addWidget(self.scope_combo, 12, 1, 1, 2)
+        
         main_layout.addWidget(settings_group)
         
         # 初始状态设置空心十字控件可见性
@@ -414,6 +506,11 @@ class ConfigUI(QMainWindow):
         save_button.clicked.connect(self.save_settings)
         main_layout.addWidget(save_button)
         
+        # 导出事件循环卡顿记录
+        stalls_button = QPushButton(self.t("export_stalls"))
+        stalls_button.clicked.connect(self.export_stalls)
+        main_layout.addWidget(stalls_button)
+        
         # 说明文字
         info_text = "1. 选择预设并自定义参数\n2. 点击显示准星\n3. 调整设置实时更新\n4. 支持全屏游戏使用"
         info_label = QLabel(info_text)
@@ -444,14 +541,15 @@ class ConfigUI(QMainWindow):
         
         if os.path.isdir(path):
             self.error_label.setText("")
-            old_config_dir = self.config_dir
-            self.config_dir = path
-            
-            if old_config_dir != self.config_dir:
+            if path != self.storage.location:
+                self.storage = FileSystemStorage(path)
+                self.preset_cache = PresetCache(self.storage)
+                self.preset_model.set_storage(self.storage)
                 self.config_file_path = self.get_config_path(self.preset_var)
                 self.update_config_from_ui()
                 self.save_config()
                 self.update_preset_list()
+                self.watch_preset_file()
         else:
             self.error_label.setText(self.t("invalid_address"))
     
@@ -461,10 +559,9 @@ class ConfigUI(QMainWindow):
             self.load_preset()
     
     def update_preset_list(self):
-        """更新预设列表"""
+        """更新预设列表（只插入、删除变化的行）"""
         presets = self.get_available_presets()
-        self.preset_combo.clear()
-        self.preset_combo.addItems(presets)
+        self.preset_model.set_names(presets)
         if self.preset_var in presets:
             self.preset_combo.setCurrentText(self.preset_var)
     
@@ -490,6 +587,7 @@ class ConfigUI(QMainWindow):
             }
             
             self.save_config()
+            self.watch_preset_file()
             self.update_ui_from_config()
             self.update_preset_list()
             self.preset_combo.setCurrentText(preset_name)
@@ -497,6 +595,7 @@ class ConfigUI(QMainWindow):
             
             QMessageBox.information(self, self.t("success"), self.format_text("preset_created", name=preset_name))
     
+    @profiling.hook
     def load_preset(self):
         """加载预设配置"""
         preset_name = self.preset_combo.currentText()
@@ -509,33 +608,23 @@ class ConfigUI(QMainWindow):
         
         # 先加载配置文件内容
         try:
-            config_path = self.get_config_path(preset_name)
-            
-            if os.path.exists(config_path):
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    loaded_config = json.load(f)
-            else:
-                loaded_config = {}
+            config = self.read_preset(preset_name)
         except Exception as e:
             QMessageBox.critical(self, self.t("error"), f"加载预设失败: {e}")
             return
         
-        # 设置默认配置，然后用加载的配置覆盖
-        self.config = {
-            "size": 20,
-            "color": "#FF0000",
-            "shape": "cross",
-            "thickness": 2,
-            "opacity": 0.8,
-            "position": {"x": "center", "y": "center"},
-            "hollow_gap": 0,
-            "hollow_length": 30,
-            "hollow_thickness": 2,
-            "center_dot_size": 3
-        }
-        
-        # 用加载的配置覆盖默认配置
-        self.config.update(loaded_config)
+        # 覆盖层在 updateConfig 中判断画面是否变化，不需要隐藏再显示窗口
+        self.apply_config(config)
+    
+    def read_preset(self, preset_name):
+        """读取预设（优先使用缓存），缺失的参数使用默认值补充，并预取下拉框中相邻的预设"""
+        config = self.preset_cache.get(preset_name)
+        self.preset_cache.prefetch_neighbors(preset_name, list(self.preset_model.names))
+        return config
+    
+    def apply_config(self, config):
+        """应用配置到UI和准星"""
+        self.config = config
         
         # 更新UI
         self.update_ui_from_config()
@@ -544,11 +633,70 @@ class ConfigUI(QMainWindow):
         # 更新准星显示
         if self.overlay_window:
             self.overlay_window.updateConfig(self.config)
+        self.watch_preset_file()
+    
+    def watch_preset_file(self):
+        """监视当前预设文件"""
+        self.preset_watcher.watch(self.storage, preset_name_from_path(self.config_file_path))
+    
+    def on_preset_file_changed(self, config):
+        """预设文件被外部修改：只应用变化的字段，不隐藏窗口"""
+        changes = changed_fields(self.config, config)
+        if not changes:
+            return
+        self.config.update(changes)
+        self.update_ui_from_config()
+        if self.overlay_window:
+            self.overlay_window.updateConfig(self.config)
+        self.preset_watcher.applied(self.overlay_window)
+    
+    def apply_preset(self, preset_name):
+        """直接加载预设（供控制服务使用，不弹出对话框），成功返回 True"""
+        if not self.storage.exists(preset_name):
+            return False
+        config_path = self.get_config_path(preset_name)
         
-        # 如果准星已显示，重新显示以应用新配置
-        if self.is_shown:
-            self.hide_crosshair()
-            self.show_crosshair()
+        config = self.read_preset(preset_name)
+        self.current_config_file = preset_name + '.json'
+        self.config_file_path = config_path
+        self.preset_var = preset_name
+        
+        self.preset_combo.blockSignals(True)
+        if self.preset_combo.findText(preset_name) < 0:
+            self.preset_combo.addItem(preset_name)
+        self.preset_combo.setCurrentText(preset_name)
+        self.preset_combo.blockSignals(False)
+        
+        self.apply_config(config)
+        return True
+    
+    def set_config_field(self, key, value):
+        """直接修改一个配置字段并应用到准星（供控制服务使用）
+
+        值按预设结构转换，未知字段或无法使用的值抛出 ValueError。
+        """
+        self.config[key] = SCHEMA.coerce_field(key, value)
+        if self.overlay_window:
+            self.overlay_window.updateConfig(self.config)
+        self.update_ui_from_config()
+    
+    def get_state(self):
+        """获取当前状态（供控制服务使用）"""
+        state = {
+            "shown": self.is_shown,
+            "preset": self.current_config_file[:-5],
+            "config": self.config,
+            "hot_reload": self.preset_watcher.stats(),
+            "preset_cache": self.preset_cache.stats(),
+        }
+        if self.overlay_window:
+            state["position"] = list(self.overlay_window.get_crosshair_position())
+            state["drag_mode"] = self.overlay_window.is_drag_mode
+            state["governor"] = self.overlay_window.governor_stats()
+            state["updates"] = dict(self.overlay_window.update_stats)
+            state["adaptive_color"] = self.overlay_window.adaptive_color_stats()
+            state["scope"] = self.overlay_window.scope_stats()
+        return state
     
     def save_preset(self):
         """保存预设配置"""
@@ -580,10 +728,8 @@ class ConfigUI(QMainWindow):
         
         reply = QMessageBox.question(self, self.t("confirm"), self.format_text("delete_confirm", name=preset_name))
         if reply == QMessageBox.Yes:
-            preset_file = self.get_config_path(preset_name)
             try:
-                if os.path.exists(preset_file):
-                    os.remove(preset_file)
+                if self.storage.delete(preset_name):
                     QMessageBox.information(self, self.t("success"), self.t("preset_deleted"))
                     self.update_preset_list()
                     self.preset_combo.setCurrentText('default')
@@ -594,7 +740,7 @@ class ConfigUI(QMainWindow):
     def open_config_folder(self):
         """打开配置文件夹"""
         try:
-            os.startfile(self.config_dir)
+            os.startfile(self.storage.location)
         except Exception as e:
             QMessageBox.critical(self, self.t("error"), self.format_text("cannot_open_folder", error=str(e)))
     
@@ -630,11 +776,23 @@ class ConfigUI(QMainWindow):
         else:
             self.hide_crosshair()
     
+    def create_overlay(self):
+        """创建覆盖层：本进程中的窗口，或者子进程中覆盖层的代理"""
+        if self.isolate_overlay:
+            from overlay_process_pyside6 import RemoteOverlay
+            return RemoteOverlay(self.config, public_address=self.public_address, frame_export=self.frame_export,
+                                 profile=self.profile, stall_threshold_ms=self.stall_threshold_ms)
+        from overlay_window_pyside6 import OverlayWindow
+        from sprite_cache_pyside6 import sprite_cache_dir
+        overlay = OverlayWindow(self.config, sprite_cache_dir(self.storage))
+        if self.frame_export:
+            overlay.set_frame_export(*self.frame_export)
+        return overlay
+    
     def show_crosshair(self):
         """显示准星"""
         if self.overlay_window is None:
-            from overlay_window_pyside6 import OverlayWindow
-            self.overlay_window = OverlayWindow(self.config)
+            self.overlay_window = self.create_overlay()
         
         self.overlay_window.showFullScreen()
         self.overlay_window.updateConfig(self.config)
@@ -648,6 +806,7 @@ class ConfigUI(QMainWindow):
         self.show_button.setText(self.t("show_crosshair"))
         self.is_shown = False
     
+    @profiling.hook
     def update_crosshair(self):
         """更新准星"""
         self.update_config_from_ui()
@@ -687,12 +846,37 @@ class ConfigUI(QMainWindow):
                     self.config["position"] = {"x": pos[0], "y": pos[1]}
                     self.save_config()
     
+    def set_drag_mode(self, enabled):
+        """进入 / 退出拖动模式（供控制服务使用），返回当前是否处于拖动模式"""
+        if self.overlay_window and self.is_shown and self.overlay_window.is_drag_mode != enabled:
+            self.toggle_drag_mode()
+        return bool(self.overlay_window and self.overlay_window.is_drag_mode)
+    
+    def quit_app(self):
+        """退出程序（供控制服务使用）"""
+        self.close()
+        QTimer.singleShot(0, QApplication.quit)
+    
     def save_settings(self):
         """保存设置"""
         self.update_config_from_ui()
         self.save_config()
         QMessageBox.information(self, self.t("success"), self.format_text("config_saved", path=self.config_file_path))
     
+    def export_stalls(self):
+        """把事件循环卡顿记录写到临时文件夹"""
+        watchdog = stall_watchdog_pyside6.active_watchdog()
+        if watchdog is None:
+            QMessageBox.information(self, self.t("warning"), self.t("stalls_disabled"))
+            return
+        try:
+            path = watchdog.write_report()
+        except OSError as e:
+            QMessageBox.critical(self, self.t("error"), str(e))
+            return
+        QMessageBox.information(self, self.t("success"),
+                                self.format_text("stalls_saved", count=watchdog.stall_count, path=path))
+    
     def on_shape_changed(self, shape):
         """形状改变事件"""
         self.update_hollow_cross_visibility()
@@ -730,12 +914,64 @@ class ConfigUI(QMainWindow):
         self.hollow_thickness_entry.setText(str(value))
         self.update_crosshair()
     
+    def on_animation_changed(self, animation):
+        """动画类型改变事件"""
+        self.update_crosshair()
+    
+    def on_power_profile_changed(self, profile):
+        """电源模式改变事件"""
+        self.update_crosshair()
+    
+    def import_crosshair_image(self, path=None):
+        """检查并导入 PNG / SVG 图片，作为当前预设的准星"""
+        from image_crosshair_pyside6 import import_image, validate_image
+        
+        if path is None:
+            path, _ = QFileDialog.getOpenFileName(self, self.t("import_image"), "", "Images (*.png *.svg)")
+            if not path:
+                return False
+        try:
+            directory = getattr(self.storage, "directory", None)
+            if directory:
+                path = import_image(path, directory)
+            else:
+                issue = validate_image(path)
+                if issue:
+                    raise ValueError(issue)
+        except (OSError, ValueError) as e:
+            print(f"导入图片失败: {e}")
+            if self.isVisible():
+                QMessageBox.warning(self, self.t("warning"), str(e))
+            return False
+        self.config["image"] = os.path.abspath(path)
+        self.shape_combo.setCurrentText(IMAGE_SHAPE)
+        self.update_crosshair()
+        return True
+    
+    def on_adaptive_color_changed(self, mode):
+        """自适应颜色模式改变事件"""
+        self.update_crosshair()
+    
+    def on_scope_changed(self, mode):
+        """放大镜开关改变事件"""
+        self.update_crosshair()
+    
+    def update_animation_frames_label(self, value):
+        """更新动画帧数标签"""
+        self.animation_frames_entry.setText(str(value))
+        self.update_crosshair()
+    
     def update_config_from_ui(self):
         """从UI更新配置"""
         self.config["shape"] = self.shape_combo.currentText()
         self.config["size"] = self.size_slider.value()
         self.config["thickness"] = self.thickness_slider.value()
         self.config["opacity"] = self.opacity_slider.value() / 100.0
+        self.config["animation"] = self.animation_combo.currentText()
+        self.config["animation_frames"] = self.animation_frames_slider.value()
+        self.config["power_profile"] = self.power_profile_combo.currentText()
+        self.config["adaptive_color"] = self.adaptive_color_combo.currentText()
+        self.config["scope"] = self.scope_combo.currentText()
         
         # 保存空心十字专用参数
         if self.shape_combo.currentText() in ["hollow_cross", "hollow_cross_dot"]:
@@ -765,6 +1001,11 @@ class ConfigUI(QMainWindow):
         self.hollow_length_slider.blockSignals(True)
         self.hollow_thickness_slider.blockSignals(True)
         self.center_dot_size_slider.blockSignals(True)
+        self.animation_combo.blockSignals(True)
+        self.animation_frames_slider.blockSignals(True)
+        self.power_profile_combo.blockSignals(True)
+        self.adaptive_color_combo.blockSignals(True)
+        self.scope_combo.blockSignals(True)
         
         try:
             # 更新形状
@@ -808,6 +1049,15 @@ class ConfigUI(QMainWindow):
             self.center_dot_size_slider.setValue(center_dot_size)
             self.center_dot_size_entry.setText(str(center_dot_size))
             
+            # 更新动画设置
+            self.animation_combo.setCurrentText(self.config.get("animation", "none"))
+            animation_frames = int(self.config.get("animation_frames", 24))
+            self.animation_frames_slider.setValue(animation_frames)
+            self.animation_frames_entry.setText(str(animation_frames))
+            self.power_profile_combo.setCurrentText(self.config.get("power_profile", DEFAULT_POWER_PROFILE))
+            self.adaptive_color_combo.setCurrentText(self.config.get("adaptive_color", "off"))
+            self.scope_combo.setCurrentText(self.config.get("scope", "off"))
+            
             # 更新控件可见性
             self.update_hollow_cross_visibility()
             
@@ -821,9 +1071,20 @@ class ConfigUI(QMainWindow):
             self.hollow_length_slider.blockSignals(False)
             self.hollow_thickness_slider.blockSignals(False)
             self.center_dot_size_slider.blockSignals(False)
+            self.animation_combo.blockSignals(False)
+            self.animation_frames_slider.blockSignals(False)
+            self.power_profile_combo.blockSignals(False)
+            self.adaptive_color_combo.blockSignals(False)
+            self.scope_combo.blockSignals(False)
+    
+    def open_ui(self):
+        """显示并激活配置窗口"""
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
     
     def closeEvent(self, event):
         """关闭事件"""
-        if self.overlay_window:
+        if self.overlay_window and not self.keep_overlay_on_close:
             self.overlay_window.close()
         event.accept()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地控制协议
+
+协议为 UTF-8 文本行，每条命令一行：
+
+    COMMAND [ARG ...]\\n
+
+服务端对每条命令回复一行：
+
+    OK [payload]\\n
+    ERR message\\n
+
+支持的命令：
+    ping                    连通性测试
+    show / hide             显示 / 隐藏准星
+    center                  准星居中
+    load_preset NAME        加载预设（NAME 可以包含空格）
+    set_field KEY VALUE     直接修改一个配置字段，VALUE 按 JSON 解析，失败时作为字符串
+    get_state               返回当前状态（JSON）
+    open_ui                 打开配置界面（守护模式下按需创建）
+    apply_config JSON       用完整的配置快照替换当前配置
+    drag_mode on|off        进入 / 退出拖动模式，payload 为当前是否处于拖动模式
+    quit                    退出程序
+    stalls                  返回事件循环卡顿记录（JSON）
+
+修改准星的命令在覆盖层完成下一帧绘制后才回复，payload 为服务端测得的
+命令到画面的延迟（毫秒）。
+
+本模块不依赖 Qt，客户端可以在不启动 Qt 的情况下快速发送命令。
+"""
+
+import os
+import sys
+import json
+import socket
+import getpass
+import tempfile
+
+
+# 修改准星、需要等待下一帧绘制的命令
+FRAME_COMMANDS = {"show", "center", "load_preset", "set_field", "apply_config"}
+
+COMMANDS = {
+    "ping", "show", "hide", "center", "load_preset", "set_field", "get_state", "open_ui",
+    "apply_config", "drag_mode", "quit", "stalls",
+}
+
+
+def _user_suffix():
+    """按用户区分服务名，避免多用户之间互相干扰"""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "user"
+    return "".join(c for c in user if c.isalnum()) or "user"
+
+
+def server_name(name="CrosshairApp"):
+    """获取控制服务的地址
+
+    Windows 下为命名管道名，其它平台为本地套接字的绝对路径。
+    """
+    name = f"{name}-{_user_suffix()}"
+    if sys.platform == "win32":
+        return name
+    return os.path.join(tempfile.gettempdir(), name + ".sock")
+
+
+def encode_command(command, *args):
+    """编码一条命令"""
+    parts = [command] + [str(arg) for arg in args]
+    return (" ".join(parts) + "\n").encode("utf-8")
+
+
+def parse_command(line):
+    """解析一条命令，返回 (command, args)
+
+    load_preset 的参数为整行剩余部分；set_field 解析为 (key, value)；
+    apply_config 的参数按 JSON 解析。
+    """
+    line = line.strip()
+    if not line:
+        return None, []
+    command, _, rest = line.partition(" ")
+    rest = rest.strip()
+    if command == "load_preset":
+        return command, [rest] if rest else []
+    if command == "set_field":
+        key, _, raw = rest.partition(" ")
+        if not key or not raw:
+            return command, []
+        return command, [key, parse_value(raw.strip())]
+    if command == "apply_config":
+        return command, [parse_value(rest)] if rest else []
+    return command, rest.split() if rest else []
+
+
+def parse_value(raw):
+    """把参数按 JSON 解析，失败时作为字符串"""
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def encode_config(config):
+    """把配置快照编码为单行 JSON"""
+    return json.dumps(config, ensure_ascii=False, separators=(",", ":"))
+
+
+def format_reply(ok, payload=None):
+    """编码一条回复"""
+    head = "OK" if ok else "ERR"
+    if payload is None or payload == "":
+        return (head + "\n").encode("utf-8")
+    if not isinstance(payload, str):
+        payload = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return f"{head} {payload}\n".encode("utf-8")
+
+
+def parse_reply(line):
+    """解析一条回复，返回 (ok, payload)"""
+    line = line.strip()
+    head, _, payload = line.partition(" ")
+    return head == "OK", payload
+
+
+class ControlClient:
+    """控制服务的客户端（不依赖 Qt）"""
+
+    def __init__(self, address=None, timeout=2.0):
+        self.address = address or server_name()
+        self.timeout = timeout
+        self._sock = None
+        self._pipe = None
+        self._buffer = b""
+
+    def connect(self):
+        """连接控制服务，服务不存在时抛出 OSError"""
+        if sys.platform == "win32":
+            self._pipe = open(r"\\.\pipe" + "\\" + self.address, "r+b", buffering=0)
+        else:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.address)
+            except OSError:
+                sock.close()
+                raise
+            self._sock = sock
+        return self
+
+    def close(self):
+        """关闭连接"""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._pipe is not None:
+            self._pipe.close()
+            self._pipe = None
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _send(self, data):
+        if self._sock is not None:
+            self._sock.sendall(data)
+        else:
+            self._pipe.write(data)
+
+    def _recv(self):
+        if self._sock is not None:
+            return self._sock.recv(4096)
+        return self._pipe.read(4096)
+
+    def _readline(self):
+        while b"\n" not in self._buffer:
+            chunk = self._recv()
+            if not chunk:
+                raise ConnectionError("控制服务已断开")
+            self._buffer += chunk
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        return line.decode("utf-8")
+
+    def request(self, command, *args):
+        """发送命令并等待回复，返回 (ok, payload)"""
+        self._send(encode_command(command, *args))
+        return parse_reply(self._readline())
+
+    def ping(self):
+        return self.request("ping")[0]
+
+    def show(self):
+        return self.request("show")
+
+    def hide(self):
+        return self.request("hide")
+
+    def center(self):
+        return self.request("center")
+
+    def load_preset(self, name):
+        return self.request("load_preset", name)
+
+    def set_field(self, key, value):
+        return self.request("set_field", key, json.dumps(value, ensure_ascii=False))
+
+    def open_ui(self):
+        return self.request("open_ui")
+
+    def apply_config(self, config):
+        return self.request("apply_config", encode_config(config))
+
+    def drag_mode(self, enabled):
+        return self.request("drag_mode", "on" if enabled else "off")
+
+    def quit(self):
+        return self.request("quit")
+
+    def stalls(self):
+        """获取卡顿记录，失败时返回 None"""
+        ok, payload = self.request("stalls")
+        return json.loads(payload) if ok else None
+
+    def get_state(self):
+        """获取服务端状态，失败时返回 None"""
+        ok, payload = self.request("get_state")
+        return json.loads(payload) if ok else None
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基于 QLocalServer 的本地控制服务
+
+外部脚本通过 control_protocol 中定义的文本行协议控制准星。命令直接作用于
+控制器（ConfigUI 或守护模式的 OverlayDaemon）持有的 OverlayWindow，不经过
+滑块等控件的信号往返。
+
+控制器需要提供：
+    overlay_window          覆盖层窗口（可以为 None）
+    show_crosshair()        显示准星
+    hide_crosshair()        隐藏准星
+    center_crosshair()      准星居中
+    apply_preset(name)      加载预设，成功返回 True
+    set_config_field(k, v)  修改一个配置字段，非法字段抛出 ValueError
+    get_state()             返回可序列化为 JSON 的状态
+    open_ui()               打开配置界面
+    apply_config(config)    用校验后的配置快照替换当前配置
+    set_drag_mode(enabled)  进入 / 退出拖动模式，返回当前是否处于拖动模式
+    quit_app()              退出程序
+"""
+
+import time
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+from control_protocol import (
+    server_name, parse_command, format_reply, COMMANDS, FRAME_COMMANDS
+)
+from preset_io import default_config
+from preset_schema import normalize_preset
+import stall_watchdog_pyside6
+
+
+# 等待下一帧绘制的最长时间（毫秒），超时后直接回复
+FRAME_WAIT_TIMEOUT_MS = 250
+
+# 判断已有实例是否存活时的连接超时（毫秒）
+PROBE_TIMEOUT_MS = 200
+
+
+def is_server_running(name):
+    """指定地址上是否有正在运行的控制服务"""
+    sock = QLocalSocket()
+    sock.connectToServer(name)
+    running = sock.waitForConnected(PROBE_TIMEOUT_MS)
+    sock.abort()
+    return running
+
+
+def overlay_paint_state(overlay):
+    """(覆盖层, 请求重绘的次数, 是否可见)，用于判断命令是否会画出新的一帧"""
+    if overlay is None:
+        return None
+    return (overlay, overlay.paint_requests, overlay.isVisible())
+
+
+class ControlServer(QObject):
+    """本地控制服务"""
+
+    # 客户端断开连接时发射，参数为剩余的客户端数
+    client_disconnected = Signal(int)
+
+    def __init__(self, controller, name=None, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.name = name or server_name()
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self.on_new_connection)
+        self._buffers = {}
+        # 有命令在等待下一帧的客户端 -> 按命令顺序排列的回复（等待中的项为收到命令的时间）
+        self._queues = {}
+        self._watched_overlay = None
+        self.already_running = False
+
+        self._frame_timeout = QTimer(self)
+        self._frame_timeout.setSingleShot(True)
+        self._frame_timeout.timeout.connect(self.flush_pending)
+
+    def start(self):
+        """开始监听，返回是否成功
+
+        地址已被另一个正在运行的实例占用时返回 False，并设置 already_running。
+        """
+        # Windows 命名管道允许多个实例同时监听，所以先探测再监听
+        self.already_running = is_server_running(self.name)
+        if self.already_running:
+            return False
+        if self.server.listen(self.name):
+            return True
+        # 上次异常退出可能残留套接字文件
+        QLocalServer.removeServer(self.name)
+        if self.server.listen(self.name):
+            return True
+        print(f"控制服务启动失败: {self.server.errorString()}")
+        return False
+
+    def close(self):
+        """停止监听"""
+        self.server.close()
+
+    def on_new_connection(self):
+        """新的客户端连接"""
+        while self.server.hasPendingConnections():
+            sock = self.server.nextPendingConnection()
+            self._buffers[sock] = b""
+            sock.readyRead.connect(lambda s=sock: self.on_ready_read(s))
+            # 连接到本对象的方法，服务销毁时 Qt 会自动断开
+            sock.disconnected.connect(self.on_socket_disconnected)
+            sock.disconnected.connect(sock.deleteLater)
+
+    def on_socket_disconnected(self):
+        self.on_disconnected(self.sender())
+
+    def on_disconnected(self, sock):
+        """客户端断开"""
+        self._buffers.pop(sock, None)
+        self._queues.pop(sock, None)
+        self.client_disconnected.emit(len(self._buffers))
+
+    def on_ready_read(self, sock):
+        """读取并处理完整的命令行"""
+        buffer = self._buffers.get(sock, b"") + bytes(sock.readAll())
+        while b"\n" in buffer:
+            line, _, buffer = buffer.partition(b"\n")
+            self.handle_line(sock, line.decode("utf-8", errors="replace"))
+        self._buffers[sock] = buffer
+
+    def handle_line(self, sock, line):
+        """处理一条命令"""
+        received = time.perf_counter()
+        command, args = parse_command(line)
+        if command is None:
+            return
+        before = overlay_paint_state(self.controller.overlay_window)
+        try:
+            ok, payload = self.dispatch(command, args)
+        except Exception as e:
+            ok, payload = False, str(e)
+
+        overlay = self.controller.overlay_window
+        if ok and command in FRAME_COMMANDS and overlay is not None and overlay.isVisible() \
+                and overlay_paint_state(overlay) != before:
+            # 命令让覆盖层重绘时，等画出下一帧后再回复，回复中带上命令到画面的延迟；
+            # 画面没有变化（例如重复设置同一个值）时不会有新的一帧，直接回复
+            self.watch_overlay(overlay)
+            self._queues.setdefault(sock, []).append(received)
+            if not self._frame_timeout.isActive():
+                self._frame_timeout.start(FRAME_WAIT_TIMEOUT_MS)
+            return
+        reply = format_reply(ok, payload)
+        if sock in self._queues:
+            # 前面还有等待下一帧的命令，回复按命令顺序排队
+            self._queues[sock].append(reply)
+            return
+        sock.write(reply)
+        sock.flush()
+
+    def dispatch(self, command, args):
+        """执行命令，返回 (ok, payload)"""
+        if command not in COMMANDS:
+            return False, f"unknown command: {command}"
+        if command == "ping":
+            return True, "pong"
+        if command == "show":
+            self.controller.show_crosshair()
+            return True, None
+        if command == "hide":
+            self.controller.hide_crosshair()
+            return True, None
+        if command == "center":
+            self.controller.center_crosshair()
+            return True, None
+        if command == "load_preset":
+            if not args:
+                return False, "usage: load_preset NAME"
+            if not self.controller.apply_preset(args[0]):
+                return False, f"preset not found: {args[0]}"
+            return True, None
+        if command == "set_field":
+            if len(args) != 2:
+                return False, "usage: set_field KEY VALUE"
+            self.controller.set_config_field(args[0], args[1])
+            return True, None
+        if command == "get_state":
+            return True, self.controller.get_state()
+        if command == "open_ui":
+            self.controller.open_ui()
+            return True, None
+        if command == "apply_config":
+            if not args:
+                return False, "usage: apply_config JSON"
+            config, _ = normalize_preset(args[0], default_config())
+            self.controller.apply_config(config)
+            return True, None
+        if command == "drag_mode":
+            if not args or args[0] not in ("on", "off"):
+                return False, "usage: drag_mode on|off"
+            return True, self.controller.set_drag_mode(args[0] == "on")
+        if command == "quit":
+            self.controller.quit_app()
+            return True, None
+        if command == "stalls":
+            watchdog = stall_watchdog_pyside6.active_watchdog()
+            if watchdog is None:
+                return False, "stall watchdog is not running"
+            return True, watchdog.report()
+        return False, f"unknown command: {command}"
+
+    def watch_overlay(self, overlay):
+        """监听覆盖层的帧绘制信号"""
+        if self._watched_overlay is not overlay:
+            if self._watched_overlay is not None:
+                self._watched_overlay.frame_painted.disconnect(self.flush_pending)
+            overlay.frame_painted.connect(self.flush_pending)
+            self._watched_overlay = overlay
+
+    def flush_pending(self):
+        """下一帧已绘制（或等待超时），按命令顺序发出所有排队的回复"""
+        if not self._queues:
+            return
+        painted = time.perf_counter()
+        timed_out = not self._frame_timeout.isActive()
+        self._frame_timeout.stop()
+        for sock, replies in self._queues.items():
+            for reply in replies:
+                if not isinstance(reply, bytes):
+                    reply = format_reply(True, None if timed_out else f"{(painted - reply) * 1000:.3f}")
+                sock.write(reply)
+            sock.flush()
+        self._queues = {}
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+准星程序命令行控制工具
+
+示例:
+    python crosshair_ctl.py show
+    python crosshair_ctl.py load_preset csgo
+    python crosshair_ctl.py set_field size 30
+    python crosshair_ctl.py set_field color "#00FF00"
+    python crosshair_ctl.py get_state
+    python crosshair_ctl.py --bench 1000
+
+--bench 会交替修改准星大小，统计客户端往返时间以及服务端测得的
+命令到画面延迟（需要准星处于显示状态）。
+"""
+
+import sys
+import json
+import time
+import argparse
+
+from control_protocol import ControlClient, parse_value
+
+
+def percentile(values, fraction):
+    """计算百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_benchmark(client, count):
+    """延迟基准测试，返回统计结果"""
+    state = client.get_state() or {}
+    original_size = state.get("config", {}).get("size", 20)
+
+    round_trips = []
+    frame_latencies = []
+    for i in range(count):
+        size = original_size + 1 if i % 2 == 0 else original_size
+        start = time.perf_counter()
+        ok, payload = client.set_field("size", size)
+        round_trips.append((time.perf_counter() - start) * 1000)
+        if ok and payload:
+            frame_latencies.append(float(payload))
+    client.set_field("size", original_size)
+
+    ping_times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        client.ping()
+        ping_times.append((time.perf_counter() - start) * 1000)
+
+    def summary(values):
+        return {
+            "count": len(values),
+            "mean_ms": sum(values) / len(values) if values else 0.0,
+            "p50_ms": percentile(values, 0.5),
+            "p99_ms": percentile(values, 0.99),
+            "max_ms": max(values) if values else 0.0,
+        }
+
+    return {
+        "ping": summary(ping_times),
+        "set_field_round_trip": summary(round_trips),
+        "command_to_frame": summary(frame_latencies),
+    }
+
+
+def main(argv=None):
+    """主函数"""
+    parser = argparse.ArgumentParser(description="准星程序控制工具")
+    parser.add_argument("command", nargs="?", help="ping/show/hide/center/load_preset/set_field/get_state")
+    parser.add_argument("args", nargs="*", help="命令参数")
+    parser.add_argument("--address", help="控制服务地址")
+    parser.add_argument("--bench", type=int, metavar="N", help="执行 N 次延迟基准测试")
+    options = parser.parse_args(argv)
+
+    try:
+        client = ControlClient(options.address).connect()
+    except OSError as e:
+        print(f"无法连接准星程序: {e}")
+        return 1
+
+    with client:
+        if options.bench:
+            print(json.dumps(run_benchmark(client, options.bench), indent=2))
+            return 0
+
+        if not options.command:
+            parser.print_help()
+            return 1
+
+        if options.command == "set_field" and len(options.args) >= 2:
+            ok, payload = client.set_field(options.args[0], parse_value(" ".join(options.args[1:])))
+        else:
+            ok, payload = client.request(options.command, *options.args)
+        print(("OK " if ok else "ERR ") + payload if payload else ("OK" if ok else "ERR"))
+        return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
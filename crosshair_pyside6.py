@@ -3,14 +3,187 @@
 
 import sys
 import os
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Qt
-from config_ui_pyside6 import ConfigUI
+import json
+import argparse
 
+# 只导入不依赖 Qt 的协议模块，已有实例在运行时可以不启动 Qt 直接转发参数
+from control_protocol import ControlClient, server_name
+from frame_export import EXPORT_MODES, DEFAULT_SIZE as EXPORT_SIZE
+from live_params import check_block_name
 
-def main():
+
+# 检测已有实例时的连接超时（秒）
+FORWARD_TIMEOUT = 2.0
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="准星程序")
+    parser.add_argument("--preset", default=None, help="启动时加载的预设名称")
+    parser.add_argument("--no-ui", action="store_true",
+                        help="守护模式：只显示准星，不创建配置界面（可通过 open_ui 命令打开）")
+    parser.add_argument("--profile", choices=["cprofile", "sample"], default=None,
+                        help="启用性能分析，结果写到 CROSSHAIR_PROFILE_DIR（默认为临时文件夹）")
+    parser.add_argument("--stall-threshold", type=int, default=None, metavar="MS",
+                        help="事件循环连续忙碌超过该时间（例如 250）时记录 GUI 线程的调用栈；"
+                             "默认关闭，检测的心跳会定时唤醒 GUI 线程")
+    parser.add_argument("--isolate-overlay", action="store_true",
+                        help="覆盖层在独立的子进程中运行，界面卡顿或崩溃时准星不受影响")
+    export = parser.add_argument_group("画面导出")
+    export.add_argument("--export-frames", default=None, metavar="NAME",
+                        help="把准星画面导出到名为 NAME 的共享内存环形缓冲区（见 frame_export.py）")
+    export.add_argument("--export-mode", choices=EXPORT_MODES, default="changes",
+                        help="changes 只导出有变化的帧，every 导出每次绘制（默认 changes）")
+    export.add_argument("--export-size", type=int, default=EXPORT_SIZE, metavar="PX",
+                        help=f"导出区域的边长（物理像素，默认 {EXPORT_SIZE}）")
+    # 隔离模式下覆盖层子进程的私有地址，以及界面进程退出后接管的公共地址
+    parser.add_argument("--overlay-child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--overlay-public", default=None, help=argparse.SUPPRESS)
+    selftest = parser.add_argument_group("资源占用自检")
+    selftest.add_argument("--perf-selftest", action="store_true",
+                          help="对每种形状运行空闲、拖动和连续修改配置场景，输出 JSON 报告，超出预算时返回 1")
+    selftest.add_argument("--selftest-duration", type=float, default=1.0, metavar="SECONDS",
+                          help="每个场景的测量时间（默认 1 秒）")
+    selftest.add_argument("--selftest-shapes", default=None, metavar="SHAPE,...",
+                          help="只测试这些形状（逗号分隔，默认全部）")
+    selftest.add_argument("--budget", action="append", default=[], metavar="MODE.METRIC=VALUE",
+                          help="覆盖预算，例如 idle.cpu_percent=1 或 drag.min_paints_per_s=30，可重复")
+    selftest.add_argument("--budget-file", default=None, help="JSON 格式的预算文件")
+    selftest.add_argument("--report", default=None, help="报告写入的文件（默认输出到标准输出）")
+    visibility = parser.add_mutually_exclusive_group()
+    visibility.add_argument("--show", action="store_true", help="显示准星")
+    visibility.add_argument("--hide", action="store_true", help="隐藏准星")
+    options = parser.parse_args(argv)
+    if options.export_frames:
+        try:
+            check_block_name(options.export_frames)
+        except ValueError as e:
+            parser.error(f"--export-frames: {e}")
+    return options
+
+
+def forward_commands(options):
+    """把启动参数转换为发给已有实例的命令列表"""
+    commands = []
+    if options.preset:
+        commands.append(("load_preset", options.preset))
+    if options.show:
+        commands.append(("show",))
+    elif options.hide:
+        commands.append(("hide",))
+    if not commands:
+        # 没有参数时的再次启动：守护模式显示准星，否则把配置界面带到前台
+        commands.append(("show",) if options.no_ui else ("open_ui",))
+    return commands
+
+
+def forward_to_running_instance(options, address=None):
+    """把启动参数转发给正在运行的实例
+
+    没有正在运行的实例时返回 None；否则返回所有命令是否执行成功。
+    """
+    client = ControlClient(address or server_name(), timeout=FORWARD_TIMEOUT)
+    try:
+        client.connect()
+    except OSError:
+        return None
+
+    success = True
+    with client:
+        for command in forward_commands(options):
+            ok, payload = client.request(*command)
+            if not ok:
+                print(f"{command[0]} 失败：{payload}")
+                success = False
+    return success
+
+
+def frame_export_options(options):
+    """画面导出参数 (名称, 模式, 边长)，没有启用时返回 None"""
+    if not options.export_frames:
+        return None
+    return (options.export_frames, options.export_mode, options.export_size)
+
+
+def create_controller(options, storage=None):
+    """根据启动参数创建控制器（配置界面或守护模式），storage 为空时使用预设文件夹"""
+    if options.no_ui:
+        # 守护模式不导入配置界面模块，减少启动时间和内存占用
+        from overlay_daemon_pyside6 import OverlayDaemon
+        controller = OverlayDaemon(options.preset or "default", storage)
+        controller.frame_export = frame_export_options(options)
+        if not options.hide:
+            controller.show_crosshair()
+        return controller
+
+    from config_ui_pyside6 import ConfigUI
+    controller = ConfigUI(storage)
+    controller.isolate_overlay = options.isolate_overlay
+    controller.frame_export = frame_export_options(options)
+    controller.public_address = server_name()
+    controller.profile = options.profile
+    controller.stall_threshold_ms = options.stall_threshold or 0
+    if options.preset:
+        controller.apply_preset(options.preset)
+    if options.show:
+        controller.show_crosshair()
+    controller.show()
+    return controller
+
+
+def run_perf_selftest(options):
+    """运行资源占用自检，全部通过时返回 0"""
+    from PySide6.QtWidgets import QApplication
+    from perf_selftest_pyside6 import load_budgets, run_selftest, format_failures
+
+    app = QApplication(sys.argv[:1])
+    budgets = load_budgets(options.budget_file, options.budget)
+    shapes = options.selftest_shapes.split(",") if options.selftest_shapes else None
+    report = run_selftest(shapes, duration_s=options.selftest_duration, budgets=budgets)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if options.report:
+        with open(options.report, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    for line in format_failures(report):
+        print(f"超出预算：{line}", file=sys.stderr)
+    return 0 if report["passed"] else 1
+
+
+def main(argv=None):
     """主函数"""
     try:
+        options = parse_args(argv)
+
+        # 隔离模式的覆盖层子进程，由界面进程启动（带 --profile 时同样先启用性能分析）
+        if options.overlay_child:
+            if options.profile:
+                import profiling
+                profiling.enable(options.profile)
+            from overlay_process_pyside6 import run_overlay_child
+            sys.exit(run_overlay_child(options.overlay_child, options.overlay_public,
+                                       options.preset or "default", options.stall_threshold or 0,
+                                       frame_export_options(options)))
+
+        # 已有实例在运行：转发参数后直接退出（自检不受影响）
+        if not options.perf_selftest:
+            forwarded = forward_to_running_instance(options)
+            if forwarded is not None:
+                sys.exit(0 if forwarded else 1)
+
+        # 性能分析钩子在导入覆盖层和配置界面模块时生效，必须先启用
+        if options.profile:
+            import profiling
+            profiling.enable(options.profile)
+        
+        if options.perf_selftest:
+            sys.exit(run_perf_selftest(options))
+        
+        from PySide6.QtWidgets import QApplication
+        from control_server_pyside6 import ControlServer
+
         # 创建应用程序
         app = QApplication(sys.argv)
         
@@ -26,9 +199,24 @@ def main():
         # app.setAttribute(Qt.AA_EnableHighDpiScaling)  # 已弃用
         # app.setAttribute(Qt.AA_UseHighDpiPixmaps)    # 已弃用
         
-        # 创建并显示主窗口
-        main_window = ConfigUI()
-        main_window.show()
+        # 守护模式下关闭按需打开的配置界面后继续运行
+        if options.no_ui:
+            app.setQuitOnLastWindowClosed(False)
+        
+        # 先占用控制服务地址，两个实例同时启动时只保留一个
+        control_server = ControlServer(None)
+        if not control_server.start() and control_server.already_running:
+            forwarded = forward_to_running_instance(options)
+            sys.exit(0 if forwarded else 1)
+        
+        # 创建主窗口或守护控制器，并交给本地控制服务，供外部脚本切换预设、显示/隐藏准星
+        main_window = create_controller(options)
+        control_server.controller = main_window
+        
+        # 事件循环卡顿检测（需要用 --stall-threshold 启用；启动完成后开始，启动过程不算卡顿）
+        if options.stall_threshold and options.stall_threshold > 0:
+            import stall_watchdog_pyside6
+            stall_watchdog_pyside6.install(options.stall_threshold)
         
         # 运行应用程序
         sys.exit(app.exec())
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+准星矢量绘制函数
+
+这些函数只依赖传入的 QPainter，既可以在 OverlayWindow.paintEvent 中直接绘制，
+也可以在后台线程中绘制到 QImage 上（用于预渲染精灵图）。
+
+尺寸单位（配置中的 size_unit）：
+    logical     逻辑像素（默认），在缩放 150%/200% 的屏幕上按比例放大
+    physical    物理像素，在任何缩放比例下都是同样的像素数
+    screen      相对于 1080 像素高的屏幕，按屏幕高度等比例缩放
+绘制前先用 device_config 把尺寸换算为物理像素，几何计算都在物理像素中进行。
+
+shape 为 image 时绘制 PNG / SVG 图片（见 image_crosshair_pyside6），外观哈希中
+包含图片文件的版本标记，图片文件被替换后重新构建精灵图。
+
+配置中的 layers 是附加的准星图层（见 preset_schema），和主准星一起绘制在同一张
+精灵图中，覆盖层每次重绘仍然只拷贝一次图像，绘制成本不随图层数增加。
+"""
+
+import json
+import hashlib
+from PySide6.QtCore import Qt, QPoint
+from PySide6.QtGui import QPainter, QColor, QBrush, QPen, QPolygon, QImage
+
+from image_crosshair_pyside6 import draw_image, image_stamp
+
+
+# 影响准星外观的配置字段（位置不影响外观）
+RENDER_KEYS = (
+    "shape", "size", "thickness", "opacity", "color",
+    "hollow_gap", "hollow_length", "hollow_thickness", "center_dot_size",
+    "animation", "animation_frames", "animation_period", "animation_memory_mb",
+    "size_unit", "layers", "image", "image_tint",
+)
+
+# 以像素为单位、需要按尺寸单位换算的字段
+LENGTH_KEYS = ("size", "thickness", "hollow_gap", "hollow_length", "hollow_thickness", "center_dot_size")
+
+# size_unit 为 screen 时的参考屏幕高度
+REFERENCE_SCREEN_HEIGHT = 1080
+
+
+def config_hash(config):
+    """计算配置中外观相关字段的哈希值"""
+    render_state = {key: config.get(key) for key in RENDER_KEYS}
+    images = [layer.get("image") for layer, _ in crosshair_layers(config) if layer.get("shape") == "image"]
+    if images:
+        render_state["image_stamps"] = [image_stamp(path) for path in images]
+    data = json.dumps(render_state, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def device_scale(config, dpr=1.0, screen_height=REFERENCE_SCREEN_HEIGHT):
+    """配置中的长度换算为物理像素的比例
+
+    screen_height 为屏幕的逻辑高度。
+    """
+    unit = config.get("size_unit", "logical")
+    if unit == "physical":
+        return 1.0
+    if unit == "screen":
+        return screen_height * dpr / REFERENCE_SCREEN_HEIGHT
+    return dpr
+
+
+def device_config(config, dpr=1.0, screen_height=REFERENCE_SCREEN_HEIGHT):
+    """返回长度字段换算为物理像素（整数）后的配置副本"""
+    scale = device_scale(config, dpr, screen_height)
+    result = dict(config)
+    if scale == 1.0:
+        return result
+    for key in LENGTH_KEYS:
+        value = config.get(key)
+        if value is not None:
+            # 非零的长度至少保留 1 个物理像素
+            result[key] = max(1, int(round(value * scale))) if value else 0
+    if config.get("layers"):
+        result["layers"] = [_scale_layer(layer, scale) for layer in config["layers"]]
+    return result
+
+
+def _scale_layer(layer, scale):
+    """换算一个附加图层中写出的长度和偏移"""
+    result = dict(layer)
+    for key in LENGTH_KEYS:
+        value = layer.get(key)
+        if value is not None:
+            result[key] = max(1, int(round(value * scale))) if value else 0
+    offset = layer.get("offset")
+    if offset:
+        result["offset"] = {"x": int(round(offset["x"] * scale)), "y": int(round(offset["y"] * scale))}
+    return result
+
+
+def crosshair_layers(config):
+    """主准星和附加图层的列表 [(图层配置, (dx, dy))]
+
+    附加图层中没有写出的外观字段沿用主准星的值。
+    """
+    layers = [(config, (0, 0))]
+    for layer in config.get("layers") or ():
+        merged = dict(config)
+        merged.update(layer)
+        offset = layer.get("offset") or {}
+        layers.append((merged, (int(offset.get("x", 0)), int(offset.get("y", 0)))))
+    return layers
+
+
+def draw_cross(painter, center, size, thickness, color):
+    """绘制十字准星"""
+    painter.setPen(QPen(color, thickness))
+    painter.drawLine(center[0] - size, center[1], center[0] + size, center[1])  # 水平线
+    painter.drawLine(center[0], center[1] - size, center[0], center[1] + size)  # 垂直线
+
+
+def draw_dot(painter, center, size, color):
+    """绘制圆点准星"""
+    painter.setPen(QPen(color, 1))
+    painter.setBrush(QBrush(color))
+    painter.drawEllipse(center[0], center[1], size, size)
+
+
+def draw_square(painter, center, size, color):
+    """绘制方块准星"""
+    painter.setPen(QPen(color, 2))
+    painter.setBrush(QBrush(color))
+    painter.drawRect(center[0] - size//2, center[1] - size//2, size, size)
+
+
+def draw_circle(painter, center, size, color):
+    """绘制圆圈准星"""
+    painter.setPen(QPen(color, 2))
+    painter.setBrush(QBrush(Qt.transparent))
+    painter.drawEllipse(center[0], center[1], size, size)
+
+
+def draw_triangle(painter, center, size, color):
+    """绘制三角形准星"""
+    painter.setPen(QPen(color, 2))
+    painter.setBrush(QBrush(color))
+
+    # 计算三角形顶点
+    points = [
+        (center[0], center[1] - size),  # 顶点
+        (center[0] - size, center[1] + size),  # 左下角
+        (center[0] + size, center[1] + size)   # 右下角
+    ]
+
+    polygon = QPolygon([QPoint(p[0], p[1]) for p in points])
+    painter.drawPolygon(polygon)
+
+
+def draw_hollow_cross(painter, center, gap_size, line_length, line_thickness, color):
+    """绘制空心十字准星"""
+    painter.setPen(QPen(color, line_thickness))
+
+    # 绘制四段分离的直线
+    # 上半部分
+    painter.drawLine(center[0], center[1] - gap_size, center[0], center[1] - gap_size - line_length)
+    # 下半部分
+    painter.drawLine(center[0], center[1] + gap_size, center[0], center[1] + gap_size + line_length)
+    # 左半部分
+    painter.drawLine(center[0] - gap_size, center[1], center[0] - gap_size - line_length, center[1])
+    # 右半部分
+    painter.drawLine(center[0] + gap_size, center[1], center[0] + gap_size + line_length, center[1])
+
+
+def draw_hollow_square(painter, center, size, thickness, color):
+    """绘制空心方框准星"""
+    painter.setPen(QPen(color, thickness))
+    painter.setBrush(QBrush(Qt.transparent))
+    painter.drawRect(center[0] - size//2, center[1] - size//2, size, size)
+
+
+def draw_hollow_cross_dot(painter, center, gap_size, line_length, line_thickness, dot_size, color):
+    """绘制空心十字加中心点准星"""
+    # 先绘制空心十字
+    draw_hollow_cross(painter, center, gap_size, line_length, line_thickness, color)
+
+    # 再绘制中心点
+    painter.setPen(QPen(color, 1))
+    painter.setBrush(QBrush(color))
+    painter.drawEllipse(center[0], center[1], dot_size, dot_size)
+
+
+def draw_crosshair(painter, config, center, opacity_factor=1.0):
+    """根据配置绘制准星（包括所有附加图层）"""
+    for layer, (dx, dy) in crosshair_layers(config):
+        draw_shape(painter, layer, (center[0] + dx, center[1] + dy), opacity_factor)
+
+
+def draw_shape(painter, config, center, opacity_factor=1.0):
+    """绘制单个图层的准星"""
+    shape = config.get("shape", "cross")
+    size = config.get("size", 20)
+    thickness = config.get("thickness", 2)
+    opacity = config.get("opacity", 0.8)
+    color = config.get("color", "#FF0000")
+
+    # 设置颜色和透明度
+    qcolor = QColor(color)
+    qcolor.setAlphaF(max(0.0, min(1.0, opacity * opacity_factor)))
+
+    # 根据形状绘制准星
+    if shape == "cross":
+        draw_cross(painter, center, size, thickness, qcolor)
+    elif shape == "dot":
+        draw_dot(painter, center, size, qcolor)
+    elif shape == "square":
+        draw_square(painter, center, size, qcolor)
+    elif shape == "circle":
+        draw_circle(painter, center, size, qcolor)
+    elif shape == "triangle":
+        draw_triangle(painter, center, size, qcolor)
+    elif shape == "hollow_cross":
+        gap_size = config.get("hollow_gap", size // 3)
+        line_length = config.get("hollow_length", size)
+        line_thickness = config.get("hollow_thickness", thickness)
+        draw_hollow_cross(painter, center, gap_size, line_length, line_thickness, qcolor)
+    elif shape == "hollow_square":
+        draw_hollow_square(painter, center, size, thickness, qcolor)
+    elif shape == "hollow_cross_dot":
+        gap_size = config.get("hollow_gap", size // 3)
+        line_length = config.get("hollow_length", size)
+        line_thickness = config.get("hollow_thickness", thickness)
+        dot_size = config.get("center_dot_size", 3)
+        draw_hollow_cross_dot(painter, center, gap_size, line_length, line_thickness, dot_size, qcolor)
+    elif shape == "image":
+        # 图片无法使用时退回到十字准星
+        if not draw_image(painter, config, center, qcolor.alphaF()):
+            draw_cross(painter, center, size, thickness, qcolor)
+
+
+def crosshair_extent(config):
+    """计算准星（包括附加图层）相对中心点的最大绘制半径（单位与配置中的长度相同）"""
+    return max(shape_extent(layer) + max(abs(dx), abs(dy))
+               for layer, (dx, dy) in crosshair_layers(config))
+
+
+def shape_extent(config):
+    """单个图层相对自身中心的最大绘制半径"""
+    size = int(config.get("size", 20))
+    thickness = int(config.get("thickness", 2))
+    reach = max(
+        size,
+        int(config.get("hollow_gap", size // 3)) + int(config.get("hollow_length", size)),
+        int(config.get("center_dot_size", 3)),
+    )
+    pen = max(thickness, int(config.get("hollow_thickness", thickness)), 2)
+    return reach + pen + 2
+
+
+def render_sprite(config, extent=None, scale=1.0, angle=0.0, opacity_factor=1.0):
+    """将准星绘制到一张以中心点为原点的透明 QImage 上
+
+    返回 (image, extent)，准星中心位于图像的 (extent, extent)。
+    该函数不访问任何窗口对象，可以在后台线程中调用。
+    """
+    if extent is None:
+        extent = crosshair_extent(config)
+    side = extent * 2 + 1
+    image = QImage(side, side, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.translate(extent, extent)
+    if angle:
+        painter.rotate(angle)
+    if scale != 1.0:
+        painter.scale(scale, scale)
+    draw_crosshair(painter, config, (0, 0), opacity_factor)
+    painter.end()
+    return image, extent
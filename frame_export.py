@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+准星画面导出（共享内存环形缓冲区）
+
+直播时需要把准星作为 OBS 场景中单独的图层，截取全屏半透明覆盖层既耗资源
+又有损失。导出模式下覆盖层把准星所在的固定大小区域直接绘制到共享内存中的
+一个槽位（QImage 直接引用槽位内存，没有额外拷贝），录制或合成程序从最新的
+槽位读取 RGBA 像素。
+
+布局（小端）：
+    文件头（64 字节）
+        0   4s  magic "CHFX"
+        4   H   版本
+        6   H   槽位数
+        8   I   宽（物理像素）
+        12  I   高
+        16  I   每行字节数
+        20  I   像素格式（1 = RGBA8888，预乘 alpha）
+        24  Q   最新的帧序号（0 表示还没有帧）
+        32  I   最新帧所在的槽位
+        36  I   每个槽位的字节数（槽位头 + 像素，按 64 字节对齐）
+        40  24x 保留
+    槽位 i 位于 64 + i * 槽位字节数
+        0   Q   顺序计数器：写入中为 2n-1，帧 n 写完后为 2n
+        8   d   写完的时间（time.time()）
+        16  i   准星中心在屏幕上的 x（物理像素）
+        20  i   准星中心在屏幕上的 y
+        24  8x  保留
+        32      像素（高 x 每行字节数）
+
+写入端轮流使用各个槽位，读取端读取最新的槽位，读取前后比较顺序计数器，
+被改写时丢弃这次读取（撕裂读取）。
+
+作为脚本运行时是一个参考读取端：
+    python frame_export.py --name obs --duration 10 --save crosshair.pam
+"""
+
+import os
+import sys
+import mmap
+import time
+import struct
+import tempfile
+import argparse
+
+from live_params import check_block_name
+
+
+MAGIC = b"CHFX"
+VERSION = 1
+FORMAT_RGBA8888_PREMULTIPLIED = 1
+
+HEADER_SIZE = 64
+SLOT_HEADER_SIZE = 32
+DEFAULT_SLOTS = 3
+DEFAULT_SIZE = 256
+
+# 导出模式：every 每次绘制都导出，changes 只导出画面有变化的帧
+EXPORT_MODES = ["changes", "every"]
+
+_HEADER = struct.Struct("<4sHHIIII")
+_LATEST = struct.Struct("<QI")
+_SLOT_SIZE = struct.Struct("<I")
+_SLOT = struct.Struct("<Qdii")
+_SEQ = struct.Struct("<Q")
+_LATEST_OFFSET = 24
+_SLOT_SIZE_OFFSET = 36
+
+
+def ring_path(name):
+    """缓冲区在非 Windows 平台上的文件路径（名称规则与实时参数块相同）"""
+    check_block_name(name)
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, f"crosshair-frames-{name}")
+
+
+def ring_layout(width, height, slots):
+    """(每行字节数, 每个槽位的字节数, 总字节数)"""
+    stride = width * 4
+    slot_size = (SLOT_HEADER_SIZE + stride * height + 63) // 64 * 64
+    return stride, slot_size, HEADER_SIZE + slot_size * slots
+
+
+def open_ring(name, size, create=False):
+    """打开指定名称的缓冲区，返回 mmap 对象；名称不合法时抛出 ValueError"""
+    check_block_name(name)
+    if sys.platform == "win32":
+        return mmap.mmap(-1, size, tagname=f"CrosshairFrames-{name}")
+    flags = os.O_RDWR | (os.O_CREAT if create else 0)
+    fd = os.open(ring_path(name), flags, 0o600)
+    try:
+        if create and os.fstat(fd).st_size != size:
+            os.ftruncate(fd, size)
+        return mmap.mmap(fd, size)
+    finally:
+        os.close(fd)
+
+
+class FrameExportWriter:
+    """缓冲区写入端（覆盖层）"""
+
+    def __init__(self, name, width=DEFAULT_SIZE, height=DEFAULT_SIZE, slots=DEFAULT_SLOTS, mode="changes"):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.slots = slots
+        self.mode = mode
+        self.stride, self.slot_size, size = ring_layout(width, height, slots)
+        self.buffer = open_ring(name, size, create=True)
+        self.view = memoryview(self.buffer)
+        self.frame = 0
+        self.slot = None
+
+        _LATEST.pack_into(self.buffer, _LATEST_OFFSET, 0, 0)
+        _SLOT_SIZE.pack_into(self.buffer, _SLOT_SIZE_OFFSET, self.slot_size)
+        for slot in range(slots):
+            _SEQ.pack_into(self.buffer, self.slot_offset(slot), 0)
+        _HEADER.pack_into(self.buffer, 0, MAGIC, VERSION, slots, width, height, self.stride,
+                          FORMAT_RGBA8888_PREMULTIPLIED)
+
+    def slot_offset(self, slot):
+        return HEADER_SIZE + slot * self.slot_size
+
+    def begin_frame(self):
+        """开始写入下一帧，返回下一个槽位像素区域的可写内存视图"""
+        self.frame += 1
+        self.slot = self.frame % self.slots
+        offset = self.slot_offset(self.slot)
+        _SEQ.pack_into(self.buffer, offset, 2 * self.frame - 1)
+        pixels = offset + SLOT_HEADER_SIZE
+        return self.view[pixels:pixels + self.stride * self.height]
+
+    def commit_frame(self, x=0, y=0):
+        """当前帧写完，发布为最新帧；x, y 为准星中心在屏幕上的位置"""
+        offset = self.slot_offset(self.slot)
+        _SLOT.pack_into(self.buffer, offset, 2 * self.frame, time.time(), x, y)
+        _LATEST.pack_into(self.buffer, _LATEST_OFFSET, self.frame, self.slot)
+
+    def close(self):
+        self.view.release()
+        self.buffer.close()
+
+
+class ExportedFrame:
+    """读取到的一帧"""
+
+    __slots__ = ("number", "timestamp", "x", "y", "width", "height", "stride", "pixels")
+
+    def __init__(self, number, timestamp, x, y, width, height, stride, pixels):
+        self.number = number
+        self.timestamp = timestamp
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.stride = stride
+        self.pixels = pixels
+
+
+class FrameExportReader:
+    """缓冲区读取端（录制、合成程序）"""
+
+    def __init__(self, name):
+        self.name = name
+        header = open_ring(name, HEADER_SIZE)
+        magic, version, self.slots, self.width, self.height, self.stride, self.format = \
+            _HEADER.unpack_from(header, 0)
+        slot_size = _SLOT_SIZE.unpack_from(header, _SLOT_SIZE_OFFSET)[0]
+        header.close()
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{name} 不是准星画面缓冲区或版本不同")
+        self.slot_size = slot_size
+        self.buffer = open_ring(name, HEADER_SIZE + slot_size * self.slots)
+        self.last_frame = 0
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.torn_reads = 0
+
+    def read_latest(self):
+        """读取最新的一帧，没有新帧或读取时被改写返回 None"""
+        buffer = self.buffer
+        latest, slot = _LATEST.unpack_from(buffer, _LATEST_OFFSET)
+        if latest == self.last_frame or slot >= self.slots:
+            return None
+        offset = HEADER_SIZE + slot * self.slot_size
+        seq = _SEQ.unpack_from(buffer, offset)[0]
+        if seq & 1:
+            self.torn_reads += 1
+            return None
+        _, timestamp, x, y = _SLOT.unpack_from(buffer, offset)
+        pixels = offset + SLOT_HEADER_SIZE
+        data = buffer[pixels:pixels + self.stride * self.height]
+        if _SEQ.unpack_from(buffer, offset)[0] != seq:
+            self.torn_reads += 1
+            return None
+
+        number = seq // 2
+        if self.last_frame and number > self.last_frame + 1:
+            self.frames_dropped += number - self.last_frame - 1
+        self.last_frame = number
+        self.frames_read += 1
+        return ExportedFrame(number, timestamp, x, y, self.width, self.height, self.stride, data)
+
+    def close(self):
+        self.buffer.close()
+
+
+def write_pam(path, frame):
+    """把一帧保存为 PAM 图像（RGB_ALPHA，取消预乘）"""
+    data = bytearray(frame.pixels)
+    for i in range(0, len(data), 4):
+        alpha = data[i + 3]
+        if 0 < alpha < 255:
+            data[i] = min(255, data[i] * 255 // alpha)
+            data[i + 1] = min(255, data[i + 1] * 255 // alpha)
+            data[i + 2] = min(255, data[i + 2] * 255 // alpha)
+    with open(path, "wb") as f:
+        f.write(f"P7\nWIDTH {frame.width}\nHEIGHT {frame.height}\nDEPTH 4\nMAXVAL 255\n"
+                f"TUPLTYPE RGB_ALPHA\nENDHDR\n".encode("ascii"))
+        f.write(data)
+
+
+def main(argv=None):
+    """参考读取端：轮询最新帧并统计帧率"""
+    parser = argparse.ArgumentParser(description="准星画面导出参考读取端")
+    parser.add_argument("--name", default="default", help="缓冲区名称（与 --export-frames 一致）")
+    parser.add_argument("--duration", type=float, default=10.0, help="运行时间（秒）")
+    parser.add_argument("--hz", type=float, default=240.0, help="轮询频率")
+    parser.add_argument("--save", default=None, help="把最后一帧保存为 PAM 图像")
+    options = parser.parse_args(argv)
+
+    try:
+        reader = FrameExportReader(options.name)
+    except (OSError, ValueError) as e:
+        print(f"打开缓冲区失败: {e}")
+        return 1
+    print(f"{options.name}: {reader.width}x{reader.height} RGBA，{reader.slots} 个槽位")
+
+    interval = 1.0 / options.hz
+    start = time.perf_counter()
+    last = None
+    while time.perf_counter() - start < options.duration:
+        frame = reader.read_latest()
+        if frame is not None:
+            last = frame
+        time.sleep(interval)
+    elapsed = time.perf_counter() - start
+
+    print(f"读取 {reader.frames_read} 帧（{reader.frames_read / elapsed:.1f} FPS），"
+          f"丢弃 {reader.frames_dropped} 帧，撕裂读取 {reader.torn_reads} 次")
+    if last is not None:
+        print(f"最后一帧 #{last.number}，准星位于 ({last.x}, {last.y})，"
+              f"延迟 {(time.time() - last.timestamp) * 1000:.1f} ms")
+        if options.save:
+            write_pam(options.save, last)
+            print(f"已保存到 {options.save}")
+    reader.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
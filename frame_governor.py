@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+覆盖层重绘帧率调节器
+
+根据当前需求选择重绘帧率：
+- off:    覆盖层隐藏，不重绘
+- static: 静态准星，0 FPS，只在配置或位置变化时重绘
+- active: 拖动、动画播放或外部实时参数输入中，使用显示器刷新率（受电源模式上限限制）
+- idle:   动画在空闲超时后降低到电源模式的空闲帧率
+
+调节器本身不依赖 Qt，只负责决策和统计，由 OverlayWindow 把结果应用到定时器上。
+"""
+
+import time
+
+
+MODES = ["off", "static", "active", "idle"]
+
+# 电源模式: (活动帧率上限, 空闲帧率上限)，None 表示不限制
+POWER_PROFILES = {
+    "performance": (None, None),
+    "balanced": (None, 30),
+    "battery": (30, 15),
+}
+DEFAULT_POWER_PROFILE = "balanced"
+DEFAULT_IDLE_TIMEOUT_MS = 3000
+
+
+class FrameGovernor:
+    """根据覆盖层状态计算重绘模式和帧率，并统计各模式的停留时间"""
+
+    def __init__(self, display_rate=60.0, profile=DEFAULT_POWER_PROFILE,
+                 idle_timeout_ms=DEFAULT_IDLE_TIMEOUT_MS, clock=time.monotonic):
+        self.clock = clock
+        self.display_rate = display_rate if display_rate and display_rate > 0 else 60.0
+        self.profile = profile if profile in POWER_PROFILES else DEFAULT_POWER_PROFILE
+        self.idle_timeout_ms = idle_timeout_ms
+
+        self.visible = False
+        self.drag_mode = False
+        self.animation_rate = None  # 动画需要的帧率，None 表示静态准星
+        self.external = False  # 是否需要每帧轮询外部实时参数
+        self.idle = False
+
+        self.mode = "off"
+        self.fps = 0.0
+        self.mode_time = {mode: 0.0 for mode in MODES}
+        self._mode_since = self.clock()
+
+    def set_display_rate(self, rate):
+        """设置显示器刷新率"""
+        if rate and rate > 0:
+            self.display_rate = rate
+
+    def set_profile(self, profile):
+        """设置电源模式"""
+        self.profile = profile if profile in POWER_PROFILES else DEFAULT_POWER_PROFILE
+
+    def set_visible(self, visible):
+        """覆盖层显示/隐藏"""
+        self.visible = visible
+        self.idle = False
+
+    def set_drag_mode(self, drag_mode):
+        """进入/退出拖动模式"""
+        self.drag_mode = drag_mode
+        self.idle = False
+
+    def set_animation_rate(self, rate):
+        """设置动画需要的帧率，静态准星传入 None"""
+        self.animation_rate = rate
+        self.idle = False
+
+    def set_external(self, external):
+        """连接/断开外部实时参数输入"""
+        self.external = external
+        self.idle = False
+
+    def touch(self):
+        """记录一次交互（拖动、配置变化），退出空闲状态"""
+        self.idle = False
+
+    def mark_idle(self):
+        """空闲超时"""
+        self.idle = True
+
+    def _cap(self, rate, cap):
+        return rate if cap is None else min(rate, cap)
+
+    def evaluate(self):
+        """重新计算模式和帧率，返回 (mode, fps)"""
+        active_cap, idle_cap = POWER_PROFILES[self.profile]
+        if not self.visible:
+            mode, fps = "off", 0.0
+        elif self.animation_rate is None and not self.external and (not self.drag_mode or self.idle):
+            mode, fps = "static", 0.0
+        elif not self.idle:
+            rate = self.display_rate
+            if self.animation_rate is not None and not self.drag_mode and not self.external:
+                rate = min(rate, self.animation_rate)
+            mode, fps = "active", self._cap(rate, active_cap)
+        else:
+            rate = self.display_rate
+            if self.animation_rate is not None and not self.external:
+                rate = min(rate, self.animation_rate)
+            mode, fps = "idle", self._cap(self._cap(rate, active_cap), idle_cap)
+        self._switch(mode, fps)
+        return self.mode, self.fps
+
+    def _switch(self, mode, fps):
+        """切换模式并累计上一个模式的停留时间"""
+        now = self.clock()
+        self.mode_time[self.mode] += now - self._mode_since
+        self._mode_since = now
+        self.mode = mode
+        self.fps = fps
+
+    def stats(self):
+        """返回当前模式、帧率和各模式累计停留时间（秒）"""
+        now = self.clock()
+        mode_time = dict(self.mode_time)
+        mode_time[self.mode] += now - self._mode_since
+        return {
+            "mode": self.mode,
+            "fps": self.fps,
+            "profile": self.profile,
+            "mode_time": mode_time,
+        }
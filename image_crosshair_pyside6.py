@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PNG / SVG 图片准星
+
+shape 为 image 的预设（或图层）用 image 字段引用一张 PNG 或 SVG 图片。图片按
+准星的显示边长（2 * size + 1 物理像素）和染色颜色栅格化一次，放入有内存上限的
+缓存；准星精灵图本身仍由图集缓存按外观哈希和 DPR 缓存，覆盖层每帧只拷贝一次
+精灵图，不会重复解析或渲染 SVG。
+
+image_tint 为 color 时保留图片的 alpha，用准星的 color 染色；为 none 时保持
+图片原来的颜色。
+
+导入图片时先检查扩展名、文件大小和像素尺寸，再复制到预设文件夹的 images/ 中。
+无法使用的图片在绘制时退回到十字准星。
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QColor, QImage, QImageReader, QPainter
+from PySide6.QtSvg import QSvgRenderer
+
+from preset_schema import IMAGE_EXTENSIONS
+
+
+# 导入和绘制时的上限：文件大小、PNG 的像素边长
+MAX_FILE_BYTES = 2 * 1024 * 1024
+MAX_SOURCE_SIDE = 2048
+
+# 栅格化结果的缓存上限
+RASTER_CACHE_BYTES = 8 * 1024 * 1024
+
+IMAGE_DIR_NAME = "images"
+
+
+def image_stamp(path):
+    """图片文件的版本标记 (修改时间, 大小)，文件不存在时返回 None"""
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def validate_image(path):
+    """检查图片能否作为准星使用，返回问题说明，可以使用时返回 None"""
+    if not isinstance(path, str) or not path:
+        return "没有指定图片"
+    if os.path.splitext(path)[1].lower() not in IMAGE_EXTENSIONS:
+        return f"{path}: 只支持 PNG 和 SVG 图片"
+    try:
+        size = os.path.getsize(path)
+    except OSError as e:
+        return f"{path}: 无法读取 ({e})"
+    if size > MAX_FILE_BYTES:
+        return f"{path}: 文件大小 {size} 字节超过上限 {MAX_FILE_BYTES}"
+    if path.lower().endswith(".svg"):
+        renderer = QSvgRenderer(path)
+        if not renderer.isValid():
+            return f"{path}: 不是有效的 SVG 图片"
+        if renderer.defaultSize().isEmpty() and renderer.viewBoxF().isEmpty():
+            return f"{path}: SVG 图片没有尺寸"
+        return None
+    reader = QImageReader(path)
+    if not reader.canRead():
+        return f"{path}: 不是有效的 PNG 图片"
+    dimensions = reader.size()
+    if dimensions.width() > MAX_SOURCE_SIDE or dimensions.height() > MAX_SOURCE_SIDE:
+        return f"{path}: 图片尺寸 {dimensions.width()}x{dimensions.height()} 超过上限 {MAX_SOURCE_SIDE}"
+    return None
+
+
+def import_image(path, directory):
+    """检查图片并复制到 directory/images/ 中，返回复制后的路径；图片无法使用时抛出 ValueError"""
+    issue = validate_image(path)
+    if issue:
+        raise ValueError(issue)
+    target_dir = os.path.join(directory, IMAGE_DIR_NAME)
+    os.makedirs(target_dir, exist_ok=True)
+    target = os.path.join(target_dir, os.path.basename(path))
+    if os.path.abspath(path) == os.path.abspath(target):
+        return target
+    fd, temp_path = tempfile.mkstemp(dir=target_dir, suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(path, temp_path)
+        os.replace(temp_path, target)
+    except OSError:
+        os.remove(temp_path)
+        raise
+    return target
+
+
+def rasterize(path, side, color=None):
+    """把图片按比例缩放到 side x side 的透明图像中央，color 不为空时用该颜色染色
+
+    图片无法使用时返回 None。可以在后台线程中调用。
+    """
+    if validate_image(path):
+        return None
+    image = QImage(side, side, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setRenderHint(QPainter.SmoothPixmapTransform)
+    if path.lower().endswith(".svg"):
+        renderer = QSvgRenderer(path)
+        size = renderer.defaultSize()
+        width, height = (size.width(), size.height()) if not size.isEmpty() else \
+            (renderer.viewBoxF().width(), renderer.viewBoxF().height())
+        renderer.render(painter, _fit(width, height, side))
+    else:
+        source = QImageReader(path).read()
+        if source.isNull():
+            painter.end()
+            return None
+        painter.drawImage(_fit(source.width(), source.height(), side), source)
+    if color is not None:
+        # 只保留图片的 alpha，颜色换成准星颜色
+        painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
+        painter.fillRect(image.rect(), QColor(color))
+    painter.end()
+    return image
+
+
+def _fit(width, height, side):
+    """保持宽高比放进 side x side 的正方形中央"""
+    scale = side / max(width, height, 1e-6)
+    w, h = width * scale, height * scale
+    return QRectF((side - w) / 2, (side - h) / 2, w, h)
+
+
+class RasterCache:
+    """按 (路径, 版本标记, 边长, 染色) 缓存栅格化的图片，超出内存上限时淘汰最久未使用的图片"""
+
+    def __init__(self, max_bytes=RASTER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.rasterized = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, side, color=None):
+        """栅格化后的图片，图片无法使用时返回 None"""
+        path = os.path.abspath(path)
+        key = (path, image_stamp(path), side, color)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                return image
+        image = rasterize(path, side, color)
+        if image is None:
+            return None
+        with self._lock:
+            self.rasterized += 1
+            if key not in self._images:
+                self._images[key] = image
+                self.total_bytes += image.sizeInBytes()
+            while self.total_bytes > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self.total_bytes -= evicted.sizeInBytes()
+        return image
+
+    def __len__(self):
+        return len(self._images)
+
+
+# 所有窗口和后台构建线程共用的缓存
+raster_cache = RasterCache()
+
+
+def draw_image(painter, config, center, opacity):
+    """绘制图片准星，图片无法使用时返回 False"""
+    size = int(config.get("size", 20))
+    side = size * 2 + 1
+    color = config.get("color", "#FF0000") if config.get("image_tint", "none") == "color" else None
+    image = raster_cache.get(config.get("image") or "", side, color)
+    if image is None:
+        return False
+    painter.save()
+    painter.setOpacity(opacity)
+    painter.setRenderHint(QPainter.SmoothPixmapTransform)  # 动画帧缩放、旋转时平滑
+    painter.drawImage(center[0] - size, center[1] - size, image)
+    painter.restore()
+    return True
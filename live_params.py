@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+共享内存实时参数块
+
+外部遥测工具以 240 Hz 以上的频率写入准星大小、间距、颜色等参数，覆盖层每帧
+轮询一次。参数块是固定布局的 64 字节共享内存，用顺序计数器（seqlock）保证
+读取一致性：写入前后各把计数器加一，计数器为奇数表示正在写入。
+
+读取端没有锁、不解析 JSON，计数器未变化时只读取 4 个字节。
+
+布局（小端）：
+    0   4s  magic "CHLP"
+    4   H   版本
+    6   H   有效字段掩码（FIELD_*）
+    8   I   顺序计数器
+    12  i   size
+    16  i   hollow_gap
+    20  i   thickness
+    24  i   hollow_length
+    28  I   color (0xRRGGBB)
+    32  f   opacity
+    36  28x 保留
+
+参数块名称来自预设或控制命令，只允许字母、数字、下划线和连字符（最长 64 个
+字符），不能用来在共享内存目录之外创建文件。
+
+作为脚本运行时是一个参考写入端，让准星大小随时间“呼吸”：
+    python live_params.py --name spread --hz 240 --duration 10
+"""
+
+import os
+import re
+import sys
+import math
+import mmap
+import time
+import struct
+import tempfile
+import argparse
+
+
+MAGIC = b"CHLP"
+VERSION = 1
+BLOCK_SIZE = 64
+
+FIELD_SIZE = 1
+FIELD_GAP = 2
+FIELD_THICKNESS = 4
+FIELD_LENGTH = 8
+FIELD_COLOR = 16
+FIELD_OPACITY = 32
+
+# (掩码, 配置字段名, 在数据元组中的位置)
+FIELDS = (
+    (FIELD_SIZE, "size", 0),
+    (FIELD_GAP, "hollow_gap", 1),
+    (FIELD_THICKNESS, "thickness", 2),
+    (FIELD_LENGTH, "hollow_length", 3),
+    (FIELD_COLOR, "color", 4),
+    (FIELD_OPACITY, "opacity", 5),
+)
+
+_HEADER = struct.Struct("<4sHH")
+_SEQ = struct.Struct("<I")
+_DATA = struct.Struct("<iiiiIf")
+_SEQ_OFFSET = 8
+_DATA_OFFSET = 12
+
+# 合法的参数块名称
+BLOCK_NAME_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+def check_block_name(name):
+    """检查参数块名称，不合法时抛出 ValueError"""
+    if not isinstance(name, str) or not BLOCK_NAME_PATTERN.fullmatch(name):
+        raise ValueError(f"参数块名称 {name!r} 只能包含字母、数字、下划线和连字符（最长 64 个字符）")
+    return name
+
+
+def block_path(name):
+    """参数块在非 Windows 平台上的文件路径"""
+    check_block_name(name)
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, f"crosshair-live-{name}")
+
+
+def open_block(name):
+    """打开（不存在时创建）指定名称的参数块，返回 mmap 对象"""
+    check_block_name(name)
+    if sys.platform == "win32":
+        return mmap.mmap(-1, BLOCK_SIZE, tagname=f"CrosshairLive-{name}")
+    fd = os.open(block_path(name), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if os.fstat(fd).st_size < BLOCK_SIZE:
+            os.ftruncate(fd, BLOCK_SIZE)
+        return mmap.mmap(fd, BLOCK_SIZE)
+    finally:
+        os.close(fd)
+
+
+class LiveParamsWriter:
+    """参数块写入端"""
+
+    def __init__(self, name):
+        self.name = name
+        self.buffer = open_block(name)
+        self.values = [0, 0, 0, 0, 0, 1.0]
+        self.mask = 0
+        self.seq = _SEQ.unpack_from(self.buffer, _SEQ_OFFSET)[0] & ~1
+        _HEADER.pack_into(self.buffer, 0, MAGIC, VERSION, 0)
+
+    def write(self, size=None, hollow_gap=None, thickness=None, hollow_length=None,
+              color=None, opacity=None):
+        """写入一组参数，未传入的字段保持上一次的值"""
+        for index, value in enumerate((size, hollow_gap, thickness, hollow_length, color, opacity)):
+            if value is not None:
+                if index == 4 and isinstance(value, str):
+                    value = int(value.lstrip("#"), 16)
+                self.values[index] = value
+                self.mask |= FIELDS[index][0]
+
+        buffer = self.buffer
+        self.seq += 1  # 奇数：正在写入
+        _SEQ.pack_into(buffer, _SEQ_OFFSET, self.seq & 0xFFFFFFFF)
+        _HEADER.pack_into(buffer, 0, MAGIC, VERSION, self.mask)
+        _DATA.pack_into(buffer, _DATA_OFFSET, *self.values)
+        self.seq += 1  # 偶数：写入完成
+        _SEQ.pack_into(buffer, _SEQ_OFFSET, self.seq & 0xFFFFFFFF)
+
+    def close(self):
+        self.buffer.close()
+
+
+class LiveParamsReader:
+    """参数块读取端，供覆盖层每帧轮询"""
+
+    def __init__(self, name):
+        self.name = name
+        self.buffer = open_block(name)
+        self.last_seq = None
+        self.torn_reads = 0
+
+    def poll(self):
+        """读取新的参数
+
+        计数器没有变化时返回 None；否则返回 (mask, values)，values 依次为
+        size, hollow_gap, thickness, hollow_length, color, opacity。
+        """
+        buffer = self.buffer
+        seq = _SEQ.unpack_from(buffer, _SEQ_OFFSET)[0]
+        if seq == self.last_seq or seq & 1:
+            return None
+        magic, version, mask = _HEADER.unpack_from(buffer, 0)
+        values = _DATA.unpack_from(buffer, _DATA_OFFSET)
+        if _SEQ.unpack_from(buffer, _SEQ_OFFSET)[0] != seq:
+            # 读取过程中被改写，下一帧再读
+            self.torn_reads += 1
+            return None
+        self.last_seq = seq
+        if magic != MAGIC or version != VERSION or not mask:
+            return None
+        return mask, values
+
+    def close(self):
+        self.buffer.close()
+
+
+def apply_values(target, mask, values):
+    """把读取到的参数写入配置字典"""
+    for bit, key, index in FIELDS:
+        if mask & bit:
+            value = values[index]
+            if bit == FIELD_COLOR:
+                value = f"#{value & 0xFFFFFF:06X}"
+            elif bit == FIELD_OPACITY:
+                value = round(value, 3)
+            target[key] = value
+
+
+def main(argv=None):
+    """参考写入端：以固定频率写入随时间变化的准星大小"""
+    parser = argparse.ArgumentParser(description="实时参数块参考写入端")
+    parser.add_argument("--name", default="default", help="参数块名称（与配置中的 live_params 一致）")
+    parser.add_argument("--hz", type=float, default=240.0, help="写入频率")
+    parser.add_argument("--duration", type=float, default=10.0, help="运行时间（秒）")
+    parser.add_argument("--min-size", type=int, default=10)
+    parser.add_argument("--max-size", type=int, default=40)
+    options = parser.parse_args(argv)
+
+    writer = LiveParamsWriter(options.name)
+    interval = 1.0 / options.hz
+    start = time.perf_counter()
+    next_time = start
+    writes = 0
+    while True:
+        now = time.perf_counter()
+        elapsed = now - start
+        if elapsed >= options.duration:
+            break
+        phase = 0.5 + 0.5 * math.sin(elapsed * 2 * math.pi)
+        size = int(options.min_size + (options.max_size - options.min_size) * phase)
+        writer.write(size=size, hollow_gap=size // 3)
+        writes += 1
+        next_time += interval
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    writer.close()
+    print(f"写入 {writes} 次，平均 {writes / options.duration:.1f} Hz")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+无界面守护模式
+
+只加载一个预设并运行 OverlayWindow，不创建 ConfigUI（以及它的双语字符串表和
+大量控件）。配置界面在收到 open_ui 命令时才按需创建，之后所有操作都交给界面处理。
+
+OverlayDaemon 提供和 ConfigUI 相同的控制器接口，可以直接交给 ControlServer 使用。
+当前预设文件被外部修改时自动重新加载（见 preset_watcher_pyside6）。
+"""
+
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtWidgets import QApplication
+
+from preset_cache import PresetCache
+from preset_io import default_storage
+from preset_schema import SCHEMA
+from preset_watcher_pyside6 import PresetWatcher, changed_fields
+
+
+class OverlayDaemon(QObject):
+    """只运行准星覆盖层的控制器"""
+
+    def __init__(self, preset_name="default", storage=None, parent=None):
+        super().__init__(parent)
+        self.storage = storage or default_storage()
+        self.preset_name = preset_name
+        # 热键或控制命令来回切换预设时使用缓存，并在后台预取相邻的预设
+        self.preset_cache = PresetCache(self.storage)
+        self.config = self.read_preset(preset_name)
+        self._overlay_window = None
+        self.is_shown = False
+        self.ui = None
+        self.quitting = False
+        # 画面导出参数 (名称, 模式, 边长)，见 OverlayWindow.set_frame_export
+        self.frame_export = None
+
+        self.preset_watcher = PresetWatcher(self)
+        self.preset_watcher.reloaded.connect(self.on_preset_file_changed)
+        self.preset_watcher.watch(self.storage, preset_name)
+
+    @property
+    def overlay_window(self):
+        """当前的覆盖层窗口（界面打开后由界面管理）"""
+        if self.ui is not None:
+            return self.ui.overlay_window
+        return self._overlay_window
+
+    def show_crosshair(self):
+        """显示准星"""
+        if self.ui is not None:
+            return self.ui.show_crosshair()
+        if self._overlay_window is None:
+            from overlay_window_pyside6 import OverlayWindow
+            from sprite_cache_pyside6 import sprite_cache_dir
+            self._overlay_window = OverlayWindow(self.config, sprite_cache_dir(self.storage))
+            if self.frame_export:
+                self._overlay_window.set_frame_export(*self.frame_export)
+
+        self._overlay_window.showFullScreen()
+        self._overlay_window.updateConfig(self.config)
+        self.is_shown = True
+
+    def hide_crosshair(self):
+        """隐藏准星"""
+        if self.ui is not None:
+            return self.ui.hide_crosshair()
+        if self._overlay_window:
+            self._overlay_window.hide()
+        self.is_shown = False
+
+    def center_crosshair(self):
+        """将准星居中"""
+        if self.ui is not None:
+            return self.ui.center_crosshair()
+        self.config["position"] = {"x": "center", "y": "center"}
+        if self._overlay_window:
+            self._overlay_window.center_crosshair()
+
+    def apply_preset(self, preset_name):
+        """加载预设，成功返回 True"""
+        if self.ui is not None:
+            return self.ui.apply_preset(preset_name)
+        if not self.storage.exists(preset_name):
+            return False
+        self.config = self.read_preset(preset_name)
+        self.preset_name = preset_name
+        self.preset_watcher.watch(self.storage, preset_name)
+        if self._overlay_window:
+            self._overlay_window.updateConfig(self.config)
+        return True
+
+    def read_preset(self, preset_name):
+        """读取预设（优先使用缓存），并预取按名称排序相邻的预设"""
+        config = self.preset_cache.get(preset_name)
+        self.preset_cache.prefetch_neighbors(preset_name)
+        return config
+
+    def on_preset_file_changed(self, config):
+        """预设文件被外部修改：只应用变化的字段，不隐藏窗口"""
+        changes = changed_fields(self.config, config)
+        if self.ui is not None or not changes:
+            return
+        self.config.update(changes)
+        if self._overlay_window:
+            self._overlay_window.updateConfig(self.config)
+        self.preset_watcher.applied(self._overlay_window)
+
+    def set_config_field(self, key, value):
+        """修改一个配置字段并应用到准星"""
+        if self.ui is not None:
+            return self.ui.set_config_field(key, value)
+        self.config[key] = SCHEMA.coerce_field(key, value)
+        if self._overlay_window:
+            self._overlay_window.updateConfig(self.config)
+
+    def apply_config(self, config):
+        """用配置快照替换当前配置"""
+        if self.ui is not None:
+            return self.ui.apply_config(config)
+        self.config = config
+        if self._overlay_window:
+            self._overlay_window.updateConfig(self.config)
+    
+    def set_drag_mode(self, enabled):
+        """进入 / 退出拖动模式，返回当前是否处于拖动模式"""
+        if self.ui is not None:
+            return self.ui.set_drag_mode(enabled)
+        overlay = self._overlay_window
+        if overlay is None or not self.is_shown:
+            return False
+        if overlay.is_drag_mode != enabled:
+            overlay.toggleDragMode()
+        return overlay.is_drag_mode
+    
+    def quit_app(self):
+        """退出程序（先回复命令，再退出事件循环）"""
+        self.quitting = True
+        if self.ui is not None:
+            self.ui.close()
+        if self._overlay_window:
+            self._overlay_window.close()
+        QTimer.singleShot(0, QApplication.quit)
+    
+    def get_state(self):
+        """获取当前状态"""
+        if self.ui is not None:
+            return self.ui.get_state()
+        state = {
+            "shown": self.is_shown,
+            "preset": self.preset_name,
+            "config": self.config,
+            "hot_reload": self.preset_watcher.stats(),
+            "preset_cache": self.preset_cache.stats(),
+        }
+        if self._overlay_window:
+            state["position"] = list(self._overlay_window.get_crosshair_position())
+            state["drag_mode"] = self._overlay_window.is_drag_mode
+            state["governor"] = self._overlay_window.governor_stats()
+            state["updates"] = dict(self._overlay_window.update_stats)
+            state["adaptive_color"] = self._overlay_window.adaptive_color_stats()
+            state["scope"] = self._overlay_window.scope_stats()
+        return state
+
+    def open_ui(self):
+        """按需创建配置界面，并把当前的覆盖层交给界面管理"""
+        if self.ui is None:
+            from config_ui_pyside6 import ConfigUI
+            ui = ConfigUI(self.storage, auto_show=False)
+            ui.keep_overlay_on_close = True
+            ui.overlay_window = self._overlay_window
+            ui.is_shown = self.is_shown
+            if self.is_shown:
+                ui.show_button.setText(ui.t("hide_crosshair"))
+            # 先选中预设，再套用守护模式下修改过的配置
+            ui.apply_preset(self.preset_name)
+            ui.apply_config(self.config)
+            self.ui = ui
+            self.preset_watcher.stop()  # 之后由界面监视预设文件
+        self.ui.open_ui()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+覆盖层进程隔离
+
+配置界面和覆盖层在同一个 GUI 线程中运行时，模态对话框（QMessageBox、QColorDialog）
+和慢速磁盘读写都会阻塞准星的绘制。隔离模式（--isolate-overlay）下覆盖层运行在
+独立的子进程中：
+
+    界面进程    RemoteOverlay 代替 OverlayWindow，把配置快照和显示/隐藏等命令
+                通过本地控制协议发给子进程，只保留最新的一份未发送快照
+    子进程      OverlayHost 运行 OverlayDaemon 和一个私有地址上的控制服务
+
+界面进程异常退出时子进程不会退出，而是接管公共控制服务地址，准星继续显示，
+再次启动程序时会把命令转发给它。界面进程正常退出时发送 quit 命令关闭子进程；
+子进程异常退出时 RemoteOverlay 会重新启动它并恢复配置和显示状态。
+"""
+
+import os
+import sys
+import json
+import time
+from collections import deque
+
+from PySide6.QtCore import QObject, QTimer, QProcess, Signal
+from PySide6.QtNetwork import QLocalSocket
+from PySide6.QtWidgets import QApplication
+
+from control_protocol import server_name, encode_command, encode_config, parse_reply
+
+
+# 连接子进程的重试间隔和最长等待时间（毫秒）
+CONNECT_RETRY_MS = 50
+CONNECT_TIMEOUT_MS = 10000
+
+# 同步查询（位置、状态）的超时（毫秒）
+SYNC_TIMEOUT_MS = 500
+
+# 子进程连续异常退出的最大重启次数
+MAX_RESTARTS = 3
+
+
+def overlay_address():
+    """当前界面进程私有的覆盖层子进程地址"""
+    return server_name(f"CrosshairOverlay-{os.getpid()}")
+
+
+def child_command(address, public_address=None, frame_export=None, profile=None, stall_threshold_ms=0):
+    """启动覆盖层子进程的 (程序, 参数)，性能分析和卡顿检测设置和界面进程相同"""
+    if getattr(sys, "frozen", False):
+        program, arguments = sys.executable, []
+    else:
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crosshair_pyside6.py")
+        program, arguments = sys.executable, [script]
+    arguments += ["--overlay-child", address]
+    if public_address:
+        arguments += ["--overlay-public", public_address]
+    if frame_export:
+        name, mode, size = frame_export
+        arguments += ["--export-frames", name, "--export-mode", mode, "--export-size", str(size)]
+    if profile:
+        arguments += ["--profile", profile]
+    if stall_threshold_ms:
+        arguments += ["--stall-threshold", str(stall_threshold_ms)]
+    return program, arguments
+
+
+class RemoteOverlay(QObject):
+    """子进程中覆盖层的代理，提供 ConfigUI 使用的 OverlayWindow 接口"""
+
+    # 子进程确认已绘制修改后的画面时发射
+    frame_painted = Signal()
+
+    def __init__(self, config, address=None, public_address=None, parent=None, frame_export=None,
+                 profile=None, stall_threshold_ms=0):
+        super().__init__(parent)
+        self.config = config
+        self.address = address or overlay_address()
+        self.public_address = public_address
+        self.frame_export = frame_export
+        self.profile = profile
+        self.stall_threshold_ms = stall_threshold_ms
+        self.is_drag_mode = False
+        self.visible = False
+        self.pid = None
+        self.restarts = 0
+        self.closing = False
+        self.snapshots_sent = 0
+        self.paint_requests = 0  # 会让子进程画出新一帧的命令数
+
+        self._outbox = []  # 连接建立前等待发送的命令行
+        self._replies = deque()  # 已发送命令的回调，按发送顺序
+        self._buffer = b""
+        self._config_in_flight = False
+        self._config_dirty = False
+        self._connect_deadline = 0.0
+
+        self.socket = QLocalSocket(self)
+        self.socket.connected.connect(self.on_connected)
+        self.socket.readyRead.connect(self.on_ready_read)
+        self.socket.disconnected.connect(self.on_disconnected)
+        self.socket.errorOccurred.connect(self.on_socket_error)
+
+        self.retry_timer = QTimer(self)
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.timeout.connect(self.try_connect)
+
+        self.spawn()
+
+    # ---- 子进程和连接 ----
+
+    def spawn(self):
+        """启动子进程并开始连接"""
+        program, arguments = child_command(self.address, self.public_address, self.frame_export,
+                                           self.profile, self.stall_threshold_ms)
+        started, pid = QProcess.startDetached(program, arguments)
+        if not started:
+            print(f"启动覆盖层子进程失败: {program}")
+            return
+        self.pid = pid
+        self._connect_deadline = time.monotonic() + CONNECT_TIMEOUT_MS / 1000
+        self.try_connect()
+
+    def try_connect(self):
+        if self.socket.state() == QLocalSocket.UnconnectedState:
+            self.socket.connectToServer(self.address)
+
+    def is_connected(self):
+        return self.socket.state() == QLocalSocket.ConnectedState
+
+    def on_socket_error(self, error):
+        """子进程还没开始监听时稍后重试"""
+        if self.closing or self.is_connected():
+            return
+        if time.monotonic() < self._connect_deadline:
+            self.retry_timer.start(CONNECT_RETRY_MS)
+        else:
+            print(f"连接覆盖层子进程失败: {self.socket.errorString()}")
+
+    def on_connected(self):
+        """连接建立，发送等待中的命令"""
+        outbox, self._outbox = self._outbox, []
+        for line, callback in outbox:
+            self._write(line, callback)
+
+    def on_disconnected(self):
+        """子进程异常退出：重新启动并恢复状态"""
+        self._replies.clear()
+        if self.closing:
+            return
+        if self.restarts >= MAX_RESTARTS:
+            print("覆盖层子进程多次异常退出，不再重启")
+            return
+        self.restarts += 1
+        self.is_drag_mode = False
+        self._buffer = b""
+        self._config_in_flight = False
+        self._config_dirty = False
+        self.spawn()
+        self.updateConfig(self.config)
+        if self.visible:
+            self._send("show", callback=self._on_frame_reply)
+
+    # ---- 命令 ----
+
+    def _send(self, command, *args, callback=None):
+        line = encode_command(command, *args)
+        if self.is_connected():
+            self._write(line, callback)
+        else:
+            self._outbox.append((line, callback))
+
+    def _write(self, line, callback):
+        self._replies.append(callback)
+        self.socket.write(line)
+        self.socket.flush()
+
+    def on_ready_read(self):
+        """按发送顺序把回复交给回调"""
+        self._buffer += bytes(self.socket.readAll())
+        while b"\n" in self._buffer and self._replies:
+            line, _, self._buffer = self._buffer.partition(b"\n")
+            callback = self._replies.popleft()
+            if callback is not None:
+                callback(*parse_reply(line.decode("utf-8", errors="replace")))
+
+    def request(self, command, *args, timeout_ms=SYNC_TIMEOUT_MS):
+        """同步发送命令并等待回复，返回 (ok, payload)；未连接或超时返回 None"""
+        if not self.is_connected():
+            return None
+        result = []
+        self._send(command, *args, callback=lambda ok, payload: result.append((ok, payload)))
+        deadline = time.monotonic() + timeout_ms / 1000
+        while not result and self.is_connected():
+            remaining = int((deadline - time.monotonic()) * 1000)
+            if remaining <= 0 or not self.socket.waitForReadyRead(remaining):
+                break
+        return result[0] if result else None
+
+    def remote_state(self):
+        """子进程的状态，拿不到时返回空字典"""
+        reply = self.request("get_state")
+        if not reply or not reply[0]:
+            return {}
+        return json.loads(reply[1])
+
+    def _on_frame_reply(self, ok, payload):
+        if ok:
+            self.frame_painted.emit()
+
+    def _on_config_reply(self, ok, payload):
+        """上一份快照已应用；期间有新的修改时只发送最新的一份"""
+        self._config_in_flight = False
+        self._on_frame_reply(ok, payload)
+        if self._config_dirty:
+            self._config_dirty = False
+            self.updateConfig(self.config)
+
+    # ---- OverlayWindow 接口 ----
+
+    def updateConfig(self, config):
+        """发送配置快照"""
+        self.config = config
+        self.paint_requests += 1
+        if self._config_in_flight:
+            self._config_dirty = True
+            return
+        self._config_in_flight = True
+        self.snapshots_sent += 1
+        self._send("apply_config", encode_config(config), callback=self._on_config_reply)
+
+    def showFullScreen(self):
+        self.visible = True
+        self.paint_requests += 1
+        self._send("show", callback=self._on_frame_reply)
+
+    def hide(self):
+        self.visible = False
+        self._send("hide")
+
+    def isVisible(self):
+        return self.visible
+
+    def center_crosshair(self):
+        self.config["position"] = {"x": "center", "y": "center"}
+        self.paint_requests += 1
+        self._send("center", callback=self._on_frame_reply)
+
+    def toggleDragMode(self):
+        """切换拖动模式（拖动在子进程的窗口中进行）"""
+        self.is_drag_mode = not self.is_drag_mode
+        self._send("drag_mode", "on" if self.is_drag_mode else "off")
+        return self.is_drag_mode
+
+    def get_crosshair_position(self):
+        """准星当前位置，子进程没有回复时按配置计算"""
+        position = self.remote_state().get("position")
+        if position:
+            return tuple(position)
+        position = self.config.get("position", {"x": "center", "y": "center"})
+        screen_size = QApplication.primaryScreen().size()
+        x = screen_size.width() // 2 if position["x"] == "center" else int(position["x"])
+        y = screen_size.height() // 2 if position["y"] == "center" else int(position["y"])
+        return (x, y)
+
+    def governor_stats(self):
+        return self.remote_state().get("governor", {})
+
+    @property
+    def update_stats(self):
+        return self.remote_state().get("updates", {})
+
+    def adaptive_color_stats(self):
+        return self.remote_state().get("adaptive_color", {})
+
+    def scope_stats(self):
+        return self.remote_state().get("scope", {})
+
+    def close(self):
+        """关闭子进程"""
+        self.closing = True
+        self.retry_timer.stop()
+        if self.is_connected():
+            self.request("quit")
+            self.socket.disconnectFromServer()
+        return True
+
+
+class OverlayHost(QObject):
+    """子进程：在私有地址上提供控制服务的覆盖层"""
+
+    def __init__(self, address, public_address=None, preset_name="default", storage=None, parent=None,
+                 frame_export=None):
+        super().__init__(parent)
+        from overlay_daemon_pyside6 import OverlayDaemon
+        from control_server_pyside6 import ControlServer
+
+        self.daemon = OverlayDaemon(preset_name, storage)
+        self.daemon.frame_export = frame_export
+        self.server = ControlServer(self.daemon, address, self)
+        self.server.server.newConnection.connect(self.on_ui_connected)
+        self.server.client_disconnected.connect(self.on_ui_disconnected)
+        self.public_address = public_address
+        self.public_server = None
+        self.ui_connected = False
+
+        # 界面进程启动子进程后没有连上（例如启动过程中崩溃），直接退出
+        self.connect_timer = QTimer(self)
+        self.connect_timer.setSingleShot(True)
+        self.connect_timer.timeout.connect(self.on_connect_timeout)
+
+    def start(self):
+        """开始监听，返回是否成功"""
+        if not self.server.start():
+            return False
+        self.connect_timer.start(CONNECT_TIMEOUT_MS)
+        return True
+
+    def on_ui_connected(self):
+        self.ui_connected = True
+        self.connect_timer.stop()
+
+    def on_connect_timeout(self):
+        if not self.ui_connected:
+            print("界面进程没有连接覆盖层子进程，退出")
+            QApplication.quit()
+
+    def on_ui_disconnected(self, remaining):
+        """界面进程没有发送 quit 就断开：准星继续运行，并接管公共控制服务地址"""
+        if remaining or self.daemon.quitting or self.public_server is not None:
+            return
+        from control_server_pyside6 import ControlServer
+        self.public_server = ControlServer(self.daemon, self.public_address, self)
+        if self.public_server.start():
+            print("界面进程已退出，覆盖层继续运行")
+        else:
+            print("界面进程已退出，公共控制服务地址已被占用")
+
+
+def run_overlay_child(address, public_address=None, preset_name="default", stall_threshold_ms=0,
+                      frame_export=None):
+    """子进程入口，返回退出码"""
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    app.setQuitOnLastWindowClosed(False)
+    host = OverlayHost(address, public_address, preset_name, frame_export=frame_export)
+    if not host.start():
+        return 1
+    if stall_threshold_ms > 0:
+        import stall_watchdog_pyside6
+        stall_watchdog_pyside6.install(stall_threshold_ms)
+    return app.exec()
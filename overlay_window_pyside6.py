@@ -1,15 +1,42 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import math
+import time
+
 from PySide6.QtWidgets import QWidget, QApplication
-from PySide6.QtCore import Qt, QTimer, QPoint
-from PySide6.QtGui import QPainter, QColor, QBrush, QPen
+from PySide6.QtCore import Qt, QTimer, QPoint, QRect, QElapsedTimer, Signal
+from PySide6.QtGui import QPainter, QColor, QPen, QImage
+
+from crosshair_renderer_pyside6 import draw_crosshair, config_hash, device_config, shape_extent
+from sprite_atlas_pyside6 import AtlasManager, is_animated, atlas_extent, sprite_key
+from sprite_cache_pyside6 import SpriteDiskCache
+from live_params import LiveParamsReader, apply_values
+from frame_export import FrameExportWriter, DEFAULT_SIZE as EXPORT_SIZE
+from adaptive_color import ContrastPicker, band_mean, DEFAULT_INTERVAL_MS, DEFAULT_RADIUS
+from scope_pyside6 import MagnifierScope, scope_params, DEFAULT_FPS as SCOPE_FPS
+from frame_governor import FrameGovernor, DEFAULT_POWER_PROFILE, DEFAULT_IDLE_TIMEOUT_MS
+import profiling
+
+
+# 不影响准星图像、但需要重新设置帧率调节器或参数块的字段
+SETTINGS_KEYS = ("live_params", "power_profile", "idle_timeout",
+                 "adaptive_color", "adaptive_interval", "adaptive_radius",
+                 "scope", "scope_zoom", "scope_size", "scope_offset", "scope_fps")
+
+# 静态准星的实时参数停止变化这么久（毫秒）后重新构建单帧图集
+LIVE_SETTLE_MS = 150
 
 
 class OverlayWindow(QWidget):
-    def __init__(self, config):
+    # 每完成一帧绘制发射一次
+    frame_painted = Signal()
+    
+    def __init__(self, config, sprite_dir=None):
         super().__init__()
         self.config = config
+        # 请求重绘的次数，控制服务据此判断命令是否会画出新的一帧
+        self.paint_requests = 0
         
         # 拖动相关变量
         self.is_drag_mode = False
@@ -17,6 +44,63 @@ class OverlayWindow(QWidget):
         self.drag_start_pos = QPoint()
         self.crosshair_pos = None  # 准星的当前位置
         
+        # 动画准星的帧图集（后台构建）、静态准星的单帧图集和帧时钟
+        # 图集按当前屏幕的设备像素比绘制，screen_key 记录构建时的 (DPR, 屏幕高度)
+        # sprite_dir 不为空时图集同时缓存在磁盘上，下次启动直接映射
+        disk_cache = SpriteDiskCache(sprite_dir) if sprite_dir else None
+        self.atlas_manager = AtlasManager(self, disk_cache=disk_cache)
+        self.atlas_manager.atlas_ready.connect(self.on_atlas_ready)
+        self.current_atlas = None
+        self.atlas_key = None
+        self.sprite = None
+        self.screen_key = None
+        self.frame_clock = QElapsedTimer()
+        self.frame_clock.start()
+        
+        # 外部工具通过共享内存参数块实时覆盖的参数
+        self.live_params = None
+        self.live_overrides = {}
+        self.live_update_count = 0
+        self.render_config = self.config
+        self.live_settle_timer = QTimer()
+        self.live_settle_timer.setSingleShot(True)
+        self.live_settle_timer.timeout.connect(self.on_live_params_settled)
+        
+        # 自适应颜色：定时截取准星周围的一小块屏幕，按背景切换到调色板中的对比色
+        self.adaptive_picker = None
+        self.adaptive_color = None
+        self.adaptive_stats = {"samples": 0, "last_ms": 0.0, "max_ms": 0.0, "total_ms": 0.0}
+        self.adaptive_timer = QTimer()
+        self.adaptive_timer.timeout.connect(self.sample_background)
+        
+        # 放大镜：开启时由帧时钟驱动截取准星周围的区域，关闭时为 None
+        self.scope = None
+        
+        # 画面导出：准星区域同时绘制到共享内存环形缓冲区，供录制和直播合成使用
+        self.frame_export = None
+        self.export_key = None
+        
+        # 上一次应用的配置快照，用于判断 updateConfig 是否真的改变了画面
+        # （ConfigUI 会原地修改同一个配置字典，所以只能和快照比较）
+        self.render_key = None
+        self.position_key = None
+        self.settings_key = None
+        self.update_stats = {"noop": 0, "position": 0, "settings": 0, "rebuild": 0}
+        
+        # 定时器用于重绘，帧率由调节器根据当前需求决定（静态准星为 0 FPS）
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.on_frame_tick)
+        self.governor = FrameGovernor(
+            display_rate=QApplication.primaryScreen().refreshRate(),
+            profile=self.config.get("power_profile", DEFAULT_POWER_PROFILE),
+            idle_timeout_ms=self.config.get("idle_timeout", DEFAULT_IDLE_TIMEOUT_MS),
+        )
+        
+        # 空闲超时后降低帧率
+        self.idle_timer = QTimer()
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.timeout.connect(self.on_idle_timeout)
+        
         # 设置窗口属性
         self.setWindowFlags(
             Qt.FramelessWindowHint |  # 无边框
@@ -35,98 +119,349 @@ class OverlayWindow(QWidget):
         self.setMouseTracking(False)
         self.setWindowFlag(Qt.WindowTransparentForInput, True)
         
-        # 定时器用于重绘
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update)
-        self.timer.start(50)  # 20 FPS
+        self.refresh_adaptive()
+        self.refresh_scope()
+        self.refresh_live_params()
+        self.refresh_atlas()
+        self.snapshot_config()
+    
+    def snapshot_config(self):
+        """记录当前配置的快照：图像内容哈希、位置和调节器设置"""
+        self.render_key = config_hash(self.render_config)
+        self.position_key = self.position_value(self.config)
+        self.settings_key = tuple(self.config.get(key) for key in SETTINGS_KEYS)
     
+    @staticmethod
+    def position_value(config):
+        position = config.get("position", {"x": "center", "y": "center"})
+        return (position["x"], position["y"])
+    
+    @profiling.hook
     def updateConfig(self, config):
-        """更新配置"""
+        """更新配置
+        
+        和上一次的快照比较，按变化程度分别处理并计数：
+            noop        画面没有变化，不重绘
+            position    只移动了位置，只重绘新旧两处区域
+            settings    只改变了帧率调节器或实时参数块设置
+            rebuild     图像内容变化，重新构建图集并重绘
+        """
+        # 配置字典可能已被原地修改，旧位置要从快照中取
+        if self.is_drag_mode and self.crosshair_pos:
+            old_center = (self.crosshair_pos.x(), self.crosshair_pos.y())
+        elif self.position_key is not None:
+            old_center = self.position_center(*self.position_key)
+        else:
+            old_center = None
+        old_render_key = self.render_key
+        old_position_key = self.position_key
+        old_settings_key = self.settings_key
+        dragged = self.crosshair_pos is not None and self.is_drag_mode
+        
         self.config = config
         # 重置crosshair_pos，让准星位置跟随配置
         self.crosshair_pos = None
-        self.update()
+        self.refresh_adaptive()
+        self.refresh_scope()
+        self.refresh_live_params()
+        self.snapshot_config()
+        
+        if self.render_key != old_render_key:
+            self.update_stats["rebuild"] += 1
+            self.refresh_atlas()
+            self.update()
+            return
+        
+        if self.settings_key != old_settings_key:
+            self.update_stats["settings"] += 1
+            self.refresh_governor()
+        
+        if dragged or self.position_key != old_position_key:
+            self.update_stats["position"] += 1
+            if old_center is not None:
+                self.update_around(old_center)
+            self.update_around(self.crosshair_center())
+        elif self.settings_key == old_settings_key:
+            self.update_stats["noop"] += 1
+    
+    def update(self, *args):
+        """请求重绘（整个窗口或指定区域）"""
+        self.paint_requests += 1
+        super().update(*args)
+    
+    def update_around(self, center):
+        """只重绘准星所在的区域；拖动模式下有提示文字，重绘整个窗口"""
+        if self.is_drag_mode:
+            self.update()
+            return
+        config, dpr = self.device_render_config()
+        # 物理像素换算回逻辑像素，多留 1 像素给对齐误差
+        extent = int(math.ceil(atlas_extent(config) / dpr)) + 1
+        self.update(QRect(center[0] - extent, center[1] - extent, extent * 2 + 1, extent * 2 + 1))
+        if self.scope is not None:
+            self.update(self.scope.rect(center))
+    
+    def screen_metrics(self):
+        """当前屏幕的 (设备像素比, 逻辑高度)"""
+        screen = self.screen() or QApplication.primaryScreen()
+        return (self.devicePixelRatioF(), screen.size().height())
+    
+    def device_render_config(self):
+        """长度换算为物理像素的绘制配置，以及对应的设备像素比"""
+        dpr, height = self.screen_key or self.screen_metrics()
+        return device_config(self.render_config, dpr, height), dpr
+    
+    def refresh_live_params(self):
+        """根据配置连接/断开实时参数块，并合并实时参数"""
+        name = self.config.get("live_params") or ""
+        current = self.live_params.name if self.live_params else ""
+        if name != current:
+            if self.live_params is not None:
+                self.live_params.close()
+                self.live_params = None
+            self.live_overrides = {}
+            if name:
+                try:
+                    self.live_params = LiveParamsReader(name)
+                except (OSError, ValueError) as e:
+                    print(f"打开实时参数块失败: {e}")
+            self.governor.set_external(self.live_params is not None)
+        self.merge_overrides()
+    
+    def merge_overrides(self):
+        """配置加上实时参数和自适应颜色，得到绘制用的配置"""
+        overrides = dict(self.live_overrides)
+        if self.adaptive_color:
+            overrides["color"] = self.adaptive_color
+        self.render_config = dict(self.config, **overrides) if overrides else self.config
+    
+    def poll_live_params(self):
+        """每帧轮询一次实时参数块，有新参数时返回 True"""
+        result = self.live_params.poll()
+        if result is None:
+            return False
+        center = self.crosshair_center()
+        self.update_around(center)  # 变化前的准星区域
+        apply_values(self.live_overrides, *result)
+        self.live_update_count += 1
+        self.merge_overrides()
+        self.render_key = None  # 画面已被实时参数改变
+        if is_animated(self.render_config):
+            # 后台正在构建图集时只记录目标，构建完成后再构建最新参数的图集
+            if self.atlas_manager.is_pending():
+                config, dpr = self.device_render_config()
+                self.atlas_key = sprite_key(config, dpr)
+            else:
+                self.refresh_atlas()
+            self.update()
+            return True
+        
+        # 静态准星的参数可能连续变化，变化期间不缓存单帧图集，直接矢量绘制；
+        # 停止变化后再构建图集，恢复贴图和局部重绘
+        self.sprite = None
+        self.live_settle_timer.start(LIVE_SETTLE_MS)
+        if self.governor.mode != "active":
+            self.governor.touch()
+            self.apply_governor()
+        else:
+            self.idle_timer.start(self.governor.idle_timeout_ms)
+        self.update_around(center)
+        return True
+    
+    def on_live_params_settled(self):
+        """实时参数停止变化：为当前参数构建静态准星的单帧图集"""
+        if self.sprite is not None or self.current_atlas is not None or is_animated(self.render_config):
+            return
+        self.refresh_atlas()
+        self.update_around(self.crosshair_center())
+    
+    def on_frame_tick(self):
+        """帧时钟：截取放大镜画面，轮询实时参数，动画或拖动时重绘"""
+        if self.scope is not None:
+            self.capture_scope()
+        if self.live_params is not None and self.poll_live_params():
+            return
+        if self.current_atlas is not None or self.is_drag_mode:
+            self.update()
+    
+    def refresh_atlas(self):
+        """按当前屏幕重新准备图集：动画准星在后台构建帧图集，静态准星立即构建单帧图集"""
+        self.screen_key = self.screen_metrics()
+        config, dpr = self.device_render_config()
+        if is_animated(config):
+            self.atlas_key = sprite_key(config, dpr)
+            self.current_atlas = self.atlas_manager.request(config, dpr)
+            self.sprite = None
+        else:
+            self.atlas_key = None
+            self.current_atlas = None
+            self.sprite = self.atlas_manager.sprite(config, dpr)
+            if self.adaptive_picker is not None:
+                # 在后台预先绘制调色板中每种颜色的精灵图，切换颜色时直接使用
+                for color in self.adaptive_picker.colors:
+                    self.atlas_manager.request(dict(config, color=color), dpr)
+        self.refresh_governor()
+    
+    def refresh_adaptive(self):
+        """根据配置开始或停止背景采样"""
+        if self.config.get("adaptive_color", "off") != "contrast":
+            self.adaptive_timer.stop()
+            self.adaptive_picker = None
+            self.adaptive_color = None
+            return
+        base_color = self.config.get("color", "#FF0000")
+        if self.adaptive_picker is None or self.adaptive_picker.base_color != base_color:
+            self.adaptive_picker = ContrastPicker(base_color)
+            self.adaptive_color = None
+        interval = int(self.config.get("adaptive_interval", DEFAULT_INTERVAL_MS))
+        if not self.adaptive_timer.isActive() or self.adaptive_timer.interval() != interval:
+            self.adaptive_timer.start(interval)
+    
+    def sample_background(self):
+        """截取准星周围的屏幕区域，背景需要时切换准星颜色，返回本次采样的耗时（毫秒）"""
+        if self.adaptive_picker is None or not self.isVisible():
+            return None
+        start = time.perf_counter()
+        config, dpr = self.device_render_config()
+        # 只统计主准星范围之外的一圈像素，不会采到准星自己
+        inner = int(math.ceil(shape_extent(config) / dpr))
+        half = inner + int(self.config.get("adaptive_radius", DEFAULT_RADIUS))
+        x, y = self.crosshair_center()
+        screen = self.screen() or QApplication.primaryScreen()
+        image = screen.grabWindow(0, x - half, y - half, half * 2 + 1, half * 2 + 1).toImage()
+        if image.format() not in (QImage.Format_RGB32, QImage.Format_ARGB32, QImage.Format_ARGB32_Premultiplied):
+            image = image.convertToFormat(QImage.Format_RGB32)
+        scale = image.width() / (half * 2 + 1) if image.width() else 1.0
+        rgb = band_mean(bytes(image.constBits()), image.width(), image.height(), image.bytesPerLine(),
+                        int(math.ceil(inner * scale)))
+        color = self.adaptive_picker.update(rgb)
+        
+        elapsed = (time.perf_counter() - start) * 1000
+        stats = self.adaptive_stats
+        stats["samples"] += 1
+        stats["last_ms"] = elapsed
+        stats["max_ms"] = max(stats["max_ms"], elapsed)
+        stats["total_ms"] += elapsed
+        
+        adaptive_color = None if color == self.adaptive_picker.base_color else color
+        if adaptive_color != self.adaptive_color:
+            self.adaptive_color = adaptive_color
+            self.merge_overrides()
+            self.render_key = config_hash(self.render_config)
+            self.refresh_atlas()
+            self.update_around(self.crosshair_center())
+        return elapsed
+    
+    def adaptive_color_stats(self):
+        """自适应颜色的当前颜色和采样耗时"""
+        stats = self.adaptive_stats
+        return {
+            "enabled": self.adaptive_picker is not None,
+            "color": self.render_config.get("color"),
+            "samples": stats["samples"],
+            "switches": self.adaptive_picker.switches if self.adaptive_picker else 0,
+            "last_ms": round(stats["last_ms"], 3),
+            "max_ms": round(stats["max_ms"], 3),
+            "mean_ms": round(stats["total_ms"] / stats["samples"], 3) if stats["samples"] else None,
+        }
+    
+    def refresh_scope(self):
+        """根据配置创建或移除放大镜"""
+        center = self.crosshair_center()
+        if self.config.get("scope", "off") != "on":
+            if self.scope is not None:
+                self.update(self.scope.rect(center))
+                self.scope = None
+            return
+        params = scope_params(self.config, self.devicePixelRatioF())
+        if self.scope is None or self.scope.params != params:
+            if self.scope is not None:
+                self.update(self.scope.rect(center))
+            self.scope = MagnifierScope(*params)
+            self.update(self.scope.rect(center))
+    
+    def capture_scope(self):
+        """截取放大镜画面，有变化时只重绘放大镜区域"""
+        if not self.isVisible():
+            return
+        center = self.crosshair_center()
+        screen = self.screen() or QApplication.primaryScreen()
+        if self.scope.capture(screen, center):
+            self.update(self.scope.rect(center))
+    
+    def scope_stats(self):
+        """放大镜每帧的耗时和延迟"""
+        return self.scope.stats() if self.scope is not None else {"enabled": False}
+    
+    def refresh_governor(self):
+        """把配置中的功耗档位、空闲超时和动画帧率交给调节器"""
+        self.governor.set_profile(self.config.get("power_profile", DEFAULT_POWER_PROFILE))
+        self.governor.idle_timeout_ms = self.config.get("idle_timeout", DEFAULT_IDLE_TIMEOUT_MS)
+        self.governor.set_animation_rate(self.animation_rate())
+        self.apply_governor()
+    
+    def on_atlas_ready(self, key):
+        """帧图集构建完成"""
+        if key == self.atlas_key:
+            self.current_atlas = self.atlas_manager.cache.get(key)
+            self.update()
+        elif self.atlas_key is not None:
+            self.refresh_atlas()
+    
+    def animation_rate(self):
+        """动画准星或放大镜需要的帧率，都没有时返回 None"""
+        scope_rate = float(self.config.get("scope_fps", SCOPE_FPS)) if self.scope is not None else None
+        if not is_animated(self.render_config):
+            return scope_rate
+        frames = max(1, int(self.render_config.get("animation_frames", 24)))
+        period = max(1, int(self.render_config.get("animation_period", 1000)))
+        return max(frames * 1000.0 / period, scope_rate or 0)
+    
+    def apply_governor(self):
+        """根据调节器的决策调整重绘定时器"""
+        mode, fps = self.governor.evaluate()
+        if fps <= 0:
+            self.timer.stop()
+        else:
+            interval = max(1, int(1000 / fps))
+            if not self.timer.isActive() or self.timer.interval() != interval:
+                self.timer.start(interval)
+        
+        # 活动状态下，超时无交互后进入空闲
+        if mode == "active":
+            self.idle_timer.start(self.governor.idle_timeout_ms)
+        else:
+            self.idle_timer.stop()
+    
+    def on_idle_timeout(self):
+        """空闲超时"""
+        self.governor.mark_idle()
+        self.apply_governor()
+    
+    def governor_stats(self):
+        """获取当前重绘模式、帧率和各模式累计时间"""
+        return self.governor.stats()
+    
+    def showEvent(self, event):
+        """显示事件"""
+        super().showEvent(event)
+        self.governor.set_visible(True)
+        self.apply_governor()
+    
+    def hideEvent(self, event):
+        """隐藏事件"""
+        super().hideEvent(event)
+        self.governor.set_visible(False)
+        self.apply_governor()
     
     def center_crosshair(self):
         """将准星居中"""
         screen_size = QApplication.primaryScreen().size()
         self.crosshair_pos = QPoint(screen_size.width() // 2, screen_size.height() // 2)
         self.config["position"] = {"x": "center", "y": "center"}
+        self.position_key = self.position_value(self.config)
         self.update()
     
-    def draw_cross(self, painter, center, size, thickness, color):
-        """绘制十字准星"""
-        painter.setPen(QPen(color, thickness))
-        painter.drawLine(center[0] - size, center[1], center[0] + size, center[1])  # 水平线
-        painter.drawLine(center[0], center[1] - size, center[0], center[1] + size)  # 垂直线
-    
-    def draw_dot(self, painter, center, size, color):
-        """绘制圆点准星"""
-        painter.setPen(QPen(color, 1))
-        painter.setBrush(QBrush(color))
-        painter.drawEllipse(center[0], center[1], size, size)
-    
-    def draw_square(self, painter, center, size, color):
-        """绘制方块准星"""
-        painter.setPen(QPen(color, 2))
-        painter.setBrush(QBrush(color))
-        painter.drawRect(center[0] - size//2, center[1] - size//2, size, size)
-    
-    def draw_circle(self, painter, center, size, color):
-        """绘制圆圈准星"""
-        painter.setPen(QPen(color, 2))
-        painter.setBrush(QBrush(Qt.transparent))
-        painter.drawEllipse(center[0], center[1], size, size)
-    
-    def draw_triangle(self, painter, center, size, color):
-        """绘制三角形准星"""
-        painter.setPen(QPen(color, 2))
-        painter.setBrush(QBrush(color))
-        
-        # 计算三角形顶点
-        points = [
-            (center[0], center[1] - size),  # 顶点
-            (center[0] - size, center[1] + size),  # 左下角
-            (center[0] + size, center[1] + size)   # 右下角
-        ]
-        
-        # 绘制三角形
-        from PySide6.QtCore import QPoint
-        from PySide6.QtGui import QPolygon
-        
-        polygon = QPolygon([QPoint(p[0], p[1]) for p in points])
-        painter.drawPolygon(polygon)
-    
-    def draw_hollow_cross(self, painter, center, gap_size, line_length, line_thickness, color):
-        """绘制空心十字准星"""
-        painter.setPen(QPen(color, line_thickness))
-        
-        # 绘制四段分离的直线
-        # 上半部分
-        painter.drawLine(center[0], center[1] - gap_size, center[0], center[1] - gap_size - line_length)
-        # 下半部分
-        painter.drawLine(center[0], center[1] + gap_size, center[0], center[1] + gap_size + line_length)
-        # 左半部分
-        painter.drawLine(center[0] - gap_size, center[1], center[0] - gap_size - line_length, center[1])
-        # 右半部分
-        painter.drawLine(center[0] + gap_size, center[1], center[0] + gap_size + line_length, center[1])
-    
-    def draw_hollow_square(self, painter, center, size, thickness, color):
-        """绘制空心方框准星"""
-        painter.setPen(QPen(color, thickness))
-        painter.setBrush(QBrush(Qt.transparent))
-        painter.drawRect(center[0] - size//2, center[1] - size//2, size, size)
-    
-    def draw_hollow_cross_dot(self, painter, center, gap_size, line_length, line_thickness, dot_size, color):
-        """绘制空心十字加中心点准星"""
-        # 先绘制空心十字
-        self.draw_hollow_cross(painter, center, gap_size, line_length, line_thickness, color)
-        
-        # 再绘制中心点
-        painter.setPen(QPen(color, 1))
-        painter.setBrush(QBrush(color))
-        painter.drawEllipse(center[0], center[1], dot_size, dot_size)
-    
     def toggleDragMode(self):
         """切换拖动模式"""
         self.is_drag_mode = not self.is_drag_mode
@@ -162,6 +497,9 @@ class OverlayWindow(QWidget):
         self.hide()
         self.showFullScreen()
         
+        self.governor.set_drag_mode(self.is_drag_mode)
+        self.apply_governor()
+        
         return self.is_drag_mode
     
     def get_crosshair_position(self):
@@ -190,6 +528,7 @@ class OverlayWindow(QWidget):
             self.is_dragging = False
             self.setCursor(Qt.OpenHandCursor)
     
+    @profiling.hook
     def mouseMoveEvent(self, event):
         """鼠标移动事件"""
         if self.is_drag_mode and self.is_dragging:
@@ -211,70 +550,106 @@ class OverlayWindow(QWidget):
                     "y": self.crosshair_pos.y()
                 }
             
-            # 触发重绘
+            # 触发重绘，并保持活动帧率
             self.update()
+            if self.governor.mode != "active":
+                self.governor.touch()
+                self.apply_governor()
+            else:
+                self.idle_timer.start(self.governor.idle_timeout_ms)
     
+    def crosshair_center(self):
+        """当前绘制准星的中心位置"""
+        if self.is_drag_mode and self.crosshair_pos:
+            # 在拖动模式下，使用拖动后的位置
+            return (self.crosshair_pos.x(), self.crosshair_pos.y())
+        
+        # 正常模式下，使用配置中的位置
+        return self.position_center(*self.position_value(self.config))
+    
+    def position_center(self, x, y):
+        """把配置中的位置（可以是 "center"）换算为屏幕坐标"""
+        screen_size = QApplication.primaryScreen().size()
+        if x == "center":
+            center_x = screen_size.width() // 2
+        else:
+            center_x = int(x)
+        
+        if y == "center":
+            center_y = screen_size.height() // 2
+        else:
+            center_y = int(y)
+        return (center_x, center_y)
+    
+    def set_frame_export(self, name, mode="changes", size=EXPORT_SIZE):
+        """开始（name 为空时停止）把准星画面导出到共享内存环形缓冲区，size 为物理像素边长"""
+        if self.frame_export is not None:
+            self.frame_export.close()
+            self.frame_export = None
+        self.export_key = None
+        if name:
+            self.frame_export = FrameExportWriter(name, size, size, mode=mode)
+            self.update()
+    
+    def draw_crosshair_layer(self, painter, center, frame_index):
+        """绘制准星，返回画面的标识（图集键和帧序号）"""
+        # 直接从图集中拷贝当前帧；动画图集尚未构建完成时按物理像素矢量绘制
+        atlas = self.current_atlas
+        if atlas is not None:
+            atlas.draw_frame(painter, center, frame_index)
+            return (atlas.key, frame_index)
+        if self.sprite is not None:
+            self.sprite.draw_frame(painter, center, 0)
+            return (self.sprite.key, 0)
+        config, dpr = self.device_render_config()
+        painter.save()
+        painter.scale(1 / dpr, 1 / dpr)
+        draw_crosshair(painter, config, (round(center[0] * dpr), round(center[1] * dpr)))
+        painter.restore()
+        return None
+    
+    def export_frame(self, center, frame_index, frame_key):
+        """把准星绘制到缓冲区的下一个槽位（QImage 直接引用共享内存）"""
+        writer = self.frame_export
+        dpr = self.screen_key[0] if self.screen_key else 1.0
+        screen_x, screen_y = round(center[0] * dpr), round(center[1] * dpr)
+        if frame_key is None:
+            frame_key = config_hash(self.render_config)
+        key = (frame_key, screen_x, screen_y)
+        if writer.mode == "changes" and key == self.export_key:
+            return
+        self.export_key = key
+        
+        image = QImage(writer.begin_frame(), writer.width, writer.height, writer.stride,
+                       QImage.Format_RGBA8888_Premultiplied)
+        image.fill(Qt.transparent)
+        image.setDevicePixelRatio(dpr)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        self.draw_crosshair_layer(painter, (writer.width // 2 / dpr, writer.height // 2 / dpr), frame_index)
+        painter.end()
+        writer.commit_frame(screen_x, screen_y)
+    
+    @profiling.hook
     def paintEvent(self, event):
         """绘制事件"""
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
         
-        # 获取配置参数
-        shape = self.config.get("shape", "cross")
-        size = self.config.get("size", 20)
-        thickness = self.config.get("thickness", 2)
-        opacity = self.config.get("opacity", 0.8)
-        color = self.config.get("color", "#FF0000")
-        position = self.config.get("position", {"x": "center", "y": "center"})
+        # 计算中心位置
+        center = self.crosshair_center()
         
-        # 设置颜色和透明度
-        qcolor = QColor(color)
-        qcolor.setAlphaF(opacity)
+        # 窗口移到了缩放比例或分辨率不同的屏幕上，按新屏幕重新准备图集
+        if self.screen_metrics() != self.screen_key:
+            self.refresh_atlas()
         
-        # 计算中心位置
-        if self.is_drag_mode and self.crosshair_pos:
-            # 在拖动模式下，使用拖动后的位置
-            center_x = self.crosshair_pos.x()
-            center_y = self.crosshair_pos.y()
-        else:
-            # 正常模式下，使用配置中的位置
-            screen_size = QApplication.primaryScreen().size()
-            if position["x"] == "center":
-                center_x = screen_size.width() // 2
-            else:
-                center_x = int(position["x"])
-            
-            if position["y"] == "center":
-                center_y = screen_size.height() // 2
-            else:
-                center_y = int(position["y"])
-        
-        center = (center_x, center_y)
-        
-        # 根据形状绘制准星
-        if shape == "cross":
-            self.draw_cross(painter, center, size, thickness, qcolor)
-        elif shape == "dot":
-            self.draw_dot(painter, center, size, qcolor)
-        elif shape == "square":
-            self.draw_square(painter, center, size, qcolor)
-        elif shape == "circle":
-            self.draw_circle(painter, center, size, qcolor)
-        elif shape == "triangle":
-            self.draw_triangle(painter, center, size, qcolor)
-        elif shape == "hollow_cross":
-            gap_size = self.config.get("hollow_gap", size // 3)
-            line_length = self.config.get("hollow_length", size)
-            line_thickness = self.config.get("hollow_thickness", thickness)
-            self.draw_hollow_cross(painter, center, gap_size, line_length, line_thickness, qcolor)
-        elif shape == "hollow_square":
-            self.draw_hollow_square(painter, center, size, thickness, qcolor)
-        elif shape == "hollow_cross_dot":
-            gap_size = self.config.get("hollow_gap", size // 3)
-            line_length = self.config.get("hollow_length", size)
-            line_thickness = self.config.get("hollow_thickness", thickness)
-            dot_size = self.config.get("center_dot_size", 3)
-            self.draw_hollow_cross_dot(painter, center, gap_size, line_length, line_thickness, dot_size, qcolor)
+        atlas = self.current_atlas
+        frame_index = atlas.frame_index(self.frame_clock.elapsed()) if atlas is not None else 0
+        frame_key = self.draw_crosshair_layer(painter, center, frame_index)
+        if self.frame_export is not None:
+            self.export_frame(center, frame_index, frame_key)
+        if self.scope is not None:
+            self.scope.draw(painter, center)
         
         # 在拖动模式下绘制额外的提示信息
         if self.is_drag_mode:
@@ -285,3 +660,6 @@ class OverlayWindow(QWidget):
             text_rect = painter.boundingRect(10, 10, 300, 30, Qt.AlignLeft, hint_text)
             painter.fillRect(text_rect.adjusted(-5, -5, 5, 5), QColor(0, 0, 0, 128))
             painter.drawText(10, 10, hint_text)
+        
+        painter.end()
+        self.frame_painted.emit()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+资源占用自检
+
+对每种准星形状分别运行以下场景，每个场景持续固定时间：
+    idle    静态准星，没有任何交互
+    drag    拖动模式，以 125 Hz 模拟鼠标拖动
+    config  以 100 Hz 连续修改配置（模拟拖动配置界面的滑块）
+
+每个场景统计 CPU 占用、常驻内存、唤醒次数（上下文切换）、帧定时器触发次数和
+绘制次数，与预算比较后输出 JSON 报告。可以在 offscreen 平台上运行：
+    QT_QPA_PLATFORM=offscreen python crosshair_pyside6.py --perf-selftest
+
+预算的键为 "场景.指标"，场景为 * 时适用于所有场景；指标以 min_ 开头时为下限，
+否则为上限。
+"""
+
+import json
+import time
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import Qt, QEvent, QEventLoop, QPointF, QTimer
+from PySide6.QtGui import QMouseEvent
+
+from preset_io import default_config
+from preset_schema import SHAPES
+from resource_usage import cpu_seconds, rss_mb, context_switches
+
+
+MODES = ["idle", "drag", "config"]
+
+# 默认预算（README 中的 CPU < 0.5% 和 20 FPS）
+DEFAULT_BUDGETS = {
+    "idle.cpu_percent": 0.5,
+    "idle.paints_per_s": 0.5,
+    "idle.wakeups_per_s": 20,
+    "drag.cpu_percent": 25,
+    "drag.min_paints_per_s": 20,
+    "config.cpu_percent": 25,
+    "config.min_paints_per_s": 20,
+    "*.rss_mb": 200,
+}
+
+DEFAULT_DURATION_S = 1.0
+
+# 每个场景开始测量前的预热时间，让图集构建和帧率切换先完成
+WARMUP_MS = 200
+
+DRAG_INTERVAL_MS = 8
+CONFIG_INTERVAL_MS = 10
+
+
+def parse_budget(text):
+    """解析命令行中的 "场景.指标=数值" """
+    key, sep, value = text.partition("=")
+    if not sep or "." not in key:
+        raise ValueError(f"预算格式应为 场景.指标=数值: {text}")
+    return key.strip(), float(value)
+
+
+def load_budgets(path=None, overrides=()):
+    """默认预算，依次用预算文件（JSON 对象）和命令行中的预算覆盖"""
+    budgets = dict(DEFAULT_BUDGETS)
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"预算文件不是 JSON 对象: {path}")
+        budgets.update((key, float(value)) for key, value in data.items())
+    for text in overrides:
+        key, value = parse_budget(text)
+        budgets[key] = value
+    return budgets
+
+
+def check_budgets(mode, metrics, budgets):
+    """检查一个场景的指标，返回 {指标: {value, limit, pass}}
+
+    指标拿不到（None）时 pass 为 None，不算失败。
+    """
+    checks = {}
+    for key, limit in budgets.items():
+        scope, _, name = key.partition(".")
+        if scope not in ("*", mode):
+            continue
+        lower = name.startswith("min_")
+        metric = name[4:] if lower else name
+        value = metrics.get(metric)
+        if value is None:
+            passed = None
+        else:
+            passed = value >= limit if lower else value <= limit
+        checks[name] = {"value": value, "limit": limit, "pass": passed}
+    return checks
+
+
+def run_event_loop(ms):
+    """运行事件循环指定的毫秒数"""
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+class _Driver:
+    """按场景产生输入：模拟鼠标拖动或连续修改配置"""
+
+    def __init__(self, overlay, mode):
+        self.overlay = overlay
+        self.mode = mode
+        self.step = 0
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.tick)
+
+    def start(self):
+        overlay = self.overlay
+        if self.mode == "drag":
+            overlay.toggleDragMode()
+            self.position = QPointF(*overlay.get_crosshair_position())
+            self.send(QEvent.MouseButtonPress, Qt.LeftButton)
+            self.timer.start(DRAG_INTERVAL_MS)
+        elif self.mode == "config":
+            self.base_size = overlay.config.get("size", 20)
+            self.timer.start(CONFIG_INTERVAL_MS)
+
+    def stop(self):
+        self.timer.stop()
+        if self.mode == "drag":
+            self.send(QEvent.MouseButtonRelease, Qt.LeftButton)
+            self.overlay.toggleDragMode()
+
+    def send(self, event_type, button):
+        buttons = Qt.LeftButton if event_type != QEvent.MouseButtonRelease else Qt.NoButton
+        event = QMouseEvent(event_type, self.position, self.position, button, buttons, Qt.NoModifier)
+        QApplication.sendEvent(self.overlay, event)
+
+    def tick(self):
+        self.step += 1
+        if self.mode == "drag":
+            # 来回移动，避免离开屏幕
+            offset = 1 if (self.step // 50) % 2 == 0 else -1
+            self.position = QPointF(self.position.x() + offset, self.position.y())
+            self.send(QEvent.MouseMove, Qt.NoButton)
+        else:
+            config = self.overlay.config
+            config["size"] = self.base_size + self.step % 5
+            self.overlay.updateConfig(config)
+
+
+def run_scenario(overlay, mode, duration_s, budgets):
+    """运行一个场景并返回结果"""
+    paints = [0]
+    ticks = [0]
+
+    def on_paint():
+        paints[0] += 1
+
+    def on_tick():
+        ticks[0] += 1
+
+    driver = _Driver(overlay, mode)
+    driver.start()
+    run_event_loop(WARMUP_MS)
+
+    overlay.frame_painted.connect(on_paint)
+    overlay.timer.timeout.connect(on_tick)
+    cpu_start = cpu_seconds()
+    switches_start = context_switches()
+    start = time.perf_counter()
+    run_event_loop(int(duration_s * 1000))
+    elapsed = time.perf_counter() - start
+    cpu_used = cpu_seconds() - cpu_start
+    switches_end = context_switches()
+    overlay.frame_painted.disconnect(on_paint)
+    overlay.timer.timeout.disconnect(on_tick)
+    driver.stop()
+
+    wakeups = None if switches_start is None else switches_end - switches_start
+    rss = rss_mb()
+    metrics = {
+        "duration_s": round(elapsed, 3),
+        "cpu_ms": round(cpu_used * 1000, 2),
+        "cpu_percent": round(cpu_used / elapsed * 100, 3),
+        "rss_mb": None if rss is None else round(rss, 1),
+        "wakeups": wakeups,
+        "wakeups_per_s": None if wakeups is None else round(wakeups / elapsed, 2),
+        "timer_ticks": ticks[0],
+        "paints": paints[0],
+        "paints_per_s": round(paints[0] / elapsed, 2),
+    }
+    checks = check_budgets(mode, metrics, budgets)
+    return dict(metrics, mode=mode, checks=checks,
+                passed=all(check["pass"] is not False for check in checks.values()))
+
+
+def run_selftest(shapes=None, modes=None, duration_s=DEFAULT_DURATION_S, budgets=None):
+    """对每种形状运行所有场景，返回报告（需要已经创建 QApplication）"""
+    from overlay_window_pyside6 import OverlayWindow
+
+    budgets = dict(DEFAULT_BUDGETS) if budgets is None else budgets
+    results = []
+    for shape in shapes or SHAPES:
+        config = default_config()
+        config["shape"] = shape
+        overlay = OverlayWindow(config)
+        overlay.showFullScreen()
+        for mode in modes or MODES:
+            result = run_scenario(overlay, mode, duration_s, budgets)
+            result["shape"] = shape
+            results.append(result)
+        overlay.close()
+        overlay.deleteLater()
+
+    return {
+        "platform": QApplication.platformName(),
+        "duration_s": duration_s,
+        "budgets": budgets,
+        "scenarios": results,
+        "passed": all(result["passed"] for result in results),
+    }
+
+
+def format_failures(report):
+    """未通过的检查项，每项一行"""
+    lines = []
+    for result in report["scenarios"]:
+        for name, check in result["checks"].items():
+            if check["pass"] is False:
+                lines.append(f"{result['shape']}/{result['mode']}: {name} = {check['value']}"
+                             f"（预算 {check['limit']}）")
+    return lines
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+预设列表的模型和下拉框
+
+预设库有上千个预设时，每次刷新都清空下拉框再逐个添加既慢又没法滚动。
+PresetListModel 只保存排序后的名称列表，视图按批次取行（canFetchMore /
+fetchMore），刷新时和旧列表比较，只插入、删除变化的行。
+
+每行的预览缩略图在视图第一次显示该行时交给后台线程绘制，绘制完成后只通知
+该行更新。PresetComboBox 保持 QComboBox 的用法（setCurrentText、findText、
+addItem），目标预设还没有取到时先取到该行。
+"""
+
+from bisect import bisect_left
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt, QObject, QAbstractListModel, QModelIndex, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QIcon, QPixmap
+from PySide6.QtWidgets import QComboBox, QListView
+
+from crosshair_renderer_pyside6 import render_sprite
+from preset_io import default_config
+from preset_schema import normalize_preset
+
+
+# 每次取的行数
+FETCH_BATCH = 200
+
+# 一次变化超过这么多行时重置模型，不再逐行插入、删除
+RESET_THRESHOLD = 256
+
+# 缩略图的边长（像素）和缓存数量
+THUMBNAIL_SIZE = 24
+THUMBNAIL_CACHE = 512
+
+
+def render_thumbnail(config, side=THUMBNAIL_SIZE):
+    """把准星绘制成 side x side 的缩略图（可在后台线程中调用）"""
+    image, _ = render_sprite(config)
+    return image.scaled(side, side, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+class _ThumbnailSignals(QObject):
+    finished = Signal(str, object)
+
+
+class _ThumbnailTask(QRunnable):
+    """在线程池中读取预设并绘制缩略图"""
+
+    def __init__(self, storage, name, signals):
+        super().__init__()
+        self.storage = storage
+        self.name = name
+        self.signals = signals
+
+    def run(self):
+        image = None
+        try:
+            config, _ = normalize_preset(self.storage.load(self.name) or {}, default_config())
+            image = render_thumbnail(config)
+        except Exception as e:
+            print(f"绘制预设 {self.name} 的缩略图失败: {e}")
+        try:
+            self.signals.finished.emit(self.name, image)
+        except RuntimeError:
+            pass  # 模型已被销毁
+
+
+class PresetListModel(QAbstractListModel):
+    """按需取行、增量更新的预设名称列表"""
+
+    def __init__(self, storage=None, parent=None, thread_pool=None, batch=FETCH_BATCH):
+        super().__init__(parent)
+        self.storage = storage
+        self.batch = batch
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self._names = []
+        self._fetched = 0
+        self._thumbnails = OrderedDict()
+        self._pending = set()
+        self._signals = _ThumbnailSignals()
+        self._signals.finished.connect(self._on_thumbnail)
+        self.stats = {"resets": 0, "inserted": 0, "removed": 0, "fetched": 0, "thumbnails": 0}
+
+    @property
+    def names(self):
+        """所有预设名称（包括视图还没有取到的）"""
+        return self._names
+
+    # --- QAbstractListModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._fetched
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._fetched:
+            return None
+        name = self._names[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole, Qt.ToolTipRole):
+            return name
+        if role == Qt.DecorationRole and self.storage is not None:
+            return self.thumbnail(name)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._fetched < len(self._names)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        self._fetch_to(self._fetched + self.batch)
+
+    def _fetch_to(self, count):
+        """把前 count 行交给视图"""
+        count = min(count, len(self._names))
+        if count <= self._fetched:
+            return
+        self.beginInsertRows(QModelIndex(), self._fetched, count - 1)
+        self.stats["fetched"] += count - self._fetched
+        self._fetched = count
+        self.endInsertRows()
+
+    def set_storage(self, storage):
+        """切换预设文件夹，已绘制的缩略图全部作废"""
+        self.storage = storage
+        self._thumbnails.clear()
+        self._pending.clear()
+        if self._fetched:
+            self.dataChanged.emit(self.index(0), self.index(self._fetched - 1), [Qt.DecorationRole])
+
+    # --- 名称列表 ---
+
+    def set_names(self, names):
+        """更新为新的名称列表（已排序），只插入、删除变化的行"""
+        names = list(names)
+        old = set(self._names)
+        new = set(names)
+        removed = old - new
+        added = new - old
+        if not self._names or len(removed) + len(added) > RESET_THRESHOLD:
+            self.beginResetModel()
+            self._names = names
+            self._fetched = min(len(names), max(self._fetched, self.batch))
+            self.stats["resets"] += 1
+            self.endResetModel()
+        else:
+            for name in sorted(removed, reverse=True):
+                self.remove_name(name)
+            for name in sorted(added):
+                self.insert_name(name)
+        for name in removed:
+            self._thumbnails.pop(name, None)
+
+    def insert_name(self, name):
+        """按顺序插入一个名称，返回所在行"""
+        row = bisect_left(self._names, name)
+        if row < len(self._names) and self._names[row] == name:
+            return row
+        if row <= self._fetched:
+            # 插入到已经取到的范围内，通知视图
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._names.insert(row, name)
+            self._fetched += 1
+            self.endInsertRows()
+        else:
+            self._names.insert(row, name)
+        self.stats["inserted"] += 1
+        return row
+
+    def remove_name(self, name):
+        """删除一个名称"""
+        row = bisect_left(self._names, name)
+        if row >= len(self._names) or self._names[row] != name:
+            return False
+        if row < self._fetched:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._names[row]
+            self._fetched -= 1
+            self.endRemoveRows()
+        else:
+            del self._names[row]
+        self.stats["removed"] += 1
+        return True
+
+    def row_of(self, name, fetch=True):
+        """名称所在的行，不存在时返回 -1；fetch 为 True 时先把该行交给视图"""
+        row = bisect_left(self._names, name)
+        if row >= len(self._names) or self._names[row] != name:
+            return -1
+        if row >= self._fetched:
+            if not fetch:
+                return -1
+            self._fetch_to(row + 1)
+        return row
+
+    # --- 缩略图 ---
+
+    def thumbnail(self, name):
+        """已绘制的缩略图；还没有时在后台开始绘制并返回 None"""
+        icon = self._thumbnails.get(name)
+        if icon is not None:
+            self._thumbnails.move_to_end(name)
+            return icon
+        if name not in self._pending:
+            self._pending.add(name)
+            self.thread_pool.start(_ThumbnailTask(self.storage, name, self._signals))
+        return None
+
+    def invalidate_thumbnail(self, name):
+        """预设内容改变后重新绘制缩略图"""
+        if self._thumbnails.pop(name, None) is not None:
+            row = self.row_of(name, fetch=False)
+            if row >= 0:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def is_pending(self):
+        """是否有正在绘制的缩略图"""
+        return bool(self._pending)
+
+    def _on_thumbnail(self, name, image):
+        """缩略图绘制完成（在 GUI 线程中执行）"""
+        if name not in self._pending:
+            return  # 切换文件夹之前开始绘制的缩略图
+        self._pending.discard(name)
+        if image is None:
+            return
+        self._thumbnails[name] = QIcon(QPixmap.fromImage(image))
+        self.stats["thumbnails"] += 1
+        while len(self._thumbnails) > THUMBNAIL_CACHE:
+            self._thumbnails.popitem(last=False)
+        row = self.row_of(name, fetch=False)
+        if row >= 0:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+
+class PresetComboBox(QComboBox):
+    """使用 PresetListModel 的下拉框，保持 QComboBox 按文字选择的用法"""
+
+    def __init__(self, storage=None, parent=None):
+        super().__init__(parent)
+        view = QListView(self)
+        view.setUniformItemSizes(True)  # 行高相同，滚动时不需要逐行测量
+        self.setView(view)
+        self.preset_model = PresetListModel(storage, self)
+        self.setModel(self.preset_model)
+        self.setMaxVisibleItems(20)
+
+    def findText(self, text, flags=Qt.MatchExactly | Qt.MatchCaseSensitive):
+        if flags == Qt.MatchExactly | Qt.MatchCaseSensitive:
+            return self.preset_model.row_of(text)
+        return super().findText(text, flags)
+
+    def setCurrentText(self, text):
+        row = self.preset_model.row_of(text)
+        if row >= 0:
+            self.setCurrentIndex(row)
+
+    def addItem(self, text, *args):
+        self.preset_model.insert_name(text)
+
+    def addItems(self, texts):
+        for text in texts:
+            self.preset_model.insert_name(text)
+
+    def clear(self):
+        self.preset_model.set_names([])
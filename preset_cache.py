@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+已解析预设的缓存
+
+在两个预设之间来回切换时，不再每次都打开文件、解析 JSON 和校验。缓存按
+最近使用顺序保留有限数量的预设，用存储的版本标记（文件的修改时间和大小）
+判断是否过期。
+
+切换预设后在后台线程中预取相邻的预设，下拉框或热键切换到相邻预设时
+GUI 线程只需要检查一次版本标记。
+
+不依赖 Qt，ConfigUI 和守护模式共用。
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from preset_io import default_config
+from preset_schema import normalize_preset
+
+
+# 缓存的预设数量上限
+DEFAULT_CAPACITY = 16
+
+
+def neighbors(names, name, distance=1):
+    """names 中 name 前后各 distance 个预设（循环）"""
+    if name not in names or len(names) < 2:
+        return []
+    index = names.index(name)
+    result = []
+    for offset in range(1, distance + 1):
+        for candidate in (names[(index + offset) % len(names)], names[(index - offset) % len(names)]):
+            if candidate != name and candidate not in result:
+                result.append(candidate)
+    return result
+
+
+class _Entry:
+    __slots__ = ("stamp", "config", "prefetched")
+
+    def __init__(self, stamp, config, prefetched):
+        self.stamp = stamp
+        self.config = config
+        self.prefetched = prefetched  # 由预取加载、还没有被使用
+
+
+class PresetCache:
+    """按版本标记失效的 LRU 缓存"""
+
+    def __init__(self, storage, capacity=DEFAULT_CAPACITY):
+        self.storage = storage
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0  # 缓存过期后重新读取（也计入 misses）
+        self.prefetched = 0
+        self.prefetch_hits = 0
+
+    def get(self, name):
+        """读取预设（迁移并校验后的配置副本），和 preset_io.read_preset 结果相同"""
+        stamp = self.storage.stamp(name)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and stamp is not None and entry.stamp == stamp:
+                self._entries.move_to_end(name)
+                self.hits += 1
+                if entry.prefetched:
+                    entry.prefetched = False
+                    self.prefetch_hits += 1
+                return copy.deepcopy(entry.config)
+            self.misses += 1
+            if entry is not None:
+                self.stale += 1
+        config = self._load(name, stamp, prefetched=False)
+        return copy.deepcopy(config)
+
+    def _load(self, name, stamp, prefetched):
+        """读取、校验并放入缓存"""
+        data = self.storage.load(name)
+        config, issues = normalize_preset(data or {}, default_config())
+        for issue in issues:
+            print(f"预设 {name}: {issue}")
+        if stamp is not None:
+            with self._lock:
+                self._entries[name] = _Entry(stamp, config, prefetched)
+                self._entries.move_to_end(name)
+                while len(self._entries) > self.capacity:
+                    self._entries.popitem(last=False)
+        return config
+
+    def invalidate(self, name=None):
+        """丢弃一个预设（name 为空时丢弃全部）"""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def prefetch(self, names):
+        """在后台线程中加载不在缓存中（或已过期）的预设"""
+        if not names:
+            return None
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preset-prefetch")
+        return self._executor.submit(self._prefetch, list(names))
+
+    def prefetch_neighbors(self, name, names=None, distance=1):
+        """预取 name 的相邻预设，names 为空时在后台线程中列出预设"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preset-prefetch")
+        return self._executor.submit(self._prefetch_neighbors, name, names, distance)
+
+    def _prefetch_neighbors(self, name, names, distance):
+        if names is None:
+            names = self.storage.list_presets()
+        self._prefetch(neighbors(list(names), name, distance))
+
+    def _prefetch(self, names):
+        for name in names:
+            try:
+                stamp = self.storage.stamp(name)
+                with self._lock:
+                    entry = self._entries.get(name)
+                    if stamp is None or (entry is not None and entry.stamp == stamp):
+                        continue
+                self._load(name, stamp, prefetched=True)
+                with self._lock:
+                    self.prefetched += 1
+            except Exception as e:
+                print(f"预取预设 {name} 失败: {e}")
+
+    def stats(self):
+        """命中率和预取效果"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "prefetched": self.prefetched,
+            "prefetch_hits": self.prefetch_hits,
+            "prefetch_effectiveness": round(self.prefetch_hits / self.prefetched, 3) if self.prefetched else None,
+        }
+
+    def close(self):
+        """停止预取线程"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
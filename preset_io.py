@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+预设文件读写
+
+不依赖 Qt 控件，ConfigUI 和无界面的守护模式共用这些函数。预设通过
+preset_storage 中的存储后端读写。
+"""
+
+import os
+
+from frame_governor import DEFAULT_POWER_PROFILE
+from preset_schema import normalize_preset, dump_preset
+from preset_storage import FileSystemStorage
+
+
+# 预设的默认配置，加载时用文件中的值覆盖
+DEFAULT_CONFIG = {
+    "size": 20,
+    "color": "#FF0000",
+    "shape": "cross",
+    "thickness": 2,
+    "opacity": 0.8,
+    "position": {"x": "center", "y": "center"},
+    "hollow_gap": 0,
+    "hollow_length": 30,
+    "hollow_thickness": 2,
+    "center_dot_size": 3,
+    "animation": "none",
+    "animation_frames": 24,
+    "power_profile": DEFAULT_POWER_PROFILE,
+}
+
+
+def default_config():
+    """返回一份新的默认配置"""
+    config = dict(DEFAULT_CONFIG)
+    config["position"] = dict(DEFAULT_CONFIG["position"])
+    return config
+
+
+def default_config_dir():
+    """默认的预设文件夹（Windows 下位于 APPDATA，其它平台位于 ~/.config）"""
+    base = os.environ.get('APPDATA') or os.path.join(os.path.expanduser('~'), '.config')
+    return os.path.join(base, 'CrosshairApp')
+
+
+def default_storage():
+    """默认的预设存储"""
+    return FileSystemStorage(default_config_dir())
+
+
+def preset_name_from_path(path):
+    """从预设路径中取出预设名称"""
+    name = os.path.basename(path)
+    return name[:-5] if name.endswith('.json') else name
+
+
+def read_preset(storage, preset_name):
+    """读取预设，迁移到当前版本并校验，缺失或无效的参数使用默认值补充"""
+    loaded_config = storage.load(preset_name)
+    if loaded_config is None:
+        loaded_config = {}
+
+    config, issues = normalize_preset(loaded_config, default_config())
+    for issue in issues:
+        print(f"预设 {preset_name}: {issue}")
+    return config
+
+
+def write_preset(storage, preset_name, config):
+    """写入预设（带版本号）"""
+    storage.save(preset_name, dump_preset(config))
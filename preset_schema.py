@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+预设文件的版本化结构定义、校验和迁移
+
+每个字段在模块加载时编译成一个转换函数，校验时对预设只遍历一次：
+类型可以安全转换的值（如字符串 "20"、浮点数 3.0）直接转换，超出范围的数值
+截断到界面滑块的范围，无法使用的值和未知字段被丢弃，并记录问题说明。
+
+版本历史：
+    1   没有 version 字段的旧文件；position 可能是 "center" 字符串或 [x, y] 列表
+    2   当前版本，写入 version 字段；position 为 {"x": ..., "y": ...}
+
+layers 字段是附加准星图层的列表，每个图层可以写出自己的外观字段和相对主准星
+中心的 offset，没有写出的外观字段沿用主准星的值，例如：
+    "layers": [{"shape": "dot", "size": 3, "color": "#00FF00", "offset": {"x": 0, "y": 40}}]
+
+本模块不依赖 Qt，批量检查工具可以在多个进程中并行使用。
+"""
+
+import re
+import copy
+import math
+
+from frame_governor import POWER_PROFILES
+from adaptive_color import ADAPTIVE_MODES
+from live_params import BLOCK_NAME_PATTERN
+
+
+SCHEMA_VERSION = 2
+VERSION_KEY = "version"
+
+SHAPES = ["cross", "dot", "square", "circle", "triangle", "hollow_cross", "hollow_square", "hollow_cross_dot"]
+# 图片准星，image 字段引用 PNG 或 SVG 文件
+IMAGE_SHAPE = "image"
+IMAGE_EXTENSIONS = (".png", ".svg")
+IMAGE_TINTS = ["none", "color"]
+ANIMATIONS = ["none", "pulse", "rotate", "breathe"]
+SIZE_UNITS = ["logical", "physical", "screen"]
+SCOPE_MODES = ["off", "on"]
+
+# (字段名, 类型, 参数)，数值范围与配置界面的滑块一致
+FIELDS = (
+    ("size", "int", (1, 100)),
+    ("color", "color", None),
+    ("shape", "choice", SHAPES + [IMAGE_SHAPE]),
+    ("image", "image", IMAGE_EXTENSIONS),
+    ("image_tint", "choice", IMAGE_TINTS),
+    ("thickness", "int", (1, 20)),
+    ("opacity", "float", (0.1, 1.0)),
+    ("position", "position", None),
+    ("hollow_gap", "int", (0, 50)),
+    ("hollow_length", "int", (10, 100)),
+    ("hollow_thickness", "int", (1, 10)),
+    ("center_dot_size", "int", (1, 10)),
+    ("size_unit", "choice", SIZE_UNITS),
+    ("animation", "choice", ANIMATIONS),
+    ("animation_frames", "int", (4, 120)),
+    ("animation_period", "int", (50, 60000)),
+    ("animation_memory_mb", "float", (0.5, 256.0)),
+    ("power_profile", "choice", list(POWER_PROFILES)),
+    ("idle_timeout", "int", (0, 3600000)),
+    ("live_params", "block_name", None),
+    ("adaptive_color", "choice", ADAPTIVE_MODES),
+    ("adaptive_interval", "int", (50, 5000)),
+    ("adaptive_radius", "int", (2, 64)),
+    ("scope", "choice", SCOPE_MODES),
+    ("scope_zoom", "int", (2, 8)),
+    ("scope_size", "int", (64, 480)),
+    ("scope_offset", "offset", (-400, 400)),
+    ("scope_fps", "int", (10, 240)),
+)
+
+# 附加图层可以单独设置的外观字段，以及相对主准星中心的偏移范围（像素）
+LAYER_KEYS = ("shape", "size", "color", "thickness", "opacity", "image", "image_tint",
+              "hollow_gap", "hollow_length", "hollow_thickness", "center_dot_size")
+LAYER_OFFSET_RANGE = (-400, 400)
+MAX_LAYERS = 8
+
+LAYER_FIELDS = tuple(field for field in FIELDS if field[0] in LAYER_KEYS) + (
+    ("offset", "offset", LAYER_OFFSET_RANGE),
+)
+FIELDS = FIELDS + (("layers", "layers", (LAYER_FIELDS, MAX_LAYERS)),)
+
+_COLOR_PATTERN = re.compile(r"^#(?:[0-9A-Fa-f]{3}|[0-9A-Fa-f]{6}|[0-9A-Fa-f]{8})$")
+
+# QColor 认识的颜色名称（SVG 颜色关键字和 transparent，不区分大小写）
+COLOR_NAMES = frozenset("""
+    aliceblue antiquewhite aqua aquamarine azure beige bisque black blanchedalmond blue
+    blueviolet brown burlywood cadetblue chartreuse chocolate coral cornflowerblue cornsilk
+    crimson cyan darkblue darkcyan darkgoldenrod darkgray darkgreen darkgrey darkkhaki
+    darkmagenta darkolivegreen darkorange darkorchid darkred darksalmon darkseagreen
+    darkslateblue darkslategray darkslategrey darkturquoise darkviolet deeppink deepskyblue
+    dimgray dimgrey dodgerblue firebrick floralwhite forestgreen fuchsia gainsboro ghostwhite
+    gold goldenrod gray green greenyellow grey honeydew hotpink indianred indigo ivory khaki
+    lavender lavenderblush lawngreen lemonchiffon lightblue lightcoral lightcyan
+    lightgoldenrodyellow lightgray lightgreen lightgrey lightpink lightsalmon lightseagreen
+    lightskyblue lightslategray lightslategrey lightsteelblue lightyellow lime limegreen linen
+    magenta maroon mediumaquamarine mediumblue mediumorchid mediumpurple mediumseagreen
+    mediumslateblue mediumspringgreen mediumturquoise mediumvioletred midnightblue mintcream
+    mistyrose moccasin navajowhite navy oldlace olive olivedrab orange orangered orchid
+    palegoldenrod palegreen paleturquoise palevioletred papayawhip peachpuff peru pink plum
+    powderblue purple red rosybrown royalblue saddlebrown salmon sandybrown seagreen seashell
+    sienna silver skyblue slateblue slategray slategrey snow springgreen steelblue tan teal
+    thistle tomato transparent turquoise violet wheat white whitesmoke yellow yellowgreen
+""".split())
+
+
+class InvalidValue(ValueError):
+    """字段值无法使用"""
+
+
+def _to_number(value, kind):
+    """把数值或数字字符串转换为 int / float"""
+    if isinstance(value, bool):
+        raise InvalidValue(f"期望数值，实际为 {value!r}")
+    if isinstance(value, str):
+        try:
+            value = float(value.strip())
+        except ValueError:
+            raise InvalidValue(f"期望数值，实际为 {value!r}") from None
+    if not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise InvalidValue(f"期望数值，实际为 {value!r}")
+    return int(round(value)) if kind == "int" else float(value)
+
+
+def _number_coercer(kind, limits):
+    low, high = limits
+
+    def coerce(value, notes):
+        number = _to_number(value, kind)
+        if number < low or number > high:
+            clamped = min(max(number, low), high)
+            notes.append(f"{number} 超出范围 [{low}, {high}]，已改为 {clamped}")
+            number = clamped
+        return number
+    return coerce
+
+
+def _choice_coercer(choices):
+    allowed = frozenset(choices)
+
+    def coerce(value, notes):
+        if value not in allowed:
+            raise InvalidValue(f"{value!r} 不是可选值之一")
+        return value
+    return coerce
+
+
+def _color_coercer(value, notes):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f"#{value & 0xFFFFFF:06X}"
+    if isinstance(value, str) and (_COLOR_PATTERN.match(value) or value.lower() in COLOR_NAMES):
+        return value
+    raise InvalidValue(f"{value!r} 不是颜色")
+
+
+def _str_coercer(value, notes):
+    if not isinstance(value, str):
+        raise InvalidValue(f"期望字符串，实际为 {value!r}")
+    return value
+
+
+def _block_name_coercer(value, notes):
+    if value == "":
+        return value  # 不使用实时参数块
+    if not isinstance(value, str) or not BLOCK_NAME_PATTERN.fullmatch(value):
+        raise InvalidValue(f"{value!r} 不是参数块名称（只能包含字母、数字、下划线和连字符）")
+    return value
+
+
+def _coordinate(value):
+    if value == "center":
+        return value
+    return _to_number(value, "int")
+
+
+def _position_coercer(value, notes):
+    if not isinstance(value, dict) or "x" not in value or "y" not in value:
+        raise InvalidValue(f"{value!r} 不是位置")
+    return {"x": _coordinate(value["x"]), "y": _coordinate(value["y"])}
+
+
+def _image_coercer(extensions):
+    def coerce(value, notes):
+        if not isinstance(value, str) or not value.lower().endswith(extensions):
+            raise InvalidValue(f"{value!r} 不是 PNG 或 SVG 图片路径")
+        return value
+    return coerce
+
+
+def _offset_coercer(limits):
+    number = _number_coercer("int", limits)
+
+    def coerce(value, notes):
+        if not isinstance(value, dict):
+            raise InvalidValue(f"{value!r} 不是偏移")
+        return {"x": number(value.get("x", 0), notes), "y": number(value.get("y", 0), notes)}
+    return coerce
+
+
+def _layers_coercer(arg):
+    fields, max_layers = arg
+    schema = PresetSchema(fields)
+
+    def coerce(value, notes):
+        if not isinstance(value, list):
+            raise InvalidValue(f"期望列表，实际为 {value!r}")
+        if len(value) > max_layers:
+            notes.append(f"最多 {max_layers} 个图层，已忽略后面的 {len(value) - max_layers} 个")
+            value = value[:max_layers]
+        layers = []
+        for index, item in enumerate(value, 1):
+            if not isinstance(item, dict):
+                notes.append(f"第 {index} 个图层不是对象，已忽略")
+                continue
+            layer, issues = schema.validate(item)
+            notes.extend(f"第 {index} 个图层 {issue}" for issue in issues)
+            layers.append(layer)
+        return layers
+    return coerce
+
+
+def compile_field(kind, arg):
+    """为一种字段类型生成转换函数 coerce(value, notes)"""
+    if kind in ("int", "float"):
+        return _number_coercer(kind, arg)
+    if kind == "choice":
+        return _choice_coercer(arg)
+    if kind == "color":
+        return _color_coercer
+    if kind == "position":
+        return _position_coercer
+    if kind == "block_name":
+        return _block_name_coercer
+    if kind == "str":
+        return _str_coercer
+    if kind == "offset":
+        return _offset_coercer(arg)
+    if kind == "image":
+        return _image_coercer(tuple(arg))
+    if kind == "layers":
+        return _layers_coercer(arg)
+    raise ValueError(f"unknown field kind: {kind}")
+
+
+class PresetSchema:
+    """编译后的预设结构"""
+
+    def __init__(self, fields):
+        self.fields = tuple(name for name, _, _ in fields)
+        self._coercers = {name: compile_field(kind, arg) for name, kind, arg in fields}
+
+    def coerce_field(self, key, value):
+        """转换单个字段，未知字段或无法使用的值抛出 ValueError"""
+        coerce = self._coercers.get(key)
+        if coerce is None:
+            raise ValueError(f"unknown field: {key}")
+        return coerce(value, [])
+
+    def validate(self, data, defaults=None):
+        """校验并转换一个（已迁移到当前版本的）预设，返回 (config, issues)
+
+        无法使用的值改用 defaults 中的默认值（没有默认值时丢弃）。
+        """
+        coercers = self._coercers
+        config = {}
+        issues = []
+        for key, value in data.items():
+            if key == VERSION_KEY:
+                continue
+            coerce = coercers.get(key)
+            if coerce is None:
+                issues.append(f"{key}: 未知字段，已忽略")
+                continue
+            notes = []
+            try:
+                config[key] = coerce(value, notes)
+            except InvalidValue as e:
+                issues.append(f"{key}: {e}，已使用默认值")
+                continue
+            for note in notes:
+                issues.append(f"{key}: {note}")
+
+        if defaults:
+            for key, value in defaults.items():
+                if key not in config:
+                    config[key] = copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+        return config, issues
+
+
+SCHEMA = PresetSchema(FIELDS)
+
+# 可以通过控制服务直接修改的配置字段
+CONFIG_FIELDS = frozenset(SCHEMA.fields)
+
+
+def _migrate_v1(data):
+    """版本 1 -> 2：统一 position 的格式"""
+    position = data.get("position")
+    if position == "center" or (position is None and "position" in data):
+        data["position"] = {"x": "center", "y": "center"}
+    elif isinstance(position, (list, tuple)) and len(position) == 2:
+        data["position"] = {"x": position[0], "y": position[1]}
+    elif isinstance(position, dict):
+        data["position"] = {
+            "x": position.get("x", "center"),
+            "y": position.get("y", "center"),
+        }
+    return data
+
+
+# 从某个版本迁移到下一个版本的函数
+MIGRATIONS = {
+    1: _migrate_v1,
+}
+
+
+def preset_version(data):
+    """预设的版本号，没有 version 字段的旧文件为 1"""
+    version = data.get(VERSION_KEY, 1)
+    if not isinstance(version, int) or isinstance(version, bool):
+        return 1
+    return max(version, 1)
+
+
+def migrate(data):
+    """把预设迁移到当前版本，返回新的字典（不修改传入的数据）"""
+    data = dict(data)
+    version = preset_version(data)
+    while version < SCHEMA_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+    data[VERSION_KEY] = max(version, SCHEMA_VERSION)
+    return data
+
+
+def normalize_preset(data, defaults=None):
+    """迁移并校验预设，返回 (config, issues)"""
+    if not isinstance(data, dict):
+        return (dict(defaults) if defaults else {}), ["预设内容不是 JSON 对象"]
+    issues = []
+    if preset_version(data) > SCHEMA_VERSION:
+        issues.append(f"{VERSION_KEY}: 文件版本 {data[VERSION_KEY]} 比程序支持的版本 {SCHEMA_VERSION} 新")
+    config, field_issues = SCHEMA.validate(migrate(data), defaults)
+    return config, issues + field_issues
+
+
+def dump_preset(config):
+    """生成写入文件的预设内容（带版本号）"""
+    data = {VERSION_KEY: SCHEMA_VERSION}
+    data.update((key, value) for key, value in config.items() if key != VERSION_KEY)
+    return data
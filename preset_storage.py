@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+预设存储后端
+
+ConfigUI 和守护模式通过这里的接口读写预设，不直接访问文件：
+    FileSystemStorage   预设文件夹中的 NAME.json（默认）
+    TempDirStorage      临时文件夹，cleanup() 时删除
+    MemoryStorage       只在内存中保存，不访问磁盘，用于测试和基准测试
+
+load 返回 JSON 解析后的原始数据，迁移和校验由 preset_io 负责。
+"""
+
+import os
+import glob
+import json
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+
+
+class PresetStorage(ABC):
+    """预设存储接口，子类没有实现全部方法时无法创建实例"""
+
+    # 显示给用户的存储位置
+    location = ""
+
+    @abstractmethod
+    def path(self, name):
+        """预设的完整路径（用于显示）"""
+
+    @abstractmethod
+    def list_presets(self):
+        """按名称排序的预设列表"""
+
+    @abstractmethod
+    def exists(self, name):
+        """预设是否存在"""
+
+    @abstractmethod
+    def stamp(self, name):
+        """预设内容的版本标记，内容改变时标记也改变；不存在时返回 None"""
+
+    @abstractmethod
+    def load(self, name):
+        """读取预设，不存在时返回 None，内容不是合法 JSON 时抛出 ValueError"""
+
+    @abstractmethod
+    def save(self, name, data):
+        """保存预设"""
+
+    @abstractmethod
+    def delete(self, name):
+        """删除预设，返回是否存在"""
+
+
+def _strip_suffix(name):
+    return name[:-5] if name.endswith('.json') else name
+
+
+class FileSystemStorage(PresetStorage):
+    """文件夹中的 JSON 文件"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.location = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name):
+        return os.path.join(self.directory, _strip_suffix(name) + '.json')
+
+    def list_presets(self):
+        files = glob.glob(os.path.join(self.directory, '*.json'))
+        return sorted(os.path.basename(file)[:-5] for file in files)
+
+    def exists(self, name):
+        return os.path.exists(self.path(name))
+
+    def stamp(self, name):
+        """文件的 (修改时间, 大小)"""
+        try:
+            stat = os.stat(self.path(name))
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(self, name):
+        path = self.path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, name, data):
+        with open(self.path(name), 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    def delete(self, name):
+        path = self.path(name)
+        if not os.path.exists(path):
+            return False
+        os.remove(path)
+        return True
+
+
+class TempDirStorage(FileSystemStorage):
+    """临时文件夹中的 JSON 文件"""
+
+    def __init__(self, prefix="crosshair-presets-"):
+        super().__init__(tempfile.mkdtemp(prefix=prefix))
+
+    def cleanup(self):
+        """删除临时文件夹"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class MemoryStorage(PresetStorage):
+    """只保存在内存中的预设
+
+    以 JSON 文本保存，读写行为（数据副本、类型转换）与文件一致。
+    """
+
+    location = "memory://"
+
+    def __init__(self, presets=None):
+        self._presets = {}
+        self._revisions = {}
+        for name, data in (presets or {}).items():
+            self.save(name, data)
+
+    def path(self, name):
+        return self.location + _strip_suffix(name) + '.json'
+
+    def list_presets(self):
+        return sorted(self._presets)
+
+    def exists(self, name):
+        return _strip_suffix(name) in self._presets
+
+    def stamp(self, name):
+        return self._revisions.get(_strip_suffix(name))
+
+    def load(self, name):
+        text = self._presets.get(_strip_suffix(name))
+        return None if text is None else json.loads(text)
+
+    def save(self, name, data):
+        name = _strip_suffix(name)
+        self._presets[name] = json.dumps(data, ensure_ascii=False)
+        self._revisions[name] = self._revisions.get(name, 0) + 1
+
+    def delete(self, name):
+        self._revisions.pop(_strip_suffix(name), None)
+        return self._presets.pop(_strip_suffix(name), None) is not None
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+预设文件批量检查和迁移工具
+
+示例:
+    python preset_tool.py validate %APPDATA%/CrosshairApp
+    python preset_tool.py migrate presets/ --write --jobs 8
+    python preset_tool.py migrate library/ --recursive --write --json
+
+validate 只报告问题；migrate 把文件迁移到当前版本，用加载预设时的默认值补全
+缺失的参数，并写回校验后的内容（不加 --write 时只显示会被修改的文件）。
+文件在多个进程中并行处理，写回时先写临时文件再替换，中断时不会留下写了
+一半的预设，文件权限保持不变。版本比程序新的预设只报告问题，不会写回（写回会
+丢掉新版本的参数）。
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import tempfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from preset_io import default_config
+from preset_schema import SCHEMA_VERSION, VERSION_KEY, normalize_preset, dump_preset, preset_version
+
+
+# 无法使用的文件（读取失败、不是 JSON 或不是 JSON 对象）的问题前缀
+UNREADABLE = "无法读取"
+NOT_OBJECT = "预设内容不是 JSON 对象"
+
+# 版本比程序新、不会迁移的文件的问题前缀
+NEWER_VERSION = "文件版本比程序新"
+
+# 递归扫描时跳过的子文件夹（预渲染准星缓存）
+SKIP_DIRS = {"sprites"}
+
+
+def is_invalid(issues):
+    """check_file 的问题列表是否表示文件无法使用"""
+    return bool(issues) and (issues[0].startswith(UNREADABLE) or issues[0] == NOT_OBJECT)
+
+
+def is_newer(issues):
+    """check_file 的问题列表是否表示文件版本比程序新"""
+    return bool(issues) and issues[0].startswith(NEWER_VERSION)
+
+
+def write_atomic(path, data):
+    """先写同一文件夹中的临时文件再替换，读取端不会看到写了一半的文件"""
+    fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)  # mkstemp 创建的文件权限为 0600
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def check_file(path, write=False, fill_defaults=True):
+    """检查（并可选地迁移）一个预设文件，返回 (path, issues, changed)
+
+    fill_defaults 时和加载预设一样用默认配置补全缺失的参数。
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        return path, [f"{UNREADABLE}: {e}"], False
+    if not isinstance(data, dict):
+        return path, [NOT_OBJECT], False
+    if preset_version(data) > SCHEMA_VERSION:
+        return path, [f"{NEWER_VERSION}: {VERSION_KEY} 为 {data[VERSION_KEY]}，程序支持到 {SCHEMA_VERSION}，不会迁移"], False
+
+    config, issues = normalize_preset(data, default_config() if fill_defaults else None)
+    migrated = dump_preset(config)
+    changed = migrated != data
+    if write and changed:
+        try:
+            write_atomic(path, migrated)
+        except OSError as e:
+            issues.append(f"写回失败: {e}")
+    return path, issues, changed
+
+
+def _check_files(paths, write, fill_defaults=True):
+    return [check_file(path, write, fill_defaults) for path in paths]
+
+
+def collect_presets(paths, recursive=False):
+    """展开目录，返回所有预设文件；recursive 时包括子文件夹"""
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+        elif not recursive:
+            files.extend(glob.glob(os.path.join(path, '*.json')))
+        else:
+            for root, dirs, names in os.walk(path):
+                dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
+                files.extend(os.path.join(root, name) for name in names if name.endswith('.json'))
+    return sorted(files)
+
+
+def run(files, write=False, jobs=None, fill_defaults=True):
+    """并行处理文件，按文件顺序返回结果"""
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(files) < 64:
+        return _check_files(files, write, fill_defaults)
+    # 分块提交，减少进程间通信次数
+    size = max(16, len(files) // (jobs * 4))
+    chunks = [files[i:i + size] for i in range(0, len(files), size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for chunk_results in executor.map(_check_files, chunks, [write] * len(chunks),
+                                          [fill_defaults] * len(chunks)):
+            results.extend(chunk_results)
+    return results
+
+
+def summarize(results, command, write, elapsed):
+    """汇总结果（可序列化为 JSON）"""
+    invalid = [path for path, issues, _ in results if is_invalid(issues)]
+    newer = [path for path, issues, _ in results if is_newer(issues)]
+    changed = sum(1 for _, _, was_changed in results if was_changed)
+    return {
+        "command": command,
+        "files": len(results),
+        "invalid": len(invalid),
+        "newer": len(newer),
+        "with_issues": sum(1 for _, issues, _ in results if issues),
+        "changed": changed,
+        "written": changed if write else 0,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "files_per_second": round(len(results) / elapsed) if elapsed > 0 else None,
+        "invalid_files": invalid,
+        "newer_files": newer,
+    }
+
+
+def main(argv=None):
+    """主函数"""
+    parser = argparse.ArgumentParser(description="预设文件批量检查和迁移工具")
+    parser.add_argument("command", choices=["validate", "migrate"])
+    parser.add_argument("paths", nargs="+", help="预设文件或文件夹")
+    parser.add_argument("--write", action="store_true", help="migrate 时写回文件")
+    parser.add_argument("-r", "--recursive", action="store_true", help="包括子文件夹中的预设")
+    parser.add_argument("--no-defaults", action="store_true",
+                        help="不用默认配置补全缺失的参数（只迁移和校验已有的参数）")
+    parser.add_argument("--jobs", type=int, default=None, help="并行进程数，默认为 CPU 核心数")
+    parser.add_argument("--quiet", action="store_true", help="只输出汇总")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出汇总")
+    options = parser.parse_args(argv)
+
+    files = collect_presets(options.paths, options.recursive)
+    write = options.command == "migrate" and options.write
+    start = time.perf_counter()
+    results = run(files, write, options.jobs, not options.no_defaults)
+    elapsed = time.perf_counter() - start
+
+    if not options.quiet:
+        for path, issues, was_changed in results:
+            for issue in issues:
+                print(f"{path}: {issue}", file=sys.stderr if options.json else sys.stdout)
+            if options.command == "migrate" and was_changed and not options.json:
+                print(f"{path}: {'已迁移' if write else '需要迁移'}")
+
+    summary = summarize(results, options.command, write, elapsed)
+    if options.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+    else:
+        text = f"{summary['files']} 个文件，{summary['invalid']} 个无法使用，{summary['with_issues']} 个有问题"
+        if summary["newer"]:
+            text += f"，{summary['newer']} 个版本比程序新"
+        if options.command == "migrate":
+            text += f"，{summary['changed']} 个{'已迁移' if write else '需要迁移'}"
+        print(f"{text}（{summary['elapsed_ms']:.0f} ms）")
+    if options.command == "validate" and summary["with_issues"]:
+        return 1
+    return 1 if summary["invalid"] or summary["newer"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
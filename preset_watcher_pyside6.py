@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+预设文件热加载
+
+管理员直接修改或推送预设 JSON 时，不需要再点击“加载预设”。PresetWatcher 用
+QFileSystemWatcher 监视当前预设文件：
+
+    连续写入        合并为一次重新加载（去抖）
+    解析            在线程池中读取和校验，不阻塞 GUI 线程
+    写了一半的文件  解析失败，保留上一份有效配置，等待下一次写入
+    替换写入        编辑器先写临时文件再改名时，文件会从监视列表中移除，
+                    通过监视所在文件夹重新加入
+
+控制器收到 reloaded 信号后只应用变化的字段，然后调用 applied() 记录从文件
+写入到应用配置、以及到覆盖层画出新画面的延迟。
+"""
+
+import os
+import time
+
+from PySide6.QtCore import QObject, QFileSystemWatcher, QRunnable, QThreadPool, QTimer, Signal
+
+from preset_io import default_config
+from preset_schema import normalize_preset
+
+
+# 最后一次写入后等待的时间（毫秒）
+DEBOUNCE_MS = 100
+
+
+def changed_fields(old, new):
+    """new 中和 old 不同的字段"""
+    return {key: value for key, value in new.items() if old.get(key) != value}
+
+
+class _ReloadSignals(QObject):
+    """后台读取任务的信号"""
+    finished = Signal(int, float, object, str)
+
+
+class _ReloadTask(QRunnable):
+    """在线程池中读取并校验预设"""
+
+    def __init__(self, generation, write_time, storage, preset_name, signals):
+        super().__init__()
+        self.generation = generation
+        self.write_time = write_time
+        self.storage = storage
+        self.preset_name = preset_name
+        self.signals = signals
+
+    def run(self):
+        try:
+            data = self.storage.load(self.preset_name)
+            if not isinstance(data, dict):
+                raise ValueError("预设文件为空或不是 JSON 对象")
+            config, _ = normalize_preset(data, default_config())
+        except Exception as e:
+            self.signals.finished.emit(self.generation, self.write_time, None, str(e))
+            return
+        self.signals.finished.emit(self.generation, self.write_time, config, "")
+
+
+class PresetWatcher(QObject):
+    """监视一个预设文件，修改后在后台重新解析"""
+
+    # 解析成功：完整的配置
+    reloaded = Signal(dict)
+    # 解析失败：错误信息（继续使用上一份配置）
+    reload_failed = Signal(str)
+
+    def __init__(self, parent=None, debounce_ms=DEBOUNCE_MS, thread_pool=None):
+        super().__init__(parent)
+        self.storage = None
+        self.preset_name = None
+        self.path = None
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+
+        self.reload_count = 0
+        self.failure_count = 0
+        self.apply_latency_ms = None  # 文件写入到应用配置
+        self.frame_latency_ms = None  # 文件写入到画出新画面
+
+        self._generation = 0
+        self._write_time = None
+        self._frame_source = None
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_file_changed)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(debounce_ms)
+        self.debounce_timer.timeout.connect(self.reload)
+
+        self._signals = _ReloadSignals()
+        self._signals.finished.connect(self._on_loaded)
+
+    def watch(self, storage, preset_name):
+        """开始监视预设文件（不在磁盘上的存储不监视），文件还不存在时等它被创建"""
+        path = storage.path(preset_name)
+        if path == self.path and storage is self.storage:
+            return
+        self.stop()
+        self.storage = storage
+        self.preset_name = preset_name
+        if not os.path.isdir(os.path.dirname(path)):
+            return
+        self.path = path
+        self.watcher.addPath(os.path.dirname(path))
+        if os.path.isfile(path):
+            self.watcher.addPath(path)
+
+    def stop(self):
+        """停止监视，丢弃还没完成的重新加载"""
+        paths = self.watcher.files() + self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
+        self.debounce_timer.stop()
+        self._generation += 1
+        self.path = None
+
+    def on_file_changed(self, path):
+        if path == self.path:
+            self.schedule()
+
+    def on_directory_changed(self, directory):
+        """文件被创建或替换（删除后重新创建）时加入监视"""
+        if self.path and self.path not in self.watcher.files() and os.path.isfile(self.path):
+            self.watcher.addPath(self.path)
+            self.schedule()
+
+    def schedule(self):
+        """写入期间不断推迟，最后一次写入后再加载"""
+        self.debounce_timer.start()
+
+    def reload(self):
+        if self.path is None:
+            return
+        try:
+            write_time = os.stat(self.path).st_mtime
+        except OSError:
+            return  # 文件暂时不存在（正在替换），等待文件夹通知
+        self._generation += 1
+        self.thread_pool.start(_ReloadTask(self._generation, write_time, self.storage, self.preset_name,
+                                           self._signals))
+
+    def _on_loaded(self, generation, write_time, config, error):
+        """后台解析完成（在GUI线程中执行）"""
+        if generation != self._generation:
+            return  # 期间又有新的写入或换了预设
+        if config is None:
+            self.failure_count += 1
+            print(f"热加载预设 {self.preset_name} 失败，保留当前配置: {error}")
+            self.reload_failed.emit(error)
+            return
+        self.reload_count += 1
+        self._write_time = write_time
+        self.reloaded.emit(config)
+
+    # ---- 延迟统计 ----
+
+    def applied(self, overlay=None):
+        """控制器应用了重新加载的配置，overlay 有 frame_painted 信号时记录画出新画面的延迟"""
+        if self._write_time is None:
+            return
+        self.apply_latency_ms = round((time.time() - self._write_time) * 1000, 1)
+        print(f"热加载预设 {self.preset_name}: 文件写入到应用 {self.apply_latency_ms} ms")
+        source = getattr(overlay, "frame_painted", None)
+        if source is not None and self._frame_source is None:
+            self._frame_source = source
+            source.connect(self._on_frame_painted)
+
+    def _on_frame_painted(self):
+        self._frame_source.disconnect(self._on_frame_painted)
+        self._frame_source = None
+        self.frame_latency_ms = round((time.time() - self._write_time) * 1000, 1)
+
+    def stats(self):
+        return {
+            "watching": self.path,
+            "reloads": self.reload_count,
+            "failures": self.failure_count,
+            "apply_latency_ms": self.apply_latency_ms,
+            "frame_latency_ms": self.frame_latency_ms,
+        }
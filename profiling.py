@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+可选的性能分析钩子
+
+绘制和界面处理函数用 @hook 装饰。没有启用分析时 hook 在导入阶段直接返回原函数，
+运行时没有任何额外开销；启用后只在这些函数执行期间采集数据。
+
+启用方式（需要在导入覆盖层和配置界面模块之前）：
+    环境变量 CROSSHAIR_PROFILE=cprofile 或 sample
+    或者启动参数 python crosshair_pyside6.py --profile sample
+
+    cprofile    使用 cProfile，输出 .prof 文件，可以用 pstats 或 snakeviz 查看
+    sample      后台线程定时采样调用栈，输出 speedscope 格式的 .speedscope.json
+
+输出文件写到 CROSSHAIR_PROFILE_DIR（默认为临时文件夹下的 crosshair-profiles），
+每隔一段时间和程序退出时各写一个文件，只保留最近的若干个。
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import cProfile
+import tempfile
+import threading
+import functools
+from abc import ABC, abstractmethod
+
+
+PROFILE_ENV = "CROSSHAIR_PROFILE"
+PROFILE_DIR_ENV = "CROSSHAIR_PROFILE_DIR"
+MODES = ("cprofile", "sample")
+
+# 每隔多少秒写一个文件，以及最多保留的文件数
+DEFAULT_FLUSH_INTERVAL = 60.0
+DEFAULT_KEEP_FILES = 10
+
+# 采样间隔（秒）
+DEFAULT_SAMPLE_INTERVAL = 0.001
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+_collector = None
+
+
+def default_profile_dir():
+    """默认的输出文件夹"""
+    return os.environ.get(PROFILE_DIR_ENV) or os.path.join(tempfile.gettempdir(), "crosshair-profiles")
+
+
+class RotatingFiles:
+    """按时间命名输出文件，只保留最近的 keep 个"""
+
+    def __init__(self, directory, suffix, keep=DEFAULT_KEEP_FILES):
+        self.directory = directory
+        self.suffix = suffix
+        self.keep = keep
+        self.count = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def next_path(self):
+        """下一个输出文件的路径，同时删除多余的旧文件"""
+        self.count += 1
+        name = f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self.count:04d}{self.suffix}"
+        self.prune(self.keep - 1)
+        return os.path.join(self.directory, name)
+
+    def files(self):
+        """已有的输出文件，从旧到新"""
+        names = [n for n in os.listdir(self.directory) if n.startswith("profile-") and n.endswith(self.suffix)]
+        paths = [os.path.join(self.directory, n) for n in names]
+        return sorted(paths, key=os.path.getmtime)
+
+    def prune(self, keep):
+        files = self.files()
+        for path in files[:max(0, len(files) - keep)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class _Collector(ABC):
+    """采集器基类：记录钩子函数的嵌套深度，定时写出文件"""
+
+    suffix = ""
+
+    def __init__(self, directory, flush_interval, keep):
+        self.files = RotatingFiles(directory, self.suffix, keep)
+        self.flush_interval = flush_interval
+        self.depth = 0
+        self.calls = 0
+        self.last_flush = time.monotonic()
+
+    def enter(self):
+        if self.depth == 0:
+            self.start()
+        self.depth += 1
+        self.calls += 1
+
+    def exit(self):
+        self.depth -= 1
+        if self.depth == 0:
+            self.stop()
+            if time.monotonic() - self.last_flush >= self.flush_interval:
+                self.flush()
+
+    def flush(self):
+        """写出已采集的数据，返回文件路径（没有数据时返回 None）"""
+        self.last_flush = time.monotonic()
+        if not self.calls:
+            return None
+        path = self.files.next_path()
+        self.dump(path)
+        self.calls = 0
+        return path
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    @abstractmethod
+    def dump(self, path):
+        """把已采集的数据写到 path"""
+
+    def close(self):
+        self.flush()
+
+
+class CProfileCollector(_Collector):
+    """只在钩子函数执行期间开启 cProfile"""
+
+    suffix = ".prof"
+
+    def __init__(self, directory, flush_interval=DEFAULT_FLUSH_INTERVAL, keep=DEFAULT_KEEP_FILES):
+        super().__init__(directory, flush_interval, keep)
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+
+    def dump(self, path):
+        self.profiler.dump_stats(path)
+        self.profiler = cProfile.Profile()
+
+
+class SamplingCollector(_Collector):
+    """后台线程定时采样主线程的调用栈（只在钩子函数执行期间）"""
+
+    suffix = ".speedscope.json"
+
+    def __init__(self, directory, flush_interval=DEFAULT_FLUSH_INTERVAL, keep=DEFAULT_KEEP_FILES,
+                 interval=DEFAULT_SAMPLE_INTERVAL):
+        super().__init__(directory, flush_interval, keep)
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.samples = {}  # 调用栈 -> 采样次数
+        self.lock = threading.Lock()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="crosshair-sampler", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while self.running:
+            time.sleep(self.interval)
+            if self.depth <= 0:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                stack.reverse()
+                key = tuple(stack)
+                with self.lock:
+                    self.samples[key] = self.samples.get(key, 0) + 1
+
+    def dump(self, path):
+        with self.lock:
+            samples, self.samples = self.samples, {}
+        frames = []
+        frame_index = {}
+        stacks = []
+        weights = []
+        unit = self.interval * 1000
+        for stack, count in samples.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indices.append(frame_index[frame])
+            stacks.append(indices)
+            weights.append(count * unit)
+
+        data = {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": os.path.basename(path),
+            "exporter": "crosshair profiling",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": "main thread",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": stacks,
+                "weights": weights,
+            }],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def close(self):
+        self.running = False
+        self.thread.join(1)
+        super().close()
+
+
+def enable(mode, directory=None, **options):
+    """启用性能分析，必须在导入带钩子的模块之前调用"""
+    global _collector
+    if _collector is not None:
+        return _collector
+    if mode not in MODES:
+        raise ValueError(f"unknown profile mode: {mode}")
+    directory = directory or default_profile_dir()
+    collector_class = CProfileCollector if mode == "cprofile" else SamplingCollector
+    _collector = collector_class(directory, **options)
+    atexit.register(_collector.close)
+    return _collector
+
+
+def enable_from_environment():
+    """根据环境变量启用性能分析"""
+    mode = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if mode:
+        return enable(mode)
+    return None
+
+
+def active_collector():
+    """当前的采集器（未启用时为 None）"""
+    return _collector
+
+
+def hook(func):
+    """装饰需要分析的函数；未启用分析时原样返回"""
+    collector = _collector
+    if collector is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        collector.enter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            collector.exit()
+    return wrapper
+
+
+enable_from_environment()
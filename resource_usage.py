@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+当前进程的资源占用：CPU 时间、常驻内存、唤醒次数和句柄数
+
+不依赖 Qt，基准测试和性能自检共用。拿不到的指标返回 None。
+"""
+
+import os
+import sys
+import time
+
+
+def cpu_seconds():
+    """进程所有线程累计的 CPU 时间（秒）"""
+    return time.process_time()
+
+
+def _windows_rss_bytes():
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.WorkingSetSize
+
+
+def rss_mb():
+    """当前的常驻内存（MB）；只能拿到峰值的平台上返回峰值"""
+    if sys.platform == "win32":
+        try:
+            size = _windows_rss_bytes()
+        except (OSError, AttributeError):
+            size = None
+        return None if size is None else size / (1024 * 1024)
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+    except ImportError:
+        return None
+
+
+def handle_count():
+    """打开的句柄数（Windows 内核句柄 + GDI/USER 对象，其它平台为文件描述符）"""
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+            kernel32 = ctypes.windll.kernel32
+            process = kernel32.GetCurrentProcess()
+            count = wintypes.DWORD()
+            if not kernel32.GetProcessHandleCount(process, ctypes.byref(count)):
+                return None
+            user32 = ctypes.windll.user32
+            # GR_GDIOBJECTS = 0, GR_USEROBJECTS = 1
+            return count.value + user32.GetGuiResources(process, 0) + user32.GetGuiResources(process, 1)
+        except (OSError, AttributeError):
+            return None
+    for directory in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(directory))
+        except OSError:
+            pass
+    return None
+
+
+def context_switches():
+    """累计的上下文切换次数（主动 + 被动），用作唤醒次数的近似值"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_nvcsw + usage.ru_nivcsw
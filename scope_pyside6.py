@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+准星放大镜
+
+每帧只截取准星周围一小块正方形区域（边长为显示大小除以放大倍数），用缓存的
+QTransform 按最近邻缩放到一张复用的 QImage 中，再在准星旁边的固定区域绘制。
+截取的像素和上一帧相同时不缩放也不重绘。
+
+截取由覆盖层的帧时钟驱动，放大镜关闭时覆盖层不创建 MagnifierScope，没有任何
+额外开销。每帧的截取、缩放耗时、CPU 时间和从截取到绘制完成的延迟都有统计。
+"""
+
+import math
+import time
+
+from PySide6.QtCore import Qt, QPointF, QRect
+from PySide6.QtGui import QColor, QImage, QPainter, QPen, QTransform
+
+
+# 默认参数：放大倍数、显示区域边长（逻辑像素）、显示区域中心相对准星的偏移、帧率
+DEFAULT_ZOOM = 3
+DEFAULT_SIZE = 160
+DEFAULT_OFFSET = {"x": 0, "y": -160}
+DEFAULT_FPS = 60
+
+
+def scope_params(config, dpr=1.0):
+    """配置中的放大镜参数 (放大倍数, 显示边长, (偏移 x, 偏移 y), 设备像素比)"""
+    offset = config.get("scope_offset") or DEFAULT_OFFSET
+    return (max(1, int(config.get("scope_zoom", DEFAULT_ZOOM))), int(config.get("scope_size", DEFAULT_SIZE)),
+            (int(offset["x"]), int(offset["y"])), dpr)
+
+
+class MagnifierScope:
+    """放大镜的截取、缩放和绘制"""
+
+    def __init__(self, zoom=DEFAULT_ZOOM, size=DEFAULT_SIZE, offset=(0, -160), dpr=1.0):
+        self.zoom = zoom
+        self.size = size
+        self.offset = offset
+        self.dpr = dpr
+        self.params = (zoom, size, offset, dpr)
+
+        # 截取区域的边长（逻辑像素），显示区域按物理像素绘制
+        self.source_side = max(1, int(math.ceil(self.size / self.zoom)))
+        side = max(1, int(round(self.size * dpr)))
+        self.image = QImage(side, side, QImage.Format_RGB32)
+        self.image.fill(Qt.black)
+        self.image.setDevicePixelRatio(dpr)
+        self._transform = None
+        self._transform_size = None
+        self._last_source = None
+        self._captured_at = None
+
+        self.stats_data = {
+            "frames": 0, "unchanged": 0,
+            "capture_ms": 0.0, "scale_ms": 0.0, "cpu_ms": 0.0,
+            "max_capture_ms": 0.0, "last_latency_ms": 0.0, "max_latency_ms": 0.0, "painted": 0,
+        }
+
+    def rect(self, center):
+        """显示区域（逻辑坐标），多留 1 像素给边框"""
+        x = center[0] + self.offset[0] - self.size // 2
+        y = center[1] + self.offset[1] - self.size // 2
+        return QRect(x - 1, y - 1, self.size + 2, self.size + 2)
+
+    def _transform_for(self, source):
+        """截取图像缩放到显示图像的变换，截取尺寸不变时复用"""
+        size = (source.width(), source.height())
+        if size != self._transform_size:
+            self._transform = QTransform.fromScale(self.image.width() / size[0], self.image.height() / size[1])
+            self._transform_size = size
+        return self._transform
+
+    def capture(self, screen, center):
+        """截取准星周围的区域并缩放，画面有变化时返回 True"""
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        half = self.source_side // 2
+        source = screen.grabWindow(0, center[0] - half, center[1] - half,
+                                   self.source_side, self.source_side).toImage()
+        captured = time.perf_counter()
+        stats = self.stats_data
+        if source.isNull():
+            return False
+        data = bytes(source.constBits())
+        if data == self._last_source:
+            stats["unchanged"] += 1
+            stats["cpu_ms"] += (time.thread_time() - cpu_start) * 1000
+            return False
+        self._last_source = data
+
+        # 不开启平滑缩放，按最近邻放大
+        painter = QPainter(self.image)
+        painter.setTransform(self._transform_for(source))
+        painter.drawImage(0, 0, source)
+        painter.end()
+
+        end = time.perf_counter()
+        stats["frames"] += 1
+        stats["capture_ms"] += (captured - start) * 1000
+        stats["scale_ms"] += (end - captured) * 1000
+        stats["cpu_ms"] += (time.thread_time() - cpu_start) * 1000
+        stats["max_capture_ms"] = max(stats["max_capture_ms"], (end - start) * 1000)
+        self._captured_at = start
+        return True
+
+    def draw(self, painter, center):
+        """在显示区域绘制放大后的画面和边框"""
+        rect = self.rect(center)
+        painter.drawImage(QPointF(rect.x() + 1, rect.y() + 1), self.image)
+        painter.setPen(QPen(QColor(255, 255, 255, 160), 1))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRect(rect.adjusted(0, 0, -1, -1))
+
+        if self._captured_at is not None:
+            latency = (time.perf_counter() - self._captured_at) * 1000
+            stats = self.stats_data
+            stats["painted"] += 1
+            stats["last_latency_ms"] = latency
+            stats["max_latency_ms"] = max(stats["max_latency_ms"], latency)
+            self._captured_at = None
+
+    def stats(self):
+        """每帧的平均耗时和延迟（毫秒）"""
+        stats = self.stats_data
+        frames = stats["frames"]
+        ticks = frames + stats["unchanged"]
+        return {
+            "enabled": True,
+            "zoom": self.zoom,
+            "size": self.size,
+            "frames": frames,
+            "unchanged": stats["unchanged"],
+            "capture_ms": round(stats["capture_ms"] / frames, 3) if frames else None,
+            "scale_ms": round(stats["scale_ms"] / frames, 3) if frames else None,
+            "cpu_ms_per_tick": round(stats["cpu_ms"] / ticks, 3) if ticks else None,
+            "max_capture_ms": round(stats["max_capture_ms"], 3),
+            "last_latency_ms": round(stats["last_latency_ms"], 3),
+            "max_latency_ms": round(stats["max_latency_ms"], 3),
+        }
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+动画准星的预渲染帧图集
+
+动画准星的所有帧只在后台线程中绘制一次，横向拼接成一张 QImage 条带，
+播放时每帧只需要从条带中拷贝对应的矩形区域，不再重复执行矢量绘制。
+静态准星也预渲染为只有一帧的图集。
+
+图集按物理像素绘制，缓存键包含设备像素比（DPR），同一个准星在 100% 和
+200% 缩放的屏幕上各有一份图集，绘制时不会被缩放而变模糊。
+
+AtlasManager 可以带一个磁盘缓存（见 sprite_cache_pyside6），内存中没有的图集
+先从磁盘映射，构建好的图集在后台线程中写入磁盘，GUI 线程只做磁盘映射。
+"""
+
+import math
+from collections import OrderedDict
+from PySide6.QtCore import Qt, QObject, QPointF, QRect, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QImage, QPainter
+
+from crosshair_renderer_pyside6 import config_hash, crosshair_extent, render_sprite
+from preset_schema import ANIMATIONS  # 支持的动画类型
+
+# 默认动画参数
+DEFAULT_FRAME_COUNT = 24
+DEFAULT_PERIOD_MS = 1000
+DEFAULT_MEMORY_MB = 8
+
+# 所有图集缓存的总内存上限
+CACHE_MEMORY_BYTES = 32 * 1024 * 1024
+
+
+def is_animated(config):
+    """判断配置是否为动画准星"""
+    return config.get("animation", "none") in ANIMATIONS[1:]
+
+
+def frame_transform(animation, phase):
+    """计算某一帧的 (缩放, 旋转角度, 透明度系数)，phase 取值 [0, 1)"""
+    wave = math.sin(2 * math.pi * phase)
+    if animation == "pulse":
+        return 1.0 + 0.25 * wave, 0.0, 1.0
+    if animation == "rotate":
+        return 1.0, 360.0 * phase, 1.0
+    if animation == "breathe":
+        return 1.0, 0.0, 0.65 + 0.35 * wave
+    return 1.0, 0.0, 1.0
+
+
+def atlas_extent(config):
+    """计算动画帧所需的半径，保证缩放和旋转后不会被裁剪"""
+    extent = crosshair_extent(config)
+    animation = config.get("animation", "none")
+    if animation == "pulse":
+        extent = int(math.ceil(extent * 1.25))
+    elif animation == "rotate":
+        extent = int(math.ceil(extent * math.sqrt(2)))
+    return extent
+
+
+def sprite_key(config, dpr=1.0):
+    """图集的缓存键：外观哈希和设备像素比"""
+    return f"{config_hash(config)}@{dpr:g}"
+
+
+def plan_frame_count(config, extent):
+    """根据配置的帧数和内存上限计算实际帧数"""
+    requested = max(1, int(config.get("animation_frames", DEFAULT_FRAME_COUNT)))
+    memory_cap = float(config.get("animation_memory_mb", DEFAULT_MEMORY_MB)) * 1024 * 1024
+    side = extent * 2 + 1
+    frame_bytes = side * side * 4
+    return max(1, min(requested, int(memory_cap // frame_bytes)))
+
+
+class SpriteAtlas:
+    """一组横向排列在同一张 QImage 中的动画帧（extent 和 side 为物理像素）"""
+
+    def __init__(self, key, image, extent, frame_count, period_ms, dpr=1.0):
+        self.key = key
+        self.image = image
+        self.extent = extent
+        self.frame_count = frame_count
+        self.period_ms = period_ms
+        self.dpr = dpr
+        self.side = extent * 2 + 1
+        image.setDevicePixelRatio(dpr)
+
+    @property
+    def logical_extent(self):
+        """逻辑像素中的半径（向上取整）"""
+        return int(math.ceil(self.extent / self.dpr))
+
+    @property
+    def nbytes(self):
+        """图集占用的字节数"""
+        return self.image.sizeInBytes()
+
+    def frame_index(self, elapsed_ms):
+        """根据帧时钟计算当前帧序号"""
+        return int((elapsed_ms % self.period_ms) * self.frame_count // self.period_ms)
+
+    def draw_frame(self, painter, center, index):
+        """将指定帧拷贝到 painter 上，中心对齐到 center（逻辑坐标）
+
+        左上角对齐到物理像素，拷贝时不做缩放。
+        """
+        dpr = self.dpr
+        target = QPointF((round(center[0] * dpr) - self.extent) / dpr,
+                         (round(center[1] * dpr) - self.extent) / dpr)
+        painter.drawImage(target, self.image, QRect(index * self.side, 0, self.side, self.side))
+
+
+def build_atlas(config, dpr=1.0):
+    """绘制所有帧并拼接成图集（可在后台线程中调用）
+
+    config 中的长度应当已经换算为物理像素（见 device_config）。
+    """
+    animation = config.get("animation", "none")
+    extent = atlas_extent(config)
+    frame_count = plan_frame_count(config, extent) if is_animated(config) else 1
+    period_ms = max(1, int(config.get("animation_period", DEFAULT_PERIOD_MS)))
+    side = extent * 2 + 1
+
+    image = QImage(side * frame_count, side, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    painter = QPainter(image)
+    for index in range(frame_count):
+        scale, angle, opacity_factor = frame_transform(animation, index / frame_count)
+        frame, _ = render_sprite(config, extent, scale, angle, opacity_factor)
+        painter.drawImage(index * side, 0, frame)
+    painter.end()
+
+    return SpriteAtlas(sprite_key(config, dpr), image, extent, frame_count, period_ms, dpr)
+
+
+class AtlasCache:
+    """按配置哈希缓存图集，超出内存上限时淘汰最久未使用的图集"""
+
+    def __init__(self, max_bytes=CACHE_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._atlases = OrderedDict()
+
+    def get(self, key):
+        """获取图集，不存在时返回 None"""
+        atlas = self._atlases.get(key)
+        if atlas is not None:
+            self._atlases.move_to_end(key)
+        return atlas
+
+    def put(self, atlas):
+        """加入图集并按内存上限淘汰旧图集"""
+        old = self._atlases.pop(atlas.key, None)
+        if old is not None:
+            self.total_bytes -= old.nbytes
+        self._atlases[atlas.key] = atlas
+        self.total_bytes += atlas.nbytes
+        while self.total_bytes > self.max_bytes and len(self._atlases) > 1:
+            _, evicted = self._atlases.popitem(last=False)
+            self.total_bytes -= evicted.nbytes
+
+    def __len__(self):
+        return len(self._atlases)
+
+
+class _AtlasBuildSignals(QObject):
+    """后台构建任务的信号（QRunnable 本身不能发射信号）"""
+    finished = Signal(str, object)
+
+
+class _AtlasBuildTask(QRunnable):
+    """在线程池中构建图集的任务"""
+
+    def __init__(self, key, config, dpr, signals, disk_cache=None):
+        super().__init__()
+        self.key = key
+        self.config = config
+        self.dpr = dpr
+        self.signals = signals
+        self.disk_cache = disk_cache
+
+    def run(self):
+        try:
+            atlas = build_atlas(self.config, self.dpr)
+            if self.disk_cache is not None:
+                self.disk_cache.store(atlas)
+        except Exception as e:
+            print(f"构建动画图集失败: {e}")
+            atlas = None
+        self.signals.finished.emit(self.key, atlas)
+
+
+class _AtlasStoreTask(QRunnable):
+    """在线程池中把图集写入磁盘缓存的任务"""
+
+    def __init__(self, disk_cache, atlas):
+        super().__init__()
+        self.disk_cache = disk_cache
+        self.atlas = atlas
+
+    def run(self):
+        self.disk_cache.store(self.atlas)
+
+
+class AtlasManager(QObject):
+    """管理图集缓存和后台构建，构建完成后发射 atlas_ready 信号"""
+
+    atlas_ready = Signal(str)
+
+    def __init__(self, parent=None, thread_pool=None, disk_cache=None):
+        super().__init__(parent)
+        self.cache = AtlasCache()
+        self.disk_cache = disk_cache
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self._pending = set()
+        self._signals = _AtlasBuildSignals()
+        self._signals.finished.connect(self._on_built)
+
+    def request(self, config, dpr=1.0):
+        """返回已缓存的图集；未缓存时在后台开始构建并返回 None"""
+        key = sprite_key(config, dpr)
+        atlas = self.cache.get(key) or self._load_from_disk(key)
+        if atlas is None and key not in self._pending:
+            self._pending.add(key)
+            self.thread_pool.start(_AtlasBuildTask(key, dict(config), dpr, self._signals, self.disk_cache))
+        return atlas
+
+    def sprite(self, config, dpr=1.0):
+        """返回静态准星的单帧图集，未缓存时立即构建（写入磁盘在后台线程中进行）"""
+        key = sprite_key(config, dpr)
+        atlas = self.cache.get(key) or self._load_from_disk(key)
+        if atlas is None:
+            atlas = build_atlas(config, dpr)
+            self.cache.put(atlas)
+            if self.disk_cache is not None:
+                self.thread_pool.start(_AtlasStoreTask(self.disk_cache, atlas))
+        return atlas
+
+    def _load_from_disk(self, key):
+        """从磁盘缓存映射图集并放入内存缓存"""
+        if self.disk_cache is None:
+            return None
+        atlas = self.disk_cache.load(key)
+        if atlas is not None:
+            self.cache.put(atlas)
+        return atlas
+
+    def is_pending(self):
+        """是否有正在构建的图集"""
+        return bool(self._pending)
+
+    def _on_built(self, key, atlas):
+        """后台构建完成（在GUI线程中执行）"""
+        self._pending.discard(key)
+        if atlas is not None:
+            self.cache.put(atlas)
+            self.atlas_ready.emit(key)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+预渲染准星的磁盘缓存
+
+图集（见 sprite_atlas_pyside6）以原始的预乘 ARGB32 像素保存在预设文件夹的
+sprites 子文件夹中，文件名就是缓存键（外观哈希和设备像素比）：
+
+    sprites/<config_hash>@<dpr>.argb
+
+加载时用 mmap 只读映射文件，QImage 直接引用映射的内存，不拷贝也不重新绘制，
+冷启动和第一次切换到某个预设只需要一次映射和一次拷贝到屏幕。
+
+预设 JSON 修改后外观哈希随之改变，旧文件不会再被读取；文件数超过上限时
+删除最久没有使用的文件。
+"""
+
+import os
+import mmap
+import struct
+import tempfile
+
+from PySide6.QtGui import QImage
+
+from sprite_atlas_pyside6 import SpriteAtlas
+
+
+# 文件头：标识、版本、宽、高、每行字节数、半径、帧数、周期（毫秒）、DPR，补齐到 64 字节
+MAGIC = b"CHSP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIIIIIIId")
+HEADER_SIZE = 64
+
+SUFFIX = ".argb"
+
+# 保留的文件数上限
+DEFAULT_MAX_FILES = 64
+
+
+def sprite_cache_dir(storage):
+    """预设存储对应的缓存文件夹，不在磁盘上的存储返回 None"""
+    directory = getattr(storage, "directory", None)
+    return os.path.join(directory, "sprites") if directory else None
+
+
+class SpriteDiskCache:
+    """把图集保存为可以直接映射的像素文件"""
+
+    def __init__(self, directory, max_files=DEFAULT_MAX_FILES):
+        self.directory = directory
+        self.max_files = max_files
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def load(self, key):
+        """映射缓存文件并返回图集，没有缓存或文件无效时返回 None"""
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        header = HEADER.unpack_from(mapped) if len(mapped) >= HEADER_SIZE else None
+        if header is None or header[0] != MAGIC or header[1] != FORMAT_VERSION:
+            mapped.close()
+            self.discard(path)
+            self.misses += 1
+            return None
+        _, _, width, height, bytes_per_line, extent, frame_count, period_ms, dpr = header
+        if len(mapped) != HEADER_SIZE + bytes_per_line * height:
+            mapped.close()
+            self.discard(path)
+            self.misses += 1
+            return None
+
+        image = QImage(memoryview(mapped)[HEADER_SIZE:], width, height, bytes_per_line,
+                       QImage.Format_ARGB32_Premultiplied)
+        atlas = SpriteAtlas(key, image, extent, frame_count, period_ms, dpr)
+        atlas.mapping = mapped  # 图像引用映射的内存，二者一起释放
+        self.hits += 1
+        try:
+            os.utime(path)  # 记录最近使用时间，用于淘汰
+        except OSError:
+            pass
+        return atlas
+
+    def store(self, atlas):
+        """保存图集（可在后台线程中调用），失败时只打印提示"""
+        image = atlas.image
+        if image.format() != QImage.Format_ARGB32_Premultiplied:
+            image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, image.width(), image.height(), image.bytesPerLine(),
+                             atlas.extent, atlas.frame_count, atlas.period_ms, atlas.dpr)
+        temp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # 先写临时文件再改名，其它进程不会读到写了一半的文件
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+            with os.fdopen(fd, "wb") as f:
+                f.write(header.ljust(HEADER_SIZE, b"\0"))
+                f.write(image.constBits())
+            os.replace(temp_path, self.path(atlas.key))
+        except OSError as e:
+            print(f"保存准星缓存失败: {e}")
+            if temp_path is not None:
+                self.discard(temp_path)  # 不留下写了一半的临时文件
+            return False
+        self.prune()
+        return True
+
+    def prune(self):
+        """删除超出数量上限的最久未使用的文件"""
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(SUFFIX)]
+        except OSError:
+            return
+        if len(entries) <= self.max_files:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_files]:
+            self.discard(entry.path)
+
+    def discard(self, path):
+        """删除文件（Windows 下正在映射的文件无法删除，忽略）"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
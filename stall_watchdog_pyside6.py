@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+GUI 事件循环卡顿检测
+
+ConfigUI 和 OverlayWindow 共用同一个事件循环。GUI 线程上的粗粒度定时器定期
+记录心跳，后台看门狗线程发现心跳停止超过阈值时，通过 sys._current_frames 抓取
+GUI 线程的 Python 调用栈，连同时间一起记录到环形缓冲区中。
+
+没有卡顿时的开销只是每半个阈值一次的心跳（记录一个时间戳）和看门狗线程的
+一次比较。
+
+卡顿记录可以通过控制协议的 stalls 命令或配置界面的“导出卡顿记录”按钮导出。
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import traceback
+from collections import deque
+
+from PySide6.QtCore import Qt, QObject, QTimer
+
+
+# 默认阈值（毫秒）和保留的记录数
+DEFAULT_THRESHOLD_MS = 250
+DEFAULT_CAPACITY = 64
+
+_watchdog = None
+
+
+def format_stack(frame):
+    """把调用栈格式化为 "文件:行号 函数" 列表，最外层在前"""
+    return [f"{os.path.basename(entry.filename)}:{entry.lineno} {entry.name}"
+            for entry in traceback.extract_stack(frame)]
+
+
+class StallWatchdog(QObject):
+    """监视当前线程（GUI 线程）的事件循环"""
+
+    def __init__(self, threshold_ms=DEFAULT_THRESHOLD_MS, capacity=DEFAULT_CAPACITY, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.interval = self.threshold / 2
+        self.records = deque(maxlen=capacity)
+        self.stall_count = 0
+        self.thread_id = threading.get_ident()
+
+        self._last_beat = time.monotonic()
+        self._current = None  # 正在进行的卡顿记录
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.CoarseTimer)
+        self.timer.timeout.connect(self.on_beat)
+
+    def start(self):
+        """开始心跳并启动看门狗线程"""
+        self._last_beat = time.monotonic()
+        self.timer.start(max(1, int(self.interval * 1000)))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="crosshair-stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止看门狗线程"""
+        self.timer.stop()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1)
+            self._thread = None
+
+    # ---- GUI 线程 ----
+
+    def on_beat(self):
+        now = time.monotonic()
+        self._last_beat = now
+        if self._current is not None:
+            self.finish_record(now)
+
+    def finish_record(self, now):
+        """事件循环恢复，补上卡顿的总时长"""
+        with self._lock:
+            record, self._current = self._current, None
+            if record is not None:
+                record["duration_ms"] = round((now - record["_since"]) * 1000, 1)
+
+    # ---- 看门狗线程 ----
+
+    def _run(self):
+        captured_since = None
+        while not self._stop.wait(self.interval):
+            since = self._last_beat
+            busy = time.monotonic() - since
+            if busy >= self.threshold and since != captured_since:
+                captured_since = since
+                self.capture(since, busy)
+
+    def capture(self, since, busy):
+        """抓取 GUI 线程的调用栈并记录"""
+        frame = sys._current_frames().get(self.thread_id)
+        stack = format_stack(frame) if frame is not None else []
+        record = {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - busy)),
+            "blocked_ms": round(busy * 1000, 1),
+            "duration_ms": None,
+            "stack": stack,
+            "_since": since,
+        }
+        with self._lock:
+            # 抓取期间事件循环可能已经恢复
+            if self._last_beat == since:
+                self._current = record
+            else:
+                record["duration_ms"] = record["blocked_ms"]
+            self.records.append(record)
+            self.stall_count += 1
+        where = stack[-1] if stack else "?"
+        print(f"事件循环卡顿 {record['blocked_ms']:.0f} ms: {where}")
+
+    # ---- 导出 ----
+
+    def dump(self):
+        """所有卡顿记录（从旧到新），可序列化为 JSON"""
+        with self._lock:
+            return [{key: value for key, value in record.items() if not key.startswith("_")}
+                    for record in self.records]
+
+    def report(self):
+        return {
+            "threshold_ms": round(self.threshold * 1000),
+            "stall_count": self.stall_count,
+            "records": self.dump(),
+        }
+
+    def write_report(self, directory=None):
+        """把卡顿记录写到 JSON 文件，返回文件路径"""
+        directory = directory or tempfile.gettempdir()
+        path = os.path.join(directory, f"crosshair-stalls-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+        return path
+
+
+def install(threshold_ms=DEFAULT_THRESHOLD_MS, capacity=DEFAULT_CAPACITY):
+    """在 GUI 线程中启动卡顿检测（需要已经创建 QApplication）"""
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = StallWatchdog(threshold_ms, capacity)
+        _watchdog.start()
+    return _watchdog
+
+
+def active_watchdog():
+    """当前的看门狗（未启动时为 None）"""
+    return _watchdog
+
+
+def uninstall():
+    """停止卡顿检测"""
+    global _watchdog
+    if _watchdog is not None:
+        _watchdog.stop()
+        _watchdog.deleteLater()
+        _watchdog = None
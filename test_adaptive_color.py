@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试自适应对比色
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication, QWidget
+
+
+CONFIG = {
+    "size": 20,
+    "color": "#FF0000",
+    "shape": "cross",
+    "thickness": 2,
+    "opacity": 1.0,
+    "position": {"x": "center", "y": "center"},
+    "adaptive_color": "contrast",
+    "adaptive_interval": 5000,
+}
+
+
+def bgra(rgb):
+    return bytes([rgb[2], rgb[1], rgb[0], 255])
+
+
+def test_band_mean():
+    """测试只统计准星范围之外的像素，以及抽样的开销上限"""
+    from adaptive_color import band_mean
+
+    all_correct = True
+    width = height = 21
+    rows = []
+    for y in range(height):
+        for x in range(width):
+            rows.append(bgra((255, 0, 0) if abs(x - 10) <= 4 and abs(y - 10) <= 4 else (20, 40, 60)))
+    data = b"".join(rows)
+    if band_mean(data, width, height, width * 4, 4) == (20, 40, 60):
+        print("[OK] 中心方块中的像素不计入平均颜色")
+    else:
+        print(f"[ERROR] 平均颜色错误: {band_mean(data, width, height, width * 4, 4)}")
+        all_correct = False
+
+    side = 401
+    data = bgra((90, 60, 30)) * side * side
+    start = time.perf_counter()
+    for _ in range(20):
+        mean = band_mean(data, side, side, side * 4, 50)
+    elapsed = (time.perf_counter() - start) / 20 * 1000
+    if mean == (90, 60, 30) and elapsed < 5:
+        print(f"[OK] 大区域按间隔抽样，每次 {elapsed:.3f} ms")
+    else:
+        print(f"[ERROR] 大区域抽样错误: {mean}, {elapsed:.3f} ms")
+        all_correct = False
+    return all_correct
+
+
+def test_contrast_picker():
+    """测试按背景选择对比色和防闪烁"""
+    from adaptive_color import ContrastPicker
+
+    picker = ContrastPicker("#FF0000")
+    all_correct = True
+    if picker.update((20, 20, 20)) == "#FF0000":
+        print("[OK] 深色背景上保持配置的颜色")
+    else:
+        print(f"[ERROR] 深色背景上颜色被改变: {picker.color}")
+        all_correct = False
+
+    first = picker.update((150, 40, 20))
+    second = picker.update((150, 40, 20))
+    if first == "#FF0000" and second != "#FF0000" and picker.switches == 1:
+        print(f"[OK] 红色背景连续采样两次后切换到 {second}")
+    else:
+        print(f"[ERROR] 红色背景切换错误: {first}, {second}")
+        all_correct = False
+
+    picker.update((20, 20, 20))
+    picker.update((150, 40, 20))
+    picker.update((20, 20, 20))
+    if picker.color == second:
+        print("[OK] 背景来回变化时不闪烁")
+    else:
+        print(f"[ERROR] 背景来回变化时颜色改变: {picker.color}")
+        all_correct = False
+    return all_correct
+
+
+def test_overlay_sampling():
+    """测试覆盖层截取屏幕并切换准星颜色"""
+    from overlay_window_pyside6 import OverlayWindow
+
+    app = QApplication.instance()
+    overlay = OverlayWindow(dict(CONFIG))
+    overlay.showFullScreen()
+    # offscreen 平台把透明的覆盖层合成为黑色，背景窗口放在覆盖层上面代替游戏画面
+    background = QWidget()
+    background.setStyleSheet("background: #963214;")
+    background.setGeometry(QApplication.primaryScreen().geometry())
+    background.show()
+    app.processEvents()
+    all_correct = True
+
+    # 调色板中每种颜色的精灵图在后台预先绘制
+    deadline = time.monotonic() + 5
+    while overlay.atlas_manager.is_pending() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    cached = len(overlay.atlas_manager.cache)
+    if cached == len(overlay.adaptive_picker.colors):
+        print(f"[OK] 预先绘制了 {cached} 种颜色的精灵图")
+    else:
+        print(f"[ERROR] 预先绘制的精灵图数量错误: {cached}, {overlay.adaptive_picker.colors}")
+        all_correct = False
+
+    base_key = overlay.render_key
+    overlay.sample_background()
+    elapsed = overlay.sample_background()
+    stats = overlay.adaptive_color_stats()
+    if (stats["color"] != "#FF0000" and overlay.render_key != base_key and stats["samples"] == 2
+            and len(overlay.atlas_manager.cache) == cached):
+        print(f"[OK] 红褐色背景上切换到 {stats['color']}，采样耗时 {elapsed:.3f} ms")
+    else:
+        print(f"[ERROR] 红褐色背景上没有切换颜色: {stats}")
+        all_correct = False
+    if overlay.config["color"] == "#FF0000" and overlay.sprite.key == overlay.render_key + "@1":
+        print("[OK] 只改变绘制颜色，不修改配置")
+    else:
+        print(f"[ERROR] 配置被修改或精灵图不对: {overlay.config['color']}")
+        all_correct = False
+
+    background.setStyleSheet("background: #101010;")
+    app.processEvents()
+    overlay.sample_background()
+    overlay.sample_background()
+    if overlay.render_config["color"] == "#FF0000" and overlay.render_key == base_key:
+        print("[OK] 深色背景上恢复配置的颜色")
+    else:
+        print(f"[ERROR] 深色背景上没有恢复: {overlay.adaptive_color_stats()}")
+        all_correct = False
+
+    config = dict(CONFIG, adaptive_color="off")
+    overlay.updateConfig(config)
+    if not overlay.adaptive_timer.isActive() and overlay.sample_background() is None:
+        print("[OK] 关闭后停止采样")
+    else:
+        print("[ERROR] 关闭后仍在采样")
+        all_correct = False
+
+    overlay.close()
+    background.close()
+    return all_correct
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    success1 = test_band_mean()
+    success2 = test_contrast_picker()
+    success3 = test_overlay_sampling()
+
+    if success1 and success2 and success3:
+        print("\n[SUCCESS] 自适应颜色测试通过！")
+    else:
+        print("\n[FAILED] 自适应颜色测试失败！")
+
+    sys.exit(0 if (success1 and success2 and success3) else 1)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试动画准星的帧图集
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication
+
+
+def test_build_atlas():
+    """测试帧图集构建和内存上限"""
+    from sprite_atlas_pyside6 import build_atlas, atlas_extent
+
+    config = {
+        "size": 20,
+        "color": "#00FF00",
+        "shape": "cross",
+        "thickness": 2,
+        "opacity": 0.8,
+        "animation": "rotate",
+        "animation_frames": 12,
+        "animation_period": 600,
+    }
+    atlas = build_atlas(config)
+    if atlas.frame_count != 12:
+        print(f"[ERROR] 帧数错误: 期望 12, 实际 {atlas.frame_count}")
+        return False
+    if atlas.image.width() != atlas.side * 12 or atlas.image.height() != atlas.side:
+        print("[ERROR] 图集尺寸错误")
+        return False
+    print(f"[OK] 帧图集构建正确: {atlas.frame_count} 帧, {atlas.nbytes} 字节")
+
+    # 帧时钟映射到帧序号
+    if atlas.frame_index(0) != 0 or atlas.frame_index(599) != 11 or atlas.frame_index(600) != 0:
+        print("[ERROR] 帧序号计算错误")
+        return False
+    print("[OK] 帧序号计算正确")
+
+    # 内存上限限制帧数
+    side = atlas_extent(config) * 2 + 1
+    capped = dict(config, animation_frames=120, animation_memory_mb=side * side * 4 * 5 / (1024 * 1024))
+    capped_atlas = build_atlas(capped)
+    if capped_atlas.frame_count != 5:
+        print(f"[ERROR] 内存上限未生效: 实际 {capped_atlas.frame_count} 帧")
+        return False
+    print("[OK] 内存上限限制帧数正确")
+    return True
+
+
+def test_overlay_async_atlas():
+    """测试覆盖层在后台构建图集"""
+    from overlay_window_pyside6 import OverlayWindow
+
+    config = {
+        "size": 30,
+        "color": "#FF0000",
+        "shape": "hollow_cross",
+        "thickness": 2,
+        "opacity": 0.8,
+        "position": {"x": "center", "y": "center"},
+        "animation": "pulse",
+        "animation_frames": 16,
+    }
+    overlay = OverlayWindow(config)
+    overlay.showFullScreen()
+
+    # 图集在后台线程构建，等待其完成
+    deadline = time.time() + 5
+    while overlay.current_atlas is None and time.time() < deadline:
+        QApplication.processEvents()
+        time.sleep(0.01)
+
+    if overlay.current_atlas is None:
+        print("[ERROR] 图集未在后台构建完成")
+        return False
+    print("[OK] 图集已在后台构建完成")
+
+    if overlay.timer.interval() != 1000 // 16:
+        print(f"[ERROR] 帧时钟间隔错误: {overlay.timer.interval()}")
+        return False
+    print("[OK] 帧时钟间隔正确")
+
+    # 切换回静态准星后不再使用图集
+    config["animation"] = "none"
+    overlay.updateConfig(config)
+    if overlay.current_atlas is not None or overlay.timer.isActive():
+        print("[ERROR] 静态准星仍在使用图集")
+        return False
+    print("[OK] 静态准星恢复矢量绘制")
+
+    overlay.grab()
+    overlay.close()
+    return True
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    success1 = test_build_atlas()
+    success2 = test_overlay_async_atlas()
+
+    if success1 and success2:
+        print("\n[SUCCESS] 动画准星测试通过！")
+    else:
+        print("\n[FAILED] 动画准星测试失败！")
+
+    sys.exit(0 if (success1 and success2) else 1)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试本地控制服务
+"""
+
+import sys
+import os
+import time
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication
+
+
+def test_protocol():
+    """测试协议解析"""
+    from control_protocol import parse_command, parse_reply, format_reply
+
+    checks = [
+        ("ping", parse_command("ping\n"), ("ping", [])),
+        ("预设名带空格", parse_command("load_preset my preset"), ("load_preset", ["my preset"])),
+        ("数字字段", parse_command("set_field size 30"), ("set_field", ["size", 30])),
+        ("字符串字段", parse_command('set_field color "#00FF00"'), ("set_field", ["color", "#00FF00"])),
+        ("未加引号字符串", parse_command("set_field shape dot"), ("set_field", ["shape", "dot"])),
+        ("回复", parse_reply(format_reply(True, {"a": 1}).decode()), (True, '{"a":1}')),
+    ]
+    all_correct = True
+    for name, actual, expected in checks:
+        if actual == expected:
+            print(f"[OK] {name}: {actual}")
+        else:
+            print(f"[ERROR] {name}: 期望 {expected}, 实际 {actual}")
+            all_correct = False
+    return all_correct
+
+
+def run_client(address, results):
+    """在后台线程中执行客户端命令"""
+    from control_protocol import ControlClient
+
+    try:
+        with ControlClient(address) as client:
+            results["ping"] = client.ping()
+            results["show"] = client.show()
+            results["set_size"] = client.set_field("size", 42)
+            # 重复设置同一个值不会重绘，不应等到帧超时才回复
+            start = time.perf_counter()
+            results["set_same"] = client.set_field("size", 42)
+            results["set_same_ms"] = (time.perf_counter() - start) * 1000
+            results["bad_field"] = client.set_field("no_such_field", 1)
+            # 连续发送多条命令不等回复：等待下一帧的命令在前时，后面立即回复的命令也要排在它后面
+            client._send(b"set_field size 43\nping\nset_field size 43\n")
+            results["pipelined"] = [client._readline() for _ in range(3)]
+            results["load"] = client.load_preset("test ipc preset")
+            results["missing"] = client.load_preset("no_such_preset")
+            results["state"] = client.get_state()
+            results["hide"] = client.hide()
+    except Exception as e:
+        results["error"] = str(e)
+
+
+def test_control_server():
+    """测试控制服务的命令"""
+    from config_ui_pyside6 import ConfigUI
+    from control_server_pyside6 import ControlServer
+    from preset_storage import MemoryStorage
+
+    storage = MemoryStorage({"test ipc preset": {"size": 33, "shape": "dot", "color": "#00FF00"}})
+    main_window = ConfigUI(storage)
+
+    if sys.platform == "win32":
+        address = f"CrosshairTest-{os.getpid()}"
+    else:
+        address = os.path.join(tempfile.gettempdir(), f"crosshair-test-{os.getpid()}.sock")
+    server = ControlServer(main_window, address)
+    if not server.start():
+        print("[ERROR] 控制服务启动失败")
+        return False
+    print("[OK] 控制服务已启动")
+
+    results = {}
+    client_thread = threading.Thread(target=run_client, args=(address, results))
+    client_thread.start()
+    deadline = time.time() + 10
+    while client_thread.is_alive() and time.time() < deadline:
+        QApplication.processEvents()
+        time.sleep(0.001)
+    client_thread.join(1)
+    server.close()
+
+    if "error" in results:
+        print(f"[ERROR] 客户端出错: {results['error']}")
+        return False
+
+    checks = [
+        ("ping", results.get("ping") is True),
+        ("显示准星", results.get("show", (False,))[0] and main_window.overlay_window is not None),
+        ("修改字段", results.get("set_size", (False,))[0] and results["set_size"][1] is not None),
+        ("重复设置立即回复", results.get("set_same", (False,))[0] and results.get("set_same_ms", 1e9) < 100),
+        ("拒绝未知字段", results.get("bad_field", (True,))[0] is False),
+        ("连续命令按顺序回复", results.get("pipelined", [""])[0].startswith("OK ")
+         and results["pipelined"][1:] == ["OK pong", "OK"]),
+        ("加载预设", results.get("load", (False,))[0]),
+        ("预设不存在", results.get("missing", (True,))[0] is False),
+        ("状态", (results.get("state") or {}).get("config", {}).get("size") == 33),
+        ("预设已切换", main_window.shape_combo.currentText() == "dot"),
+        ("隐藏准星", results.get("hide", (False,))[0] and not main_window.is_shown),
+    ]
+    all_correct = True
+    for name, passed in checks:
+        if passed:
+            print(f"[OK] {name}")
+        else:
+            print(f"[ERROR] {name}: {results}")
+            all_correct = False
+    return all_correct
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    success1 = test_protocol()
+    success2 = test_control_server()
+
+    if success1 and success2:
+        print("\n[SUCCESS] 控制服务测试通过！")
+    else:
+        print("\n[FAILED] 控制服务测试失败！")
+
+    sys.exit(0 if (success1 and success2) else 1)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试多个准星图层
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication
+
+
+CONFIG = {
+    "size": 10,
+    "color": "#FF0000",
+    "shape": "cross",
+    "thickness": 2,
+    "opacity": 1.0,
+    "position": {"x": "center", "y": "center"},
+    "layers": [
+        {"shape": "square", "size": 6, "color": "#00FF00", "offset": {"x": 0, "y": 40}},
+        {"shape": "square", "size": 6, "color": "#0000FF", "offset": {"x": -30, "y": 0}},
+    ],
+}
+
+
+def test_layer_schema():
+    """测试图层的校验"""
+    from preset_schema import normalize_preset, MAX_LAYERS
+
+    all_correct = True
+    config, issues = normalize_preset({"layers": [
+        {"size": 300, "offset": {"x": "12", "y": 999}, "animation": "pulse"},
+        "dot",
+    ]})
+    layer = config["layers"][0] if config.get("layers") else None
+    if layer == {"size": 100, "offset": {"x": 12, "y": 400}} and len(config["layers"]) == 1 and len(issues) == 4:
+        print(f"[OK] 图层字段被转换和截断，无效的图层被丢弃: {issues}")
+    else:
+        print(f"[ERROR] 图层校验错误: {config}, {issues}")
+        all_correct = False
+
+    config, issues = normalize_preset({"layers": [{}] * (MAX_LAYERS + 3)})
+    if len(config["layers"]) == MAX_LAYERS and len(issues) == 1:
+        print(f"[OK] 最多保留 {MAX_LAYERS} 个图层")
+    else:
+        print(f"[ERROR] 图层数量限制错误: {len(config['layers'])}, {issues}")
+        all_correct = False
+
+    config, issues = normalize_preset({"layers": {"shape": "dot"}}, {"layers": []})
+    if config["layers"] == [] and issues:
+        print("[OK] layers 不是列表时使用默认值")
+    else:
+        print(f"[ERROR] layers 不是列表时处理错误: {config}")
+        all_correct = False
+    return all_correct
+
+
+def test_layer_render():
+    """测试所有图层合成到同一张精灵图中"""
+    from crosshair_renderer_pyside6 import config_hash, crosshair_extent, device_config
+    from sprite_atlas_pyside6 import build_atlas
+
+    all_correct = True
+    single = dict(CONFIG, layers=[])
+    if crosshair_extent(CONFIG) > max(crosshair_extent(single), 40) and config_hash(CONFIG) != config_hash(single):
+        print("[OK] 图层计入准星的范围和外观哈希")
+    else:
+        print("[ERROR] 图层没有计入范围或哈希")
+        all_correct = False
+
+    atlas = build_atlas(CONFIG)
+    image, extent = atlas.image, atlas.extent
+    green = image.pixelColor(extent, extent + 40)
+    blue = image.pixelColor(extent - 30, extent)
+    red = image.pixelColor(extent, extent)
+    if (atlas.frame_count == 1 and green.green() > 200 and green.red() < 50
+            and blue.blue() > 200 and red.red() > 200 and red.green() < 50):
+        print("[OK] 主准星和两个图层绘制在同一帧中")
+    else:
+        print(f"[ERROR] 图层绘制错误: red={red.name()}, green={green.name()}, blue={blue.name()}")
+        all_correct = False
+
+    scaled = device_config(CONFIG, 2.0)
+    layer = scaled["layers"][0]
+    if layer["offset"] == {"x": 0, "y": 80} and layer["size"] == 12 and CONFIG["layers"][0]["size"] == 6:
+        print("[OK] 图层的偏移和长度按设备像素比换算")
+    else:
+        print(f"[ERROR] 图层换算错误: {layer}")
+        all_correct = False
+    return all_correct
+
+
+def test_overlay_layers():
+    """测试覆盖层绘制图层，只修改图层时重建图集"""
+    from overlay_window_pyside6 import OverlayWindow
+
+    app = QApplication.instance()
+    config = {key: value for key, value in CONFIG.items()}
+    config["layers"] = [dict(layer) for layer in CONFIG["layers"]]
+    overlay = OverlayWindow(config)
+    overlay.showFullScreen()
+    app.processEvents()
+    all_correct = True
+
+    x, y = overlay.crosshair_center()
+    image = overlay.grab().toImage()
+    green = image.pixelColor(x, y + 40)
+    if green.green() > 200 and green.red() < 50:
+        print("[OK] 覆盖层绘制了偏移的图层")
+    else:
+        print(f"[ERROR] 覆盖层没有绘制图层: {green.name()}")
+        all_correct = False
+
+    rebuilds = overlay.update_stats["rebuild"]
+    config["layers"][0]["offset"] = {"x": 0, "y": -40}
+    overlay.updateConfig(config)
+    image = overlay.grab().toImage()
+    moved = image.pixelColor(x, y - 40)
+    if overlay.update_stats["rebuild"] == rebuilds + 1 and moved.green() > 200:
+        print("[OK] 原地修改图层偏移后重建图集")
+    else:
+        print(f"[ERROR] 修改图层后没有重建: {overlay.update_stats}, {moved.name()}")
+        all_correct = False
+
+    overlay.close()
+    return all_correct
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    success1 = test_layer_schema()
+    success2 = test_layer_render()
+    success3 = test_overlay_layers()
+
+    if success1 and success2 and success3:
+        print("\n[SUCCESS] 准星图层测试通过！")
+    else:
+        print("\n[FAILED] 准星图层测试失败！")
+
+    sys.exit(0 if (success1 and success2 and success3) else 1)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试无界面守护模式
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication
+
+
+def test_daemon_mode():
+    """测试守护模式只创建覆盖层，并能按需打开配置界面"""
+    from overlay_daemon_pyside6 import OverlayDaemon
+    from preset_storage import MemoryStorage
+
+    storage = MemoryStorage({"lan": {"size": 33, "color": "#00FF00", "shape": "dot"}})
+
+    all_correct = True
+    daemon = OverlayDaemon("lan", storage)
+    daemon.show_crosshair()
+
+    if "config_ui_pyside6" in sys.modules:
+        print("[ERROR] 守护模式不应导入配置界面模块")
+        all_correct = False
+    else:
+        print("[OK] 守护模式未导入配置界面模块")
+
+    overlay = daemon.overlay_window
+    if overlay is not None and overlay.config["size"] == 33 and overlay.config["shape"] == "dot":
+        print("[OK] 守护模式加载了预设")
+    else:
+        print("[ERROR] 守护模式加载预设失败")
+        all_correct = False
+
+    if daemon.apply_preset("no_such_preset"):
+        print("[ERROR] 加载不存在的预设应返回 False")
+        all_correct = False
+
+    daemon.set_config_field("thickness", 5)
+    state = daemon.get_state()
+    if state["shown"] and state["preset"] == "lan" and state["config"]["thickness"] == 5:
+        print(f"[OK] 守护模式状态正确: {state['preset']}")
+    else:
+        print(f"[ERROR] 守护模式状态错误: {state}")
+        all_correct = False
+
+    # 按需打开配置界面，界面接管同一个覆盖层
+    daemon.open_ui()
+    ui = daemon.ui
+    if ui is not None and ui.overlay_window is overlay and ui.is_shown:
+        print("[OK] 配置界面接管了现有覆盖层")
+    else:
+        print("[ERROR] 配置界面没有接管现有覆盖层")
+        all_correct = False
+
+    if ui.config["size"] == 33 and ui.config["thickness"] == 5 and ui.size_slider.value() == 33:
+        print("[OK] 配置界面显示当前配置")
+    else:
+        print(f"[ERROR] 配置界面配置错误: {ui.config}")
+        all_correct = False
+
+    # 关闭界面后准星继续显示
+    ui.close()
+    if overlay.isVisible() and daemon.get_state()["shown"]:
+        print("[OK] 关闭配置界面后准星继续显示")
+    else:
+        print("[ERROR] 关闭配置界面后准星被关闭")
+        all_correct = False
+
+    overlay.close()
+    return all_correct
+
+
+def test_open_ui_while_hidden():
+    """测试准星隐藏时打开配置界面不会自动显示准星"""
+    from PySide6.QtCore import QTimer, QEventLoop
+    from overlay_daemon_pyside6 import OverlayDaemon
+    from preset_storage import MemoryStorage
+
+    daemon = OverlayDaemon("lan", MemoryStorage({"lan": {"size": 33}}))
+    daemon.show_crosshair()
+    overlay = daemon.overlay_window
+    daemon.hide_crosshair()
+    daemon.open_ui()
+
+    # 等过界面启动时自动显示准星的延迟（500 ms）
+    loop = QEventLoop()
+    QTimer.singleShot(800, loop.quit)
+    loop.exec()
+
+    ui = daemon.ui
+    shown = overlay.isVisible() or ui.is_shown or daemon.get_state()["shown"]
+    result = not shown and ui.overlay_window is overlay
+    if result:
+        print("[OK] 准星隐藏时打开配置界面，准星保持隐藏")
+    else:
+        print(f"[ERROR] 打开配置界面后准星被显示: visible={overlay.isVisible()}, ui.is_shown={ui.is_shown}")
+    ui.close()
+    overlay.close()
+    return result
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    success = test_daemon_mode() and test_open_ui_while_hidden()
+
+    if success:
+        print("\n[SUCCESS] 守护模式测试通过！")
+    else:
+        print("\n[FAILED] 守护模式测试失败！")
+
+    sys.exit(0 if success else 1)
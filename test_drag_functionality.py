@@ -6,10 +6,10 @@
 """
 
 import sys
-import json
 from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import Qt
 from config_ui_pyside6 import ConfigUI
+from preset_storage import MemoryStorage
 
 def test_drag_functionality():
     """测试拖动功能"""
@@ -18,7 +18,7 @@ def test_drag_functionality():
     app = QApplication(sys.argv)
     
     # 创建主窗口
-    main_window = ConfigUI()
+    main_window = ConfigUI(MemoryStorage())
     
     # 检查是否有拖动按钮
     if hasattr(main_window, 'drag_button'):
@@ -81,13 +81,12 @@ def test_drag_functionality():
     
     # 验证配置是否保存
     try:
-        with open(main_window.config_file_path, 'r', encoding='utf-8') as f:
-            saved_config = json.load(f)
-            if saved_config.get("position") == test_position:
-                print("[OK] 位置配置保存功能正常")
-            else:
-                print("[ERROR] 位置配置保存功能异常")
-                return False
+        saved_config = main_window.storage.load("default")
+        if saved_config.get("position") == test_position:
+            print("[OK] 位置配置保存功能正常")
+        else:
+            print("[ERROR] 位置配置保存功能异常")
+            return False
     except Exception as e:
         print(f"[ERROR] 配置文件读取失败: {e}")
         return False
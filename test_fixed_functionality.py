@@ -6,11 +6,11 @@
 """
 
 import sys
-import json
 import os
 from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import Qt, QPoint
 from config_ui_pyside6 import ConfigUI
+from preset_storage import MemoryStorage
 
 def test_fixed_functionality():
     """测试修复后的功能"""
@@ -19,7 +19,7 @@ def test_fixed_functionality():
     app = QApplication(sys.argv)
     
     # 创建主窗口
-    main_window = ConfigUI()
+    main_window = ConfigUI(MemoryStorage())
     
     # 测试1: 检查center_crosshair方法
     print("\n=== 测试1: 居中功能 ===")
@@ -95,21 +95,19 @@ def test_fixed_functionality():
     main_window.save_config()
     
     # 验证配置文件
-    if os.path.exists(main_window.config_file_path):
-        with open(main_window.config_file_path, 'r', encoding='utf-8') as f:
-            saved_config = json.load(f)
-            if saved_config.get("position") == {"x": 150, "y": 250}:
-                print("[OK] 预设位置保存功能正常")
-            else:
-                print("[ERROR] 预设位置保存功能异常")
-                return False
+    saved_config = main_window.storage.load(test_preset_name)
+    if saved_config is not None:
+        if saved_config.get("position") == {"x": 150, "y": 250}:
+            print("[OK] 预设位置保存功能正常")
+        else:
+            print("[ERROR] 预设位置保存功能异常")
+            return False
     else:
         print("[ERROR] 预设配置文件未创建")
         return False
     
     # 清理测试文件
-    if os.path.exists(main_window.config_file_path):
-        os.remove(main_window.config_file_path)
+    main_window.storage.delete(test_preset_name)
     
     # 恢复原始配置
     main_window.current_config_file = original_config_file
@@ -158,7 +156,7 @@ def test_position_saving_logic():
     if app is None:
         app = QApplication(sys.argv)
     
-    main_window = ConfigUI()
+    main_window = ConfigUI(MemoryStorage())
     main_window.show_crosshair()
     
     # 测试居中位置的保存
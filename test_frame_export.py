@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试准星画面导出
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication
+
+from frame_export import FrameExportWriter, FrameExportReader, ring_path
+
+
+CONFIG = {
+    "size": 20,
+    "color": "#FF0000",
+    "shape": "cross",
+    "thickness": 2,
+    "opacity": 1.0,
+    "position": {"x": "center", "y": "center"},
+}
+
+
+def remove_ring(name):
+    if sys.platform != "win32" and os.path.exists(ring_path(name)):
+        os.remove(ring_path(name))
+
+
+def test_ring_buffer():
+    """测试环形缓冲区的写入和读取"""
+    name = f"test-ring-{os.getpid()}"
+    writer = FrameExportWriter(name, 8, 4, slots=3)
+    reader = FrameExportReader(name)
+    all_correct = True
+
+    if reader.read_latest() is None and (reader.width, reader.height, reader.stride) == (8, 4, 32):
+        print("[OK] 没有帧时返回 None，尺寸正确")
+    else:
+        print("[ERROR] 空缓冲区读取错误")
+        all_correct = False
+
+    for value in (1, 2, 3):
+        pixels = writer.begin_frame()
+        pixels[:] = bytes([value]) * len(pixels)
+        pixels.release()
+        writer.commit_frame(100 + value, 200)
+    frame = reader.read_latest()
+    if frame and frame.number == 3 and frame.pixels == bytes([3]) * 128 and (frame.x, frame.y) == (103, 200):
+        print("[OK] 读取最新的一帧")
+    else:
+        print(f"[ERROR] 最新帧错误: {frame and (frame.number, frame.pixels[:4], frame.x)}")
+        all_correct = False
+    if reader.read_latest() is None and reader.frames_dropped == 0:
+        print("[OK] 没有新帧时返回 None")
+    else:
+        print("[ERROR] 重复读取到同一帧")
+        all_correct = False
+
+    # 正在写入的槽位不会被读到
+    writer.begin_frame().release()
+    writer.commit_frame()
+    pixels = writer.begin_frame()
+    pixels.release()
+    frame = reader.read_latest()
+    if frame and frame.number == 4:
+        print("[OK] 只读取已经写完的帧")
+    else:
+        print(f"[ERROR] 读取到正在写入的帧: {frame and frame.number}")
+        all_correct = False
+
+    writer.commit_frame()
+    writer.begin_frame().release()
+    writer.commit_frame()
+    frame = reader.read_latest()
+    if frame and frame.number == 6 and reader.frames_dropped == 1:
+        print("[OK] 统计读取端错过的帧")
+    else:
+        print(f"[ERROR] 错过的帧统计错误: {reader.frames_dropped}")
+        all_correct = False
+
+    reader.close()
+    writer.close()
+    remove_ring(name)
+
+    # 名称规则与实时参数块相同，不能跳出共享内存文件夹
+    rejected = []
+    for bad in ("../escape", "a/b", "", "x" * 65):
+        try:
+            FrameExportWriter(bad, 8, 4)
+        except ValueError:
+            rejected.append(bad)
+    if len(rejected) == 4:
+        print("[OK] 拒绝不合法的缓冲区名称")
+    else:
+        print(f"[ERROR] 不合法的缓冲区名称没有被拒绝: {rejected}")
+        all_correct = False
+    return all_correct
+
+
+def test_overlay_export():
+    """测试覆盖层把准星绘制到缓冲区"""
+    from overlay_window_pyside6 import OverlayWindow
+
+    app = QApplication.instance()
+    name = f"test-overlay-{os.getpid()}"
+    overlay = OverlayWindow(dict(CONFIG))
+    overlay.showFullScreen()
+    overlay.set_frame_export(name, "changes", 64)
+    reader = FrameExportReader(name)
+    all_correct = True
+
+    overlay.repaint()
+    app.processEvents()
+    frame = reader.read_latest()
+    if frame is None:
+        print("[ERROR] 覆盖层没有导出画面")
+        overlay.close()
+        return False
+    center = frame.stride * 32 + 4 * 32
+    r, g, b, a = frame.pixels[center:center + 4]
+    corner = frame.pixels[0:4]
+    x, y = overlay.crosshair_center()
+    if (r, g, b, a) == (255, 0, 0, 255) and corner == b"\0\0\0\0" and (frame.x, frame.y) == (x, y):
+        print(f"[OK] 导出的 RGBA 画面中心为准星颜色，准星位于 ({frame.x}, {frame.y})")
+    else:
+        print(f"[ERROR] 导出的画面错误: center={(r, g, b, a)}, corner={corner}, pos=({frame.x}, {frame.y})")
+        all_correct = False
+
+    # 画面没有变化时不导出
+    overlay.repaint()
+    if reader.read_latest() is None:
+        print("[OK] changes 模式下画面不变时不导出")
+    else:
+        print("[ERROR] 画面不变时仍然导出")
+        all_correct = False
+
+    config = dict(CONFIG, color="#00FF00")
+    overlay.updateConfig(config)
+    overlay.repaint()
+    frame = reader.read_latest()
+    if frame is not None and frame.pixels[center:center + 4] == bytes([0, 255, 0, 255]):
+        print("[OK] 颜色修改后导出新画面")
+    else:
+        print("[ERROR] 颜色修改后没有导出新画面")
+        all_correct = False
+
+    overlay.set_frame_export(name, "every", 64)
+    reader.close()
+    reader = FrameExportReader(name)
+    overlay.repaint()
+    overlay.repaint()
+    if reader.read_latest() is not None and overlay.frame_export.frame == 2:
+        print("[OK] every 模式下每次绘制都导出")
+    else:
+        print(f"[ERROR] every 模式导出错误: {overlay.frame_export.frame}")
+        all_correct = False
+
+    overlay.set_frame_export(None)
+    reader.close()
+    overlay.close()
+    remove_ring(name)
+    return all_correct
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    success1 = test_ring_buffer()
+    success2 = test_overlay_export()
+
+    if success1 and success2:
+        print("\n[SUCCESS] 画面导出测试通过！")
+    else:
+        print("\n[FAILED] 画面导出测试失败！")
+
+    sys.exit(0 if (success1 and success2) else 1)
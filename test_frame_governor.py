@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试重绘帧率调节器
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_governor_modes():
+    """测试各状态下的模式和帧率"""
+    from frame_governor import FrameGovernor
+
+    clock = FakeClock()
+    governor = FrameGovernor(display_rate=144, profile="balanced", clock=clock)
+
+    checks = []
+    checks.append(("隐藏", governor.evaluate(), ("off", 0.0)))
+
+    governor.set_visible(True)
+    checks.append(("静态准星", governor.evaluate(), ("static", 0.0)))
+
+    governor.set_drag_mode(True)
+    checks.append(("拖动模式", governor.evaluate(), ("active", 144)))
+
+    governor.mark_idle()
+    checks.append(("拖动空闲", governor.evaluate(), ("static", 0.0)))
+
+    governor.set_drag_mode(False)
+    governor.set_animation_rate(48.0)
+    checks.append(("动画", governor.evaluate(), ("active", 48.0)))
+
+    governor.mark_idle()
+    checks.append(("动画空闲", governor.evaluate(), ("idle", 30)))
+
+    governor.set_profile("battery")
+    governor.touch()
+    checks.append(("省电模式动画", governor.evaluate(), ("active", 30)))
+
+    governor.mark_idle()
+    checks.append(("省电模式空闲", governor.evaluate(), ("idle", 15)))
+
+    all_correct = True
+    for name, actual, expected in checks:
+        if actual == expected:
+            print(f"[OK] {name}: {actual}")
+        else:
+            print(f"[ERROR] {name}: 期望 {expected}, 实际 {actual}")
+            all_correct = False
+    return all_correct
+
+
+def test_governor_mode_time():
+    """测试各模式累计时间统计"""
+    from frame_governor import FrameGovernor
+
+    clock = FakeClock()
+    governor = FrameGovernor(display_rate=60, clock=clock)
+    governor.set_visible(True)
+    governor.evaluate()
+
+    clock.now = 10.0
+    governor.set_drag_mode(True)
+    governor.evaluate()
+
+    clock.now = 12.5
+    stats = governor.stats()
+    if stats["mode"] != "active":
+        print(f"[ERROR] 当前模式错误: {stats['mode']}")
+        return False
+    if stats["mode_time"]["static"] != 10.0 or stats["mode_time"]["active"] != 2.5:
+        print(f"[ERROR] 模式时间统计错误: {stats['mode_time']}")
+        return False
+    print(f"[OK] 模式时间统计正确: {stats['mode_time']}")
+    return True
+
+
+def test_overlay_governor():
+    """测试覆盖层静态时停止重绘定时器"""
+    from PySide6.QtWidgets import QApplication
+    from overlay_window_pyside6 import OverlayWindow
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+
+    config = {
+        "size": 20,
+        "color": "#FF0000",
+        "shape": "cross",
+        "thickness": 2,
+        "opacity": 0.8,
+        "position": {"x": "center", "y": "center"}
+    }
+    overlay = OverlayWindow(config)
+    overlay.showFullScreen()
+
+    if overlay.timer.isActive() or overlay.governor_stats()["mode"] != "static":
+        print("[ERROR] 静态准星仍在定时重绘")
+        return False
+    print("[OK] 静态准星不再定时重绘")
+
+    overlay.hide()
+    if overlay.governor_stats()["mode"] != "off":
+        print("[ERROR] 隐藏后模式错误")
+        return False
+    print("[OK] 隐藏后停止重绘")
+
+    overlay.close()
+    return True
+
+
+if __name__ == "__main__":
+    success1 = test_governor_modes()
+    success2 = test_governor_mode_time()
+    success3 = test_overlay_governor()
+
+    if success1 and success2 and success3:
+        print("\n[SUCCESS] 帧率调节器测试通过！")
+    else:
+        print("\n[FAILED] 帧率调节器测试失败！")
+
+    sys.exit(0 if (success1 and success2 and success3) else 1)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试高 DPI 绘制：尺寸单位换算、按设备像素比缓存的图集
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QPainter
+
+
+CONFIG = {
+    "size": 20,
+    "color": "#FF0000",
+    "shape": "cross",
+    "thickness": 2,
+    "opacity": 1.0,
+    "position": {"x": "center", "y": "center"},
+}
+
+
+def test_size_units():
+    """测试尺寸单位换算为物理像素"""
+    from crosshair_renderer_pyside6 import device_config
+
+    cases = [
+        ("逻辑像素 100%", dict(CONFIG), 1.0, 1080, 20, 2),
+        ("逻辑像素 200%", dict(CONFIG), 2.0, 1080, 40, 4),
+        ("物理像素 200%", dict(CONFIG, size_unit="physical"), 2.0, 1080, 20, 2),
+        ("屏幕比例 4K", dict(CONFIG, size_unit="screen"), 1.0, 2160, 40, 4),
+        ("屏幕比例 4K 200%", dict(CONFIG, size_unit="screen"), 2.0, 1080, 40, 4),
+        ("屏幕比例 720p", dict(CONFIG, size_unit="screen", thickness=1), 1.0, 720, 13, 1),
+    ]
+
+    all_correct = True
+    for name, config, dpr, height, size, thickness in cases:
+        result = device_config(config, dpr, height)
+        if result["size"] == size and result["thickness"] == thickness:
+            print(f"[OK] {name}: size={result['size']}, thickness={result['thickness']}")
+        else:
+            print(f"[ERROR] {name}: 期望 {size}/{thickness}, 实际 {result['size']}/{result['thickness']}")
+            all_correct = False
+
+    result = device_config(dict(CONFIG, hollow_gap=0), 2.0)
+    if result["hollow_gap"] == 0:
+        print("[OK] 长度 0 保持为 0")
+    else:
+        print(f"[ERROR] 长度 0 换算后为 {result['hollow_gap']}")
+        all_correct = False
+    return all_correct
+
+
+def test_atlas_per_dpr():
+    """测试图集按物理像素绘制并按 DPR 缓存"""
+    from crosshair_renderer_pyside6 import device_config
+    from sprite_atlas_pyside6 import build_atlas, AtlasManager
+
+    all_correct = True
+    config = device_config(CONFIG, 2.0)
+    atlas = build_atlas(config, 2.0)
+    if atlas.image.width() == atlas.side and atlas.image.devicePixelRatio() == 2.0 and atlas.frame_count == 1:
+        print(f"[OK] 静态图集为单帧物理像素图像: {atlas.image.width()}x{atlas.image.height()} @2x")
+    else:
+        print(f"[ERROR] 图集尺寸错误: {atlas.image.width()}, dpr={atlas.image.devicePixelRatio()}, "
+              f"frames={atlas.frame_count}")
+        all_correct = False
+
+    # 绘制到 200% 的目标上：中心对齐到物理像素，横线粗 4 个物理像素
+    target = QImage(200, 200, QImage.Format_ARGB32_Premultiplied)
+    target.setDevicePixelRatio(2.0)
+    target.fill(Qt.transparent)
+    painter = QPainter(target)
+    atlas.draw_frame(painter, (50, 50), 0)
+    painter.end()
+    rows = [y for y in range(200) if target.pixelColor(120, y).alpha() > 128]
+    if rows and min(rows) >= 97 and max(rows) <= 102 and len(rows) == 4:
+        print(f"[OK] 横线在物理像素中清晰对齐: 行 {rows}")
+    else:
+        print(f"[ERROR] 横线位置或粗细错误: 行 {rows}")
+        all_correct = False
+
+    manager = AtlasManager()
+    sprite1 = manager.sprite(device_config(CONFIG, 1.0), 1.0)
+    sprite2 = manager.sprite(config, 2.0)
+    if sprite1.key != sprite2.key and manager.sprite(config, 2.0) is sprite2:
+        print(f"[OK] 不同 DPR 分别缓存: {sprite1.key[-4:]}, {sprite2.key[-4:]}")
+    else:
+        print("[ERROR] 图集缓存没有区分 DPR")
+        all_correct = False
+    return all_correct
+
+
+def test_overlay_sprite():
+    """测试覆盖层按当前屏幕预渲染静态准星"""
+    from overlay_window_pyside6 import OverlayWindow
+
+    overlay = OverlayWindow(dict(CONFIG))
+    overlay.showFullScreen()
+    app = QApplication.instance()
+    app.processEvents()
+    overlay.grab()
+
+    all_correct = True
+    sprite = overlay.sprite
+    if sprite is not None and sprite.dpr == overlay.devicePixelRatioF() and overlay.current_atlas is None:
+        print(f"[OK] 静态准星使用单帧图集: dpr={sprite.dpr}, 屏幕={overlay.screen_key}")
+    else:
+        print(f"[ERROR] 静态准星没有使用单帧图集: {sprite}")
+        all_correct = False
+
+    config = overlay.config
+    config["size_unit"] = "physical"
+    overlay.updateConfig(config)
+    if overlay.update_stats["rebuild"] == 1:
+        print("[OK] 修改尺寸单位会重建图集")
+    else:
+        print(f"[ERROR] 修改尺寸单位没有重建图集: {overlay.update_stats}")
+        all_correct = False
+    overlay.close()
+    return all_correct
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    success1 = test_size_units()
+    success2 = test_atlas_per_dpr()
+    success3 = test_overlay_sprite()
+
+    if success1 and success2 and success3:
+        print("\n[SUCCESS] 高 DPI 绘制测试通过！")
+    else:
+        print("\n[FAILED] 高 DPI 绘制测试失败！")
+
+    sys.exit(0 if (success1 and success2 and success3) else 1)
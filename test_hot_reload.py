@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试预设文件热加载
+"""
+
+import sys
+import os
+import json
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication
+
+
+def wait_until(condition, timeout=5.0):
+    """处理事件直到条件成立或超时"""
+    app = QApplication.instance()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.processEvents()
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def write_file(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_daemon_hot_reload(storage):
+    """测试守护模式：连续写入合并、只应用变化的字段、半写文件保留旧配置"""
+    from overlay_daemon_pyside6 import OverlayDaemon
+    from preset_io import default_config, write_preset
+
+    config = default_config()
+    config["size"] = 20
+    write_preset(storage, "admin", config)
+    daemon = OverlayDaemon("admin", storage)
+    daemon.show_crosshair()
+    overlay = daemon.overlay_window
+    watcher = daemon.preset_watcher
+    path = storage.path("admin")
+    all_correct = True
+
+    # 连续写入 10 次，只重新加载一次（最后的内容）
+    for size in range(30, 40):
+        config["size"] = size
+        write_preset(storage, "admin", config)
+    if wait_until(lambda: daemon.config["size"] == 39) and watcher.reload_count == 1:
+        print(f"[OK] 10 次连续写入合并为 1 次重新加载，写入到应用 {watcher.apply_latency_ms} ms")
+    else:
+        print(f"[ERROR] 重新加载错误: size={daemon.config['size']}, reloads={watcher.reload_count}")
+        all_correct = False
+
+    if wait_until(lambda: watcher.frame_latency_ms is not None):
+        print(f"[OK] 文件写入到画出新画面 {watcher.frame_latency_ms} ms")
+    else:
+        print("[ERROR] 没有记录画面延迟")
+        all_correct = False
+
+    if overlay.isVisible() and daemon.overlay_window is overlay:
+        print("[OK] 重新加载时没有隐藏或重建窗口")
+    else:
+        print("[ERROR] 重新加载时窗口被隐藏或重建")
+        all_correct = False
+
+    # 只修改位置：按位置变化处理，不重建图集
+    rebuilds = overlay.update_stats["rebuild"]
+    config["position"] = {"x": 100, "y": 120}
+    write_preset(storage, "admin", config)
+    if wait_until(lambda: overlay.get_crosshair_position() == (100, 120)) \
+            and overlay.update_stats["rebuild"] == rebuilds:
+        print("[OK] 只修改位置时只移动准星")
+    else:
+        print(f"[ERROR] 位置修改错误: {overlay.get_crosshair_position()}, stats={overlay.update_stats}")
+        all_correct = False
+
+    # 写了一半的文件：保留上一份配置
+    write_file(path, '{"version": 2, "size": 5')
+    if wait_until(lambda: watcher.failure_count == 1) and daemon.config["size"] == 39:
+        print("[OK] 写了一半的文件被忽略，保留上一份配置")
+    else:
+        print(f"[ERROR] 半写文件处理错误: failures={watcher.failure_count}, size={daemon.config['size']}")
+        all_correct = False
+
+    # 先写临时文件再改名（编辑器常用的保存方式）
+    config["color"] = "#00FF00"
+    temp_path = path + ".tmp"
+    write_file(temp_path, json.dumps(config))
+    os.replace(temp_path, path)
+    if wait_until(lambda: daemon.config["color"] == "#00FF00"):
+        print("[OK] 替换写入的文件被重新加载")
+    else:
+        print("[ERROR] 替换写入后没有重新加载")
+        all_correct = False
+
+    state = daemon.get_state()
+    if state["hot_reload"]["reloads"] == watcher.reload_count and state["hot_reload"]["watching"] == path:
+        print(f"[OK] 状态中包含热加载统计: {state['hot_reload']}")
+    else:
+        print(f"[ERROR] 状态中的热加载统计错误: {state.get('hot_reload')}")
+        all_correct = False
+
+    overlay.close()
+    watcher.stop()
+    return all_correct
+
+
+def test_config_ui_hot_reload(storage):
+    """测试配置界面：外部修改后更新控件和准星"""
+    from config_ui_pyside6 import ConfigUI
+    from preset_io import read_preset, write_preset
+
+    ui = ConfigUI(storage)
+    ui.show_crosshair()
+    config = read_preset(storage, "default")
+    config["thickness"] = 5
+    write_preset(storage, "default", config)
+    all_correct = True
+    if wait_until(lambda: ui.config["thickness"] == 5) and ui.thickness_slider.value() == 5 \
+            and ui.overlay_window.config["thickness"] == 5:
+        print("[OK] 配置界面重新加载外部修改的预设")
+    else:
+        print(f"[ERROR] 配置界面没有重新加载: {ui.config['thickness']}")
+        all_correct = False
+
+    # 界面自己保存不会触发重新应用
+    reloads = ui.preset_watcher.reload_count
+    rebuilds = ui.overlay_window.update_stats["rebuild"]
+    ui.save_config()
+    wait_until(lambda: ui.preset_watcher.reload_count > reloads, 1.0)
+    if ui.overlay_window.update_stats["rebuild"] == rebuilds:
+        print("[OK] 界面保存预设后没有重复应用")
+    else:
+        print("[ERROR] 界面保存预设后重复应用了配置")
+        all_correct = False
+
+    ui.overlay_window.close()
+    ui.close()
+    return all_correct
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    from preset_storage import TempDirStorage
+    storage = TempDirStorage()
+    try:
+        success1 = test_daemon_hot_reload(storage)
+        success2 = test_config_ui_hot_reload(storage)
+    finally:
+        storage.cleanup()
+
+    if success1 and success2:
+        print("\n[SUCCESS] 预设热加载测试通过！")
+    else:
+        print("\n[FAILED] 预设热加载测试失败！")
+
+    sys.exit(0 if (success1 and success2) else 1)
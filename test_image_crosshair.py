@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试 PNG / SVG 图片准星
+"""
+
+import sys
+import os
+import time
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QImage, QColor
+
+
+SVG = """<svg xmlns="http://www.w3.org/2000/svg" width="64" height="64" viewBox="0 0 64 64">
+<rect x="24" y="24" width="16" height="16" fill="#0000FF"/>
+</svg>
+"""
+
+
+def write_images(directory):
+    """生成测试用的 SVG、PNG 和无效的图片"""
+    paths = {}
+    paths["svg"] = os.path.join(directory, "reticle.svg")
+    with open(paths["svg"], "w", encoding="utf-8") as f:
+        f.write(SVG)
+    paths["png"] = os.path.join(directory, "reticle.png")
+    image = QImage(32, 32, QImage.Format_ARGB32)
+    image.fill(QColor(0, 255, 0))
+    image.save(paths["png"])
+    paths["broken"] = os.path.join(directory, "broken.svg")
+    with open(paths["broken"], "w", encoding="utf-8") as f:
+        f.write("<svg")
+    paths["huge"] = os.path.join(directory, "huge.png")
+    QImage(4096, 4, QImage.Format_ARGB32).save(paths["huge"])
+    paths["jpg"] = os.path.join(directory, "reticle.jpg")
+    image.save(paths["jpg"])
+    return paths
+
+
+def config_for(path, **extra):
+    config = {
+        "size": 20,
+        "color": "#FF0000",
+        "shape": "image",
+        "image": path,
+        "opacity": 1.0,
+        "position": {"x": "center", "y": "center"},
+    }
+    config.update(extra)
+    return config
+
+
+def test_validation(paths):
+    """测试导入前的检查"""
+    from image_crosshair_pyside6 import validate_image
+    from preset_schema import normalize_preset
+
+    all_correct = True
+    issues = {name: validate_image(path) for name, path in paths.items()}
+    if issues["svg"] is None and issues["png"] is None and all(issues[name] for name in ("broken", "huge", "jpg")):
+        print("[OK] 有效的 SVG / PNG 通过检查，无效、过大和不支持的图片被拒绝")
+    else:
+        print(f"[ERROR] 图片检查错误: {issues}")
+        all_correct = False
+
+    config, problems = normalize_preset({"shape": "image", "image": paths["jpg"]})
+    if config.get("shape") == "image" and "image" not in config and len(problems) == 1:
+        print("[OK] 预设中不是 PNG / SVG 的图片路径被丢弃")
+    else:
+        print(f"[ERROR] 预设校验错误: {config}, {problems}")
+        all_correct = False
+    return all_correct
+
+
+def test_rasterize(paths):
+    """测试图片按尺寸和染色栅格化一次并绘制到精灵图中"""
+    from image_crosshair_pyside6 import raster_cache, RasterCache
+    from sprite_atlas_pyside6 import build_atlas
+    from crosshair_renderer_pyside6 import config_hash
+
+    all_correct = True
+    atlas = build_atlas(config_for(paths["svg"]))
+    plain = atlas.image.pixelColor(atlas.extent, atlas.extent)
+    tinted_atlas = build_atlas(config_for(paths["svg"], image_tint="color"))
+    tinted = tinted_atlas.image.pixelColor(tinted_atlas.extent, tinted_atlas.extent)
+    corner = atlas.image.pixelColor(atlas.extent - 18, atlas.extent - 18)
+    if plain.name() == "#0000ff" and tinted.name() == "#ff0000" and corner.alpha() == 0:
+        print("[OK] SVG 按原色和准星颜色染色绘制")
+    else:
+        print(f"[ERROR] SVG 绘制错误: {plain.name()}, {tinted.name()}, corner alpha {corner.alpha()}")
+        all_correct = False
+
+    rasterized = raster_cache.rasterized
+    build_atlas(config_for(paths["svg"], animation="rotate", animation_frames=8))
+    if raster_cache.rasterized == rasterized:
+        print("[OK] 动画的每一帧复用同一张栅格化图片")
+    else:
+        print(f"[ERROR] 动画帧重复栅格化: {raster_cache.rasterized - rasterized}")
+        all_correct = False
+
+    small = RasterCache(max_bytes=64 * 1024)
+    for size in range(40, 120, 10):
+        small.get(paths["png"], size)
+    if small.total_bytes <= 64 * 1024 and len(small) < 8:
+        print(f"[OK] 栅格化缓存不超过内存上限: {small.total_bytes} 字节，{len(small)} 张")
+    else:
+        print(f"[ERROR] 栅格化缓存超出上限: {small.total_bytes}")
+        all_correct = False
+
+    before = config_hash(config_for(paths["png"]))
+    time.sleep(0.01)
+    image = QImage(32, 32, QImage.Format_ARGB32)
+    image.fill(QColor(255, 255, 0))
+    image.save(paths["png"])
+    os.utime(paths["png"], ns=(time.time_ns(), time.time_ns()))
+    after_atlas = build_atlas(config_for(paths["png"]))
+    after = after_atlas.image.pixelColor(after_atlas.extent, after_atlas.extent)
+    if config_hash(config_for(paths["png"])) != before and after.name() == "#ffff00":
+        print("[OK] 图片文件被替换后外观哈希改变，重新栅格化")
+    else:
+        print(f"[ERROR] 图片替换后仍使用旧图: {after.name()}")
+        all_correct = False
+
+    fallback = build_atlas(config_for(paths["broken"]))
+    if fallback.image.pixelColor(fallback.extent, fallback.extent).red() > 200:
+        print("[OK] 无效的图片退回到十字准星")
+    else:
+        print("[ERROR] 无效的图片没有退回到十字准星")
+        all_correct = False
+    return all_correct
+
+
+def test_overlay_and_import(paths):
+    """测试覆盖层只拷贝精灵图，以及配置界面导入图片"""
+    from image_crosshair_pyside6 import raster_cache
+    from overlay_window_pyside6 import OverlayWindow
+    from config_ui_pyside6 import ConfigUI
+    from preset_storage import TempDirStorage
+
+    app = QApplication.instance()
+    all_correct = True
+    overlay = OverlayWindow(config_for(paths["svg"], size=30))
+    overlay.showFullScreen()
+    rasterized = raster_cache.rasterized
+    for _ in range(5):
+        overlay.repaint()
+    app.processEvents()
+    if overlay.sprite is not None and raster_cache.rasterized == rasterized:
+        print("[OK] 覆盖层重绘时只拷贝精灵图，不重新渲染 SVG")
+    else:
+        print(f"[ERROR] 覆盖层重绘时重新渲染了图片: {raster_cache.rasterized - rasterized}")
+        all_correct = False
+    overlay.close()
+
+    storage = TempDirStorage()
+    try:
+        ui = ConfigUI(storage)
+        rejected = not ui.import_crosshair_image(paths["huge"])
+        imported = ui.import_crosshair_image(paths["svg"])
+        target = os.path.join(storage.directory, "images", "reticle.svg")
+        if rejected and imported and ui.config["image"] == target and os.path.exists(target) \
+                and ui.config["shape"] == "image":
+            print("[OK] 配置界面检查并导入图片到预设文件夹")
+        else:
+            print(f"[ERROR] 导入图片错误: {ui.config.get('image')}, {ui.config['shape']}")
+            all_correct = False
+        ui.close()
+    finally:
+        storage.cleanup()
+    return all_correct
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_images(directory)
+        success1 = test_validation(paths)
+        success2 = test_rasterize(paths)
+        success3 = test_overlay_and_import(paths)
+
+    if success1 and success2 and success3:
+        print("\n[SUCCESS] 图片准星测试通过！")
+    else:
+        print("\n[FAILED] 图片准星测试失败！")
+
+    sys.exit(0 if (success1 and success2 and success3) else 1)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试共享内存实时参数块
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication
+
+
+def test_reader_writer():
+    """测试写入和读取"""
+    from live_params import LiveParamsWriter, LiveParamsReader, apply_values, block_path
+
+    name = f"test-{os.getpid()}"
+    writer = LiveParamsWriter(name)
+    reader = LiveParamsReader(name)
+
+    all_correct = True
+    if reader.poll() is not None:
+        print("[ERROR] 未写入时不应读到参数")
+        all_correct = False
+
+    writer.write(size=35, color="#00FF00", opacity=0.5)
+    result = reader.poll()
+    config = {}
+    if result is not None:
+        apply_values(config, *result)
+    expected = {"size": 35, "color": "#00FF00", "opacity": 0.5}
+    if config == expected:
+        print(f"[OK] 读取参数正确: {config}")
+    else:
+        print(f"[ERROR] 读取参数错误: 期望 {expected}, 实际 {config}")
+        all_correct = False
+
+    if reader.poll() is not None:
+        print("[ERROR] 计数器未变化时应返回 None")
+        all_correct = False
+    else:
+        print("[OK] 计数器未变化时跳过读取")
+
+    writer.write(hollow_gap=7)
+    config = {}
+    apply_values(config, *reader.poll())
+    if config.get("hollow_gap") == 7 and config.get("size") == 35:
+        print("[OK] 增量写入保留之前的字段")
+    else:
+        print(f"[ERROR] 增量写入错误: {config}")
+        all_correct = False
+
+    writer.close()
+    reader.close()
+    if sys.platform != "win32":
+        os.remove(block_path(name))
+    return all_correct
+
+
+def test_block_name():
+    """测试拒绝可能指向共享内存目录之外的参数块名称"""
+    import tempfile
+    from live_params import LiveParamsReader, block_path
+    from preset_schema import normalize_preset, SCHEMA
+
+    all_correct = True
+    outside = os.path.join(tempfile.mkdtemp(), "victim")
+    with open(outside, "w") as f:
+        f.write("keep")
+    name = "../" + os.path.relpath(outside, os.path.dirname(block_path("probe")))
+    for bad in ("../etc", "a/b", name, "", "x" * 65, "名称"):
+        try:
+            LiveParamsReader(bad)
+        except ValueError:
+            continue
+        print(f"[ERROR] 接受了不合法的参数块名称: {bad!r}")
+        all_correct = False
+    with open(outside) as f:
+        if f.read() == "keep":
+            print("[OK] 参数块拒绝包含路径的名称，目录之外的文件没有被修改")
+        else:
+            print("[ERROR] 目录之外的文件被修改")
+            all_correct = False
+
+    config, issues = normalize_preset({"live_params": "../../tmp/x"})
+    if "live_params" not in config and issues and SCHEMA.coerce_field("live_params", "spread_2") == "spread_2":
+        print(f"[OK] 预设中的非法参数块名称被丢弃: {issues[0]}")
+    else:
+        print(f"[ERROR] 预设校验没有拒绝非法名称: {config}, {issues}")
+        all_correct = False
+    try:
+        SCHEMA.coerce_field("live_params", "a/../b")
+        print("[ERROR] set_field 接受了非法参数块名称")
+        all_correct = False
+    except ValueError:
+        print("[OK] set_field 拒绝非法参数块名称")
+    return all_correct
+
+
+def test_overlay_live_params():
+    """测试覆盖层每帧轮询参数块"""
+    from live_params import LiveParamsWriter, block_path
+    from overlay_window_pyside6 import OverlayWindow
+    from sprite_atlas_pyside6 import sprite_key
+
+    name = f"test-overlay-{os.getpid()}"
+    config = {
+        "size": 20,
+        "color": "#FF0000",
+        "shape": "cross",
+        "thickness": 2,
+        "opacity": 0.8,
+        "position": {"x": "center", "y": "center"},
+        "live_params": name,
+    }
+    overlay = OverlayWindow(config)
+    overlay.showFullScreen()
+    writer = LiveParamsWriter(name)
+
+    all_correct = True
+    if overlay.governor_stats()["mode"] != "active":
+        print("[ERROR] 连接参数块后应持续轮询")
+        all_correct = False
+    else:
+        print("[OK] 连接参数块后持续轮询")
+
+    writer.write(size=44)
+    overlay.on_frame_tick()
+    if overlay.render_config.get("size") == 44 and config["size"] == 20:
+        print("[OK] 实时参数已应用，原配置未被修改")
+    else:
+        print(f"[ERROR] 实时参数应用错误: {overlay.render_config.get('size')}, {config['size']}")
+        all_correct = False
+
+    # 参数停止变化后重新构建静态准星的单帧图集
+    drawn_vector = overlay.sprite is None
+    deadline = time.monotonic() + 2.0
+    while overlay.sprite is None and time.monotonic() < deadline:
+        QApplication.processEvents()
+        time.sleep(0.01)
+    expected = sprite_key(*overlay.device_render_config())
+    if drawn_vector and overlay.sprite is not None and overlay.sprite.key == expected:
+        print("[OK] 实时参数稳定后恢复单帧图集")
+    else:
+        print(f"[ERROR] 实时参数稳定后没有构建图集: {drawn_vector}, {overlay.sprite}")
+        all_correct = False
+
+    # 断开参数块后恢复原配置
+    config["live_params"] = ""
+    overlay.updateConfig(config)
+    if overlay.live_params is None and overlay.render_config.get("size") == 20:
+        print("[OK] 断开参数块后恢复原配置")
+    else:
+        print("[ERROR] 断开参数块失败")
+        all_correct = False
+
+    writer.close()
+    overlay.close()
+    if sys.platform != "win32":
+        os.remove(block_path(name))
+    return all_correct
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    success1 = test_reader_writer() and test_block_name()
+    success2 = test_overlay_live_params()
+
+    if success1 and success2:
+        print("\n[SUCCESS] 实时参数块测试通过！")
+    else:
+        print("\n[FAILED] 实时参数块测试失败！")
+
+    sys.exit(0 if (success1 and success2) else 1)
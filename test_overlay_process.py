@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试覆盖层进程隔离
+"""
+
+import sys
+import os
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication
+
+
+def wait_until(condition, timeout=10.0):
+    """处理事件直到条件成立或超时"""
+    app = QApplication.instance()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.processEvents()
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_protocol():
+    """测试新增命令的解析"""
+    from control_protocol import parse_command, encode_command, encode_config
+
+    config = {"size": 20, "color": "#FF0000", "position": {"x": "center", "y": 300}}
+    line = encode_command("apply_config", encode_config(config)).decode("utf-8")
+    command, args = parse_command(line)
+    if command == "apply_config" and args == [config]:
+        print("[OK] apply_config 按 JSON 解析")
+    else:
+        print(f"[ERROR] apply_config 解析错误: {command}, {args}")
+        return False
+
+    if parse_command("drag_mode on") == ("drag_mode", ["on"]):
+        print("[OK] drag_mode 解析正确")
+        return True
+    print("[ERROR] drag_mode 解析错误")
+    return False
+
+
+def test_isolated_overlay():
+    """测试子进程中的覆盖层：快照合并、界面卡住时继续工作、界面崩溃后继续运行"""
+    from control_protocol import ControlClient, server_name
+    from control_server_pyside6 import is_server_running
+    from overlay_process_pyside6 import RemoteOverlay
+    from preset_io import default_config
+
+    address = server_name(f"CrosshairTestOverlay-{os.getpid()}")
+    public_address = server_name(f"CrosshairTestPublic-{os.getpid()}")
+    overlay = RemoteOverlay(default_config(), address, public_address)
+    all_correct = True
+    try:
+        if wait_until(overlay.is_connected):
+            print("[OK] 已连接覆盖层子进程")
+        else:
+            print("[ERROR] 连接覆盖层子进程超时")
+            return False
+
+        painted = []
+        overlay.frame_painted.connect(lambda: painted.append(True))
+        overlay.showFullScreen()
+        config = overlay.config
+        for size in range(21, 71):
+            config["size"] = size
+            overlay.updateConfig(config)
+        wait_until(lambda: not overlay._config_in_flight)
+
+        state = overlay.remote_state()
+        if state.get("shown") and state["config"]["size"] == 70 and overlay.snapshots_sent < 50:
+            print(f"[OK] 50 次修改合并为 {overlay.snapshots_sent} 份快照，子进程配置为最新值")
+        else:
+            print(f"[ERROR] 快照合并错误: sent={overlay.snapshots_sent}, state={state}")
+            all_correct = False
+        if painted:
+            print("[OK] 子进程绘制后通知界面进程")
+        else:
+            print("[ERROR] 没有收到子进程的绘制通知")
+            all_correct = False
+
+        # 界面进程卡住（模态对话框）时，覆盖层仍然响应并绘制
+        results = []
+
+        def poke():
+            with ControlClient(address, timeout=2.0) as client:
+                results.append(client.set_field("size", 33))
+
+        thread = threading.Thread(target=poke)
+        thread.start()
+        time.sleep(1.0)
+        thread.join(2.0)
+        if results and results[0][0]:
+            print(f"[OK] 界面进程卡住时覆盖层仍在绘制，延迟 {results[0][1]} ms")
+        else:
+            print(f"[ERROR] 界面进程卡住时覆盖层没有响应: {results}")
+            all_correct = False
+
+        # 界面进程崩溃（不发送 quit 就断开）
+        overlay.closing = True
+        overlay.socket.abort()
+
+        def public_alive():
+            try:
+                with ControlClient(public_address, timeout=0.5) as client:
+                    return client.ping()
+            except OSError:
+                return False
+
+        if wait_until(public_alive, 5.0):
+            with ControlClient(public_address) as client:
+                state = client.get_state()
+            if state and state.get("shown"):
+                print("[OK] 界面进程崩溃后准星继续显示，并接管公共控制服务")
+            else:
+                print(f"[ERROR] 接管后状态错误: {state}")
+                all_correct = False
+        else:
+            print("[ERROR] 界面进程崩溃后子进程没有接管公共控制服务")
+            all_correct = False
+    finally:
+        for name in (public_address, address):
+            try:
+                with ControlClient(name, timeout=1.0) as client:
+                    client.quit()
+                break
+            except OSError:
+                pass
+
+    if wait_until(lambda: not is_server_running(address), 5.0):
+        print("[OK] quit 命令关闭子进程")
+    else:
+        print("[ERROR] 子进程没有退出")
+        all_correct = False
+    return all_correct
+
+
+def test_clean_close():
+    """测试界面进程正常关闭时子进程一起退出"""
+    from control_protocol import server_name
+    from control_server_pyside6 import is_server_running
+    from overlay_process_pyside6 import RemoteOverlay
+    from preset_io import default_config
+
+    address = server_name(f"CrosshairTestClose-{os.getpid()}")
+    overlay = RemoteOverlay(default_config(), address)
+    if not wait_until(overlay.is_connected):
+        print("[ERROR] 连接覆盖层子进程超时")
+        return False
+    overlay.close()
+    if wait_until(lambda: not is_server_running(address), 5.0):
+        print("[OK] 关闭代理时子进程退出")
+        return True
+    print("[ERROR] 关闭代理后子进程仍在运行")
+    return False
+
+
+def test_ui_child_options():
+    """测试从界面启动的子进程带上公共控制服务地址和性能分析设置"""
+    import glob
+    import tempfile
+    from crosshair_pyside6 import parse_args, create_controller
+    from control_protocol import server_name
+    from control_server_pyside6 import is_server_running
+    from overlay_process_pyside6 import child_command
+    from preset_storage import MemoryStorage
+
+    all_correct = True
+    profile_dir = tempfile.mkdtemp()
+    os.environ["CROSSHAIR_PROFILE_DIR"] = profile_dir
+    options = parse_args(["--isolate-overlay", "--profile", "sample", "--stall-threshold", "300"])
+    ui = create_controller(options, MemoryStorage())
+    overlay = ui.create_overlay()
+    _, arguments = child_command(overlay.address, overlay.public_address, overlay.frame_export,
+                                 overlay.profile, overlay.stall_threshold_ms)
+    expected = ["--overlay-public", server_name(), "--profile", "sample", "--stall-threshold", "300"]
+    if all(arguments[arguments.index(item) + 1] == value for item, value in zip(expected[::2], expected[1::2])):
+        print("[OK] 子进程参数带上公共地址、--profile 和 --stall-threshold")
+    else:
+        print(f"[ERROR] 子进程参数错误: {arguments}")
+        all_correct = False
+
+    painted = []
+    overlay.frame_painted.connect(lambda: painted.append(True))
+    overlay.showFullScreen()
+    overlay.updateConfig(dict(ui.config, size=30))
+    if wait_until(lambda: len(painted) >= 2):
+        pid = overlay.pid
+        overlay.close()
+        wait_until(lambda: not is_server_running(overlay.address), 5.0)
+        profiled = wait_until(lambda: glob.glob(os.path.join(profile_dir, f"profile-*-{pid}-*")), 5.0)
+        if profiled:
+            print("[OK] 子进程写出了性能分析文件")
+        else:
+            print(f"[ERROR] 子进程没有写出性能分析文件: {os.listdir(profile_dir)}")
+            all_correct = False
+    else:
+        print("[ERROR] 覆盖层子进程没有画出准星")
+        overlay.close()
+        all_correct = False
+    del os.environ["CROSSHAIR_PROFILE_DIR"]
+    ui.keep_overlay_on_close = True
+    ui.close()
+    return all_correct
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    success1 = test_protocol()
+    success2 = test_isolated_overlay()
+    success3 = test_clean_close() and test_ui_child_options()
+
+    if success1 and success2 and success3:
+        print("\n[SUCCESS] 覆盖层进程隔离测试通过！")
+    else:
+        print("\n[FAILED] 覆盖层进程隔离测试失败！")
+
+    sys.exit(0 if (success1 and success2 and success3) else 1)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试资源占用自检
+"""
+
+import sys
+import os
+import json
+import subprocess
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication
+
+
+def test_budgets():
+    """测试预算解析和检查"""
+    from perf_selftest_pyside6 import load_budgets, check_budgets
+
+    all_correct = True
+    budgets = load_budgets(overrides=["idle.cpu_percent=2", "drag.min_paints_per_s=30"])
+    if budgets["idle.cpu_percent"] == 2.0 and budgets["drag.min_paints_per_s"] == 30.0 and "*.rss_mb" in budgets:
+        print("[OK] 命令行预算覆盖默认预算")
+    else:
+        print(f"[ERROR] 预算覆盖错误: {budgets}")
+        all_correct = False
+
+    try:
+        load_budgets(overrides=["cpu_percent"])
+        print("[ERROR] 格式错误的预算没有报错")
+        all_correct = False
+    except ValueError:
+        print("[OK] 格式错误的预算报错")
+
+    metrics = {"cpu_percent": 3.0, "paints_per_s": 25.0, "rss_mb": 50.0, "wakeups_per_s": None}
+    checks = check_budgets("drag", metrics, {
+        "drag.cpu_percent": 5, "drag.min_paints_per_s": 30, "*.rss_mb": 100,
+        "drag.wakeups_per_s": 10, "idle.cpu_percent": 0.5,
+    })
+    expected = {"cpu_percent": True, "min_paints_per_s": False, "rss_mb": True, "wakeups_per_s": None}
+    actual = {name: check["pass"] for name, check in checks.items()}
+    if actual == expected:
+        print(f"[OK] 上限、下限、通配和缺失指标: {actual}")
+    else:
+        print(f"[ERROR] 预算检查错误: {actual}")
+        all_correct = False
+    return all_correct
+
+
+def test_run_selftest():
+    """测试在当前平台上运行自检场景"""
+    from perf_selftest_pyside6 import run_selftest, MODES
+
+    report = run_selftest(["cross"], duration_s=0.2)
+    json.dumps(report)
+
+    all_correct = True
+    modes = [result["mode"] for result in report["scenarios"]]
+    if modes == MODES:
+        print(f"[OK] 运行了所有场景: {modes}")
+    else:
+        print(f"[ERROR] 场景错误: {modes}")
+        all_correct = False
+
+    results = {result["mode"]: result for result in report["scenarios"]}
+    if results["idle"]["paints"] == 0 and results["idle"]["timer_ticks"] == 0:
+        print("[OK] 空闲时不重绘")
+    else:
+        print(f"[ERROR] 空闲时仍在重绘: {results['idle']}")
+        all_correct = False
+
+    if results["drag"]["paints"] > 0 and results["config"]["paints"] > 0:
+        print(f"[OK] 拖动和修改配置时重绘: {results['drag']['paints_per_s']}/s, "
+              f"{results['config']['paints_per_s']}/s")
+    else:
+        print(f"[ERROR] 拖动或修改配置时没有重绘: {results['drag']}, {results['config']}")
+        all_correct = False
+    return all_correct
+
+
+def test_command_line():
+    """测试 --perf-selftest 命令行：超出预算时返回 1"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crosshair_pyside6.py")
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    command = [sys.executable, script, "--perf-selftest", "--selftest-shapes", "dot",
+               "--selftest-duration", "0.1", "--budget", "idle.cpu_percent=-1"]
+    result = subprocess.run(command, capture_output=True, text=True, encoding="utf-8", env=env, timeout=60)
+
+    try:
+        report = json.loads(result.stdout)
+    except ValueError:
+        print(f"[ERROR] 输出不是 JSON: {result.stdout[:200]} {result.stderr[-200:]}")
+        return False
+
+    if result.returncode == 1 and not report["passed"] and "dot/idle: cpu_percent" in result.stderr:
+        print("[OK] 超出预算时返回 1 并列出未通过项")
+        return True
+    print(f"[ERROR] 返回值 {result.returncode}, stderr: {result.stderr[-200:]}")
+    return False
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    success1 = test_budgets()
+    success2 = test_run_selftest()
+    success3 = test_command_line()
+
+    if success1 and success2 and success3:
+        print("\n[SUCCESS] 资源占用自检测试通过！")
+    else:
+        print("\n[FAILED] 资源占用自检测试失败！")
+
+    sys.exit(0 if (success1 and success2 and success3) else 1)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试预设列表模型：按需取行、增量更新和后台绘制的缩略图
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication
+
+from preset_browser_pyside6 import PresetComboBox, PresetListModel, FETCH_BATCH
+from preset_storage import MemoryStorage
+
+
+def make_storage(count):
+    storage = MemoryStorage()
+    for i in range(count):
+        storage.save(f"preset-{i:05d}", {"size": 10 + i % 30, "color": "#00FF00", "shape": "cross"})
+    return storage
+
+
+def wait_thumbnails(model, timeout=10.0):
+    app = QApplication.instance()
+    deadline = time.monotonic() + timeout
+    while model.is_pending() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    app.processEvents()
+
+
+def test_lazy_fetch():
+    """测试大量预设时按批次取行"""
+    storage = make_storage(5000)
+    model = PresetListModel(storage)
+    model.set_names(storage.list_presets())
+    all_correct = True
+
+    if model.rowCount() == FETCH_BATCH and model.canFetchMore() and len(model.names) == 5000:
+        print(f"[OK] 5000 个预设只先取 {model.rowCount()} 行")
+    else:
+        print(f"[ERROR] 初始行数错误: {model.rowCount()}")
+        all_correct = False
+
+    model.fetchMore()
+    if model.rowCount() == FETCH_BATCH * 2:
+        print("[OK] fetchMore 再取一批")
+    else:
+        print(f"[ERROR] fetchMore 后行数错误: {model.rowCount()}")
+        all_correct = False
+
+    row = model.row_of("preset-04000")
+    if row == 4000 and model.rowCount() == 4001 and model.row_of("missing") == -1:
+        print("[OK] 按名称查找时取到目标行")
+    else:
+        print(f"[ERROR] 按名称查找错误: row={row}, rows={model.rowCount()}")
+        all_correct = False
+    return all_correct
+
+
+def test_incremental_update():
+    """测试刷新列表时只插入、删除变化的行"""
+    storage = make_storage(50)
+    model = PresetListModel(storage)
+    model.set_names(storage.list_presets())
+    events = []
+    model.rowsInserted.connect(lambda parent, first, last: events.append(("insert", first, last)))
+    model.rowsRemoved.connect(lambda parent, first, last: events.append(("remove", first, last)))
+    model.modelReset.connect(lambda: events.append(("reset",)))
+    all_correct = True
+
+    storage.save("preset-00010a", {"size": 5})
+    storage.delete("preset-00003")
+    model.set_names(storage.list_presets())
+    if events == [("remove", 3, 3), ("insert", 10, 10)] and model.names == storage.list_presets():
+        print("[OK] 一次删除、一次添加只产生两条增量通知")
+    else:
+        print(f"[ERROR] 增量通知错误: {events}")
+        all_correct = False
+
+    events.clear()
+    model.set_names(storage.list_presets())
+    if not events:
+        print("[OK] 列表不变时没有通知")
+    else:
+        print(f"[ERROR] 列表不变时仍有通知: {events}")
+        all_correct = False
+
+    # 还没有取到的行变化时不通知视图
+    big = make_storage(1000)
+    model = PresetListModel(big)
+    model.set_names(big.list_presets())
+    events.clear()
+    model.rowsInserted.connect(lambda parent, first, last: events.append(("insert", first, last)))
+    model.insert_name("preset-00900a")
+    if not events and model.row_of("preset-00900a", fetch=False) == -1 and "preset-00900a" in model.names:
+        print("[OK] 未取到的范围内插入时不通知视图")
+    else:
+        print(f"[ERROR] 未取到的范围内插入错误: {events}")
+        all_correct = False
+    return all_correct
+
+
+def test_thumbnails():
+    """测试缩略图在后台绘制，完成后只更新对应的行"""
+    storage = make_storage(20)
+    model = PresetListModel(storage)
+    model.set_names(storage.list_presets())
+    changed = []
+    model.dataChanged.connect(lambda first, last, roles: changed.append((first.row(), last.row())))
+    all_correct = True
+
+    index = model.index(5)
+    if model.data(index, Qt.DecorationRole) is None and model.is_pending():
+        print("[OK] 第一次读取时在后台绘制缩略图")
+    else:
+        print("[ERROR] 缩略图没有在后台绘制")
+        all_correct = False
+
+    wait_thumbnails(model)
+    icon = model.data(index, Qt.DecorationRole)
+    if icon is not None and not icon.isNull() and changed == [(5, 5)]:
+        print("[OK] 缩略图绘制完成后只更新该行")
+    else:
+        print(f"[ERROR] 缩略图更新错误: icon={icon}, changed={changed}")
+        all_correct = False
+
+    model.invalidate_thumbnail("preset-00005")
+    if model.data(index, Qt.DecorationRole) is None:
+        wait_thumbnails(model)
+    if model.data(index, Qt.DecorationRole) is not None and model.stats["thumbnails"] == 2:
+        print("[OK] 预设修改后重新绘制缩略图")
+    else:
+        print(f"[ERROR] 缩略图没有重新绘制: {model.stats}")
+        all_correct = False
+    return all_correct
+
+
+def test_combo_box():
+    """测试下拉框按文字选择尚未取到的预设"""
+    storage = make_storage(3000)
+    combo = PresetComboBox(storage)
+    combo.preset_model.set_names(storage.list_presets())
+    all_correct = True
+
+    combo.setCurrentText("preset-02500")
+    if combo.currentText() == "preset-02500" and combo.findText("preset-02500") == 2500:
+        print("[OK] 选择尚未取到的预设")
+    else:
+        print(f"[ERROR] 选择预设错误: {combo.currentText()}")
+        all_correct = False
+
+    combo.addItem("aaa")
+    if combo.findText("aaa") == 0 and combo.currentText() == "preset-02500":
+        print("[OK] addItem 按顺序插入且不改变当前选择")
+    else:
+        print(f"[ERROR] addItem 错误: {combo.findText('aaa')}, {combo.currentText()}")
+        all_correct = False
+    wait_thumbnails(combo.preset_model)
+    return all_correct
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    success1 = test_lazy_fetch()
+    success2 = test_incremental_update()
+    success3 = test_thumbnails()
+    success4 = test_combo_box()
+
+    if success1 and success2 and success3 and success4:
+        print("\n[SUCCESS] 预设列表模型测试通过！")
+    else:
+        print("\n[FAILED] 预设列表模型测试失败！")
+
+    sys.exit(0 if (success1 and success2 and success3 and success4) else 1)
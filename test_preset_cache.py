@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试已解析预设的缓存和相邻预设预取
+"""
+
+import sys
+import os
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from preset_storage import MemoryStorage, TempDirStorage
+
+
+class CountingStorage(MemoryStorage):
+    """记录每次读取所在线程的内存存储"""
+
+    def __init__(self, presets=None):
+        super().__init__(presets)
+        self.loads = []
+
+    def load(self, name):
+        self.loads.append((name, threading.get_ident()))
+        return super().load(name)
+
+
+PRESETS = {
+    "apex": {"size": 30, "color": "#00FF00"},
+    "csgo": {"size": 20, "shape": "circle"},
+    "valorant": {"size": 12, "thickness": 1},
+    "quake": {"size": 40},
+}
+
+
+def test_cache_and_invalidation():
+    """测试命中、返回副本、按版本标记失效"""
+    from preset_cache import PresetCache
+    from preset_io import read_preset
+
+    storage = TempDirStorage()
+    all_correct = True
+    try:
+        for name, data in PRESETS.items():
+            storage.save(name, data)
+        cache = PresetCache(storage)
+
+        first = cache.get("csgo")
+        second = cache.get("csgo")
+        if first == second == read_preset(storage, "csgo") and cache.hits == 1 and cache.misses == 1:
+            print("[OK] 第二次读取命中缓存，结果和 read_preset 相同")
+        else:
+            print(f"[ERROR] 缓存读取错误: {cache.stats()}")
+            all_correct = False
+
+        first["position"]["x"] = 5
+        if cache.get("csgo")["position"]["x"] == "center":
+            print("[OK] 修改返回的配置不影响缓存")
+        else:
+            print("[ERROR] 缓存中的配置被修改")
+            all_correct = False
+
+        # 文件在外部被修改
+        storage.save("csgo", {"size": 25, "shape": "circle", "color": "#FFFFFF"})
+        if cache.get("csgo")["size"] == 25 and cache.stale == 1:
+            print("[OK] 文件修改后缓存失效")
+        else:
+            print(f"[ERROR] 文件修改后读到旧配置: {cache.stats()}")
+            all_correct = False
+
+        small = PresetCache(storage, capacity=2)
+        for name in ["apex", "csgo", "valorant", "apex"]:
+            small.get(name)
+        if small.stats()["size"] == 2 and small.misses == 4:
+            print("[OK] 超出容量时淘汰最久未使用的预设")
+        else:
+            print(f"[ERROR] 淘汰错误: {small.stats()}")
+            all_correct = False
+    finally:
+        storage.cleanup()
+    return all_correct
+
+
+def test_prefetch():
+    """测试切换到相邻预设时不在当前线程读取存储"""
+    from preset_cache import PresetCache, neighbors
+
+    if neighbors(["a", "b", "c", "d"], "a") == ["b", "d"] and neighbors(["a"], "a") == []:
+        print("[OK] 相邻预设计算正确（循环）")
+    else:
+        print(f"[ERROR] 相邻预设错误: {neighbors(['a', 'b', 'c', 'd'], 'a')}")
+        return False
+
+    storage = CountingStorage(PRESETS)
+    cache = PresetCache(storage)
+    names = storage.list_presets()
+    all_correct = True
+
+    cache.get("csgo")
+    cache.prefetch_neighbors("csgo", names).result()
+    main_thread = threading.get_ident()
+    storage.loads.clear()
+    cache.get("quake")
+    cache.get("apex")
+    if not storage.loads and cache.prefetch_hits == 2:
+        print("[OK] 相邻预设已在后台预取，切换时不读取存储")
+    else:
+        print(f"[ERROR] 切换相邻预设时读取了存储: {storage.loads}")
+        all_correct = False
+
+    # names 为空时在后台列出预设
+    cache.prefetch_neighbors("apex").result()
+    stats = cache.stats()
+    if all(thread != main_thread for _, thread in storage.loads) and stats["prefetched"] == 3:
+        print(f"[OK] 预取统计: {stats}")
+    else:
+        print(f"[ERROR] 预取统计错误: {stats}, loads={storage.loads}")
+        all_correct = False
+    cache.close()
+    return all_correct
+
+
+def test_config_ui_prefetch():
+    """测试配置界面切换预设时使用缓存"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from config_ui_pyside6 import ConfigUI
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    storage = CountingStorage(dict(PRESETS, default={"size": 20}))
+    ui = ConfigUI(storage)
+    ui.apply_preset("csgo")
+    deadline = time.monotonic() + 5
+    while ui.preset_cache.prefetched < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    main_thread = threading.get_ident()
+    storage.loads.clear()
+    ui.apply_preset("default")  # 下拉框中 csgo 的下一个
+    ui.apply_preset("csgo")
+    stats = ui.get_state()["preset_cache"]
+    on_gui = [name for name, thread in storage.loads if thread == main_thread]
+    ui.close()
+    if ui.config["size"] == 20 and not on_gui and stats["prefetch_hits"] >= 1 and stats["hit_rate"] > 0:
+        print(f"[OK] 配置界面来回切换预设不在 GUI 线程读取文件: {stats}")
+        return True
+    print(f"[ERROR] 配置界面切换预设时在 GUI 线程读取: {on_gui}, {stats}")
+    return False
+
+
+if __name__ == "__main__":
+    success1 = test_cache_and_invalidation()
+    success2 = test_prefetch()
+    success3 = test_config_ui_prefetch()
+
+    if success1 and success2 and success3:
+        print("\n[SUCCESS] 预设缓存测试通过！")
+    else:
+        print("\n[FAILED] 预设缓存测试失败！")
+
+    sys.exit(0 if (success1 and success2 and success3) else 1)
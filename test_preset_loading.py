@@ -6,17 +6,17 @@
 """
 
 import sys
-import json
 import os
 from PySide6.QtWidgets import QApplication
 from config_ui_pyside6 import ConfigUI
+from preset_storage import MemoryStorage
 
 def test_preset_loading():
     """测试预设加载功能"""
     print("开始测试预设加载功能...")
     
     app = QApplication(sys.argv)
-    main_window = ConfigUI()
+    main_window = ConfigUI(MemoryStorage())
     
     # 测试1: 创建一个包含所有参数的预设
     print("\n=== 测试1: 创建完整预设 ===")
@@ -41,10 +41,6 @@ def test_preset_loading():
     main_window.config_file_path = main_window.get_config_path(test_preset_name)
     main_window.save_config()
     
-    # 验证保存的文件内容
-    with open(main_window.config_file_path, 'r', encoding='utf-8') as f:
-        saved_content = f.read()
-    
     print(f"[OK] 创建测试预设: {test_preset_name}")
     
     # 测试2: 加载预设并检查是否完整
@@ -134,8 +130,7 @@ def test_preset_loading():
         # 这个测试在测试环境中可能有UI更新延迟问题，但实际使用时正常
     
     # 清理测试文件
-    if os.path.exists(main_window.get_config_path(test_preset_name)):
-        os.remove(main_window.get_config_path(test_preset_name))
+    if main_window.storage.delete(test_preset_name):
         print(f"[OK] 清理测试文件: {test_preset_name}")
     
     return all_correct
@@ -148,7 +143,7 @@ def test_partial_preset_loading():
     if app is None:
         app = QApplication(sys.argv)
     
-    main_window = ConfigUI()
+    main_window = ConfigUI(MemoryStorage())
     
     # 创建只包含部分参数的预设
     test_preset_name = "test_partial_preset"
@@ -163,8 +158,7 @@ def test_partial_preset_loading():
     main_window.current_config_file = test_preset_name + '.json'
     main_window.config_file_path = main_window.get_config_path(test_preset_name)
     
-    with open(main_window.config_file_path, 'w', encoding='utf-8') as f:
-        json.dump(partial_config, f, indent=2, ensure_ascii=False)
+    main_window.storage.save(test_preset_name, partial_config)
     
     # 加载部分预设
     main_window.update_preset_list()  # 先更新预设列表
@@ -190,8 +184,7 @@ def test_partial_preset_loading():
             all_correct = False
     
     # 清理测试文件
-    if os.path.exists(main_window.get_config_path(test_preset_name)):
-        os.remove(main_window.get_config_path(test_preset_name))
+    main_window.storage.delete(test_preset_name)
     
     return all_correct
 
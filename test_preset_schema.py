@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试预设结构校验和迁移
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_validate():
+    """测试字段转换和校验"""
+    from preset_schema import normalize_preset, SCHEMA
+    from preset_io import default_config
+
+    data = {
+        "size": "25",
+        "hollow_gap": 4.6,
+        "thickness": 99,
+        "opacity": True,
+        "shape": "star",
+        "color": "#00ff00",
+        "unknown_key": 1,
+    }
+    config, issues = normalize_preset(data, default_config())
+
+    checks = [
+        ("字符串大小转为整数", config["size"] == 25),
+        ("浮点间距转为整数", config["hollow_gap"] == 5 and isinstance(config["hollow_gap"], int)),
+        ("超出范围截断", config["thickness"] == 20),
+        ("无效值使用默认值", config["opacity"] == 0.8 and config["shape"] == "cross"),
+        ("颜色保留", config["color"] == "#00ff00"),
+        ("丢弃未知字段", "unknown_key" not in config and "version" not in config),
+        ("记录问题", len(issues) == 4),
+    ]
+    all_correct = True
+    for name, passed in checks:
+        if passed:
+            print(f"[OK] {name}")
+        else:
+            print(f"[ERROR] {name}: {config}, {issues}")
+            all_correct = False
+
+    try:
+        SCHEMA.coerce_field("size", "abc")
+        print("[ERROR] 无效的单个字段应抛出 ValueError")
+        all_correct = False
+    except ValueError:
+        print("[OK] 无效的单个字段抛出 ValueError")
+
+    # 颜色名称必须是 QColor 认识的名称，任意单词不算颜色
+    named = [SCHEMA.coerce_field("color", name) for name in ("red", "DarkOrange", "transparent")]
+    try:
+        SCHEMA.coerce_field("color", "foo")
+        print("[ERROR] 未知的颜色名称应抛出 ValueError")
+        all_correct = False
+    except ValueError:
+        if named == ["red", "DarkOrange", "transparent"]:
+            print("[OK] 只接受已知的颜色名称")
+        else:
+            print(f"[ERROR] 已知的颜色名称被改写: {named}")
+            all_correct = False
+    return all_correct
+
+
+def test_migrate():
+    """测试旧版本预设迁移"""
+    from preset_schema import normalize_preset, dump_preset, migrate, SCHEMA_VERSION
+
+    cases = [
+        ("center 字符串", {"position": "center"}, {"x": "center", "y": "center"}),
+        ("坐标列表", {"position": [100, "200"]}, {"x": 100, "y": 200}),
+        ("数字字符串坐标", {"position": {"x": "640", "y": "center"}}, {"x": 640, "y": "center"}),
+    ]
+    all_correct = True
+    for name, data, expected in cases:
+        config, issues = normalize_preset(data)
+        if config.get("position") == expected and not issues:
+            print(f"[OK] {name}: {config['position']}")
+        else:
+            print(f"[ERROR] {name}: 期望 {expected}, 实际 {config.get('position')}, {issues}")
+            all_correct = False
+
+    data = {"size": 20}
+    if migrate(data)["version"] == SCHEMA_VERSION and "version" not in data:
+        print("[OK] 迁移不修改原数据")
+    else:
+        print("[ERROR] 迁移修改了原数据")
+        all_correct = False
+
+    if dump_preset({"size": 20})["version"] == SCHEMA_VERSION:
+        print("[OK] 保存时写入版本号")
+    else:
+        print("[ERROR] 保存时没有写入版本号")
+        all_correct = False
+    return all_correct
+
+
+def test_preset_tool():
+    """测试批量检查和迁移工具"""
+    from preset_tool import collect_presets, run
+
+    folder = tempfile.mkdtemp()
+    for i in range(100):
+        data = {"size": 20, "position": "center"}
+        if i % 10 == 0:
+            data["size"] = "big"
+        with open(os.path.join(folder, f"p{i}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    files = collect_presets([folder])
+    results = run(files, write=False, jobs=2)
+    with_issues = sum(1 for _, issues, _ in results if issues)
+    changed = sum(1 for _, _, was_changed in results if was_changed)
+
+    all_correct = True
+    if len(results) == 100 and with_issues == 10 and changed == 100:
+        print(f"[OK] 并行检查: {with_issues} 个有问题, {changed} 个需要迁移")
+    else:
+        print(f"[ERROR] 并行检查结果错误: {len(results)}, {with_issues}, {changed}")
+        all_correct = False
+
+    run(files, write=True, jobs=2)
+    results = run(files, write=False, jobs=1)
+    if not any(was_changed for _, _, was_changed in results):
+        print("[OK] 迁移后的文件不再需要迁移")
+    else:
+        print("[ERROR] 迁移后的文件仍需要迁移")
+        all_correct = False
+    return all_correct
+
+
+def test_preset_tool_tree():
+    """测试递归扫描、补全默认值、无法使用的文件和 JSON 汇总"""
+    import io
+    import contextlib
+    from preset_tool import main
+    from preset_io import read_preset
+    from preset_storage import FileSystemStorage
+
+    folder = tempfile.mkdtemp()
+    presets = {
+        "v1/old.json": {"size": "25", "position": "center", "shape": "hollow_cross"},
+        "v2/team/pos.json": {"version": 1, "size": 20, "position": {"x": 100, "y": "200"}},
+        "broken.json": '{"size": 20',
+        "list.json": [1, 2],
+    }
+    for name, data in presets.items():
+        path = os.path.join(folder, *name.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(data if isinstance(data, str) else json.dumps(data))
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+        code = main(["migrate", folder, "--recursive", "--write", "--json", "--jobs", "2"])
+    summary = json.loads(output.getvalue())
+
+    all_correct = True
+    if summary["files"] == 4 and summary["invalid"] == 2 and summary["written"] == 2 and code == 1:
+        print(f"[OK] 递归扫描并迁移: {summary['files']} 个文件, {summary['invalid']} 个无法使用")
+    else:
+        print(f"[ERROR] 汇总错误: {summary}, code={code}")
+        all_correct = False
+
+    if sorted(os.path.basename(path) for path in summary["invalid_files"]) == ["broken.json", "list.json"]:
+        print("[OK] 列出无法使用的文件")
+    else:
+        print(f"[ERROR] 无法使用的文件列表错误: {summary['invalid_files']}")
+        all_correct = False
+
+    # 写回的内容和加载预设时补全的结果一致，且没有留下临时文件
+    storage = FileSystemStorage(os.path.join(folder, "v1"))
+    with open(os.path.join(folder, "v1", "old.json"), encoding="utf-8") as f:
+        written = json.load(f)
+    expected = read_preset(storage, "old")
+    leftovers = [name for _, _, names in os.walk(folder) for name in names if name.endswith(".tmp")]
+    if {key: written[key] for key in expected} == expected and "hollow_gap" in written and not leftovers:
+        print("[OK] 写回的预设补全了缺失的参数，与加载时一致")
+    else:
+        print(f"[ERROR] 写回的预设错误: {written}, 临时文件 {leftovers}")
+        all_correct = False
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+        main(["migrate", folder, "-r", "--json"])
+    if json.loads(output.getvalue())["changed"] == 0:
+        print("[OK] 迁移后再次检查没有需要修改的文件")
+    else:
+        print("[ERROR] 迁移后仍有需要修改的文件")
+        all_correct = False
+    return all_correct
+
+
+def test_preset_tool_pool():
+    """测试多进程写回：保持文件权限，不降级版本比程序新的预设"""
+    import io
+    import stat
+    import contextlib
+    import preset_tool
+    from preset_schema import SCHEMA_VERSION
+
+    folder = tempfile.mkdtemp()
+    newer = {"version": SCHEMA_VERSION + 1, "size": 20, "future_field": {"a": 1}}
+    for i in range(80):
+        path = os.path.join(folder, f"p{i:02d}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(newer if i % 8 == 0 else {"size": 20, "position": "center"}, f)
+        os.chmod(path, 0o644)
+    files = preset_tool.collect_presets([folder])
+    all_correct = True
+
+    # 记录是否创建了进程池
+    pools = []
+    executor = preset_tool.ProcessPoolExecutor
+
+    class RecordingExecutor(executor):
+        def __init__(self, *args, **kwargs):
+            pools.append(kwargs.get("max_workers"))
+            super().__init__(*args, **kwargs)
+
+    preset_tool.ProcessPoolExecutor = RecordingExecutor
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+            code = preset_tool.main(["migrate", folder, "--write", "--json", "--jobs", "2"])
+    finally:
+        preset_tool.ProcessPoolExecutor = executor
+    summary = json.loads(output.getvalue())
+    if pools == [2]:
+        print(f"[OK] {len(files)} 个文件在 2 个进程中处理")
+    else:
+        print(f"[ERROR] 没有使用进程池: {pools}")
+        all_correct = False
+    if summary["newer"] == 10 and summary["written"] == 70 and code == 1:
+        print(f"[OK] 多进程迁移 {summary['written']} 个文件，报告 {summary['newer']} 个新版本预设")
+    else:
+        print(f"[ERROR] 多进程迁移汇总错误: {summary}, code={code}")
+        all_correct = False
+
+    with open(os.path.join(folder, "p00.json"), encoding="utf-8") as f:
+        kept = json.load(f)
+    if kept == newer:
+        print("[OK] 新版本预设没有被写回")
+    else:
+        print(f"[ERROR] 新版本预设被降级: {kept}")
+        all_correct = False
+
+    modes = {stat.S_IMODE(os.stat(path).st_mode) for path in files}
+    if modes == {0o644}:
+        print("[OK] 写回后文件权限保持 0644")
+    else:
+        print(f"[ERROR] 写回后文件权限改变: {sorted(oct(mode) for mode in modes)}")
+        all_correct = False
+    return all_correct
+
+
+if __name__ == "__main__":
+    success1 = test_validate()
+    success2 = test_migrate()
+    success3 = test_preset_tool() and test_preset_tool_tree() and test_preset_tool_pool()
+
+    if success1 and success2 and success3:
+        print("\n[SUCCESS] 预设结构测试通过！")
+    else:
+        print("\n[FAILED] 预设结构测试失败！")
+
+    sys.exit(0 if (success1 and success2 and success3) else 1)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试预设存储后端
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def check_storage(name, storage):
+    """对一个存储后端执行相同的读写检查"""
+    all_correct = True
+    checks = []
+
+    checks.append(("初始为空", storage.list_presets() == []))
+    checks.append(("不存在时返回 None", storage.load("missing") is None))
+
+    storage.save("csgo", {"size": 25, "position": {"x": "center", "y": "center"}})
+    storage.save("apex.json", {"size": 30})
+    data = storage.load("csgo")
+    checks.append(("读取", data == {"size": 25, "position": {"x": "center", "y": "center"}}))
+    checks.append(("列表", storage.list_presets() == ["apex", "csgo"]))
+    checks.append(("存在", storage.exists("csgo") and storage.exists("csgo.json")))
+    checks.append(("路径", storage.path("csgo").endswith("csgo.json")))
+
+    # 内容改变时版本标记改变
+    stamp = storage.stamp("csgo")
+    storage.save("apex", {"size": 30, "color": "#00FF00"})
+    checks.append(("版本标记", stamp is not None and storage.stamp("missing") is None
+                   and storage.stamp("csgo") == stamp and storage.stamp("apex.json") != stamp))
+    apex_stamp = storage.stamp("apex")
+    storage.save("apex", {"size": 30})
+    checks.append(("保存后版本标记改变", storage.stamp("apex") != apex_stamp))
+
+    # 修改读取到的数据不影响存储
+    data["size"] = 99
+    checks.append(("读取返回副本", storage.load("csgo")["size"] == 25))
+
+    checks.append(("删除", storage.delete("csgo") and not storage.exists("csgo")))
+    checks.append(("删除不存在的预设", storage.delete("csgo") is False))
+
+    for check_name, passed in checks:
+        if passed:
+            print(f"[OK] {name} {check_name}")
+        else:
+            print(f"[ERROR] {name} {check_name}")
+            all_correct = False
+    return all_correct
+
+
+def test_backends():
+    """测试三种存储后端的行为一致"""
+    from preset_storage import FileSystemStorage, TempDirStorage, MemoryStorage
+
+    temp = TempDirStorage()
+    results = [
+        check_storage("内存存储", MemoryStorage()),
+        check_storage("临时文件夹", temp),
+        check_storage("文件夹", FileSystemStorage(os.path.join(temp.directory, "nested"))),
+    ]
+    temp.cleanup()
+    if os.path.exists(temp.directory):
+        print("[ERROR] 临时文件夹没有被删除")
+        results.append(False)
+    return all(results)
+
+
+def test_incomplete_backend():
+    """测试没有实现全部接口的后端在创建时就报错"""
+    from preset_storage import PresetStorage
+
+    class ReadOnlyStorage(PresetStorage):
+        def path(self, name):
+            return name
+
+        def list_presets(self):
+            return []
+
+        def load(self, name):
+            return None
+
+    try:
+        ReadOnlyStorage()
+    except TypeError as e:
+        print(f"[OK] 不完整的存储后端无法创建: {e}")
+        return True
+    print("[ERROR] 不完整的存储后端可以创建")
+    return False
+
+
+def test_read_preset():
+    """测试通过存储后端读取并校验预设"""
+    from preset_io import read_preset, write_preset
+    from preset_storage import MemoryStorage
+
+    storage = MemoryStorage({"old": {"size": "40", "position": "center"}})
+    config = read_preset(storage, "old")
+    write_preset(storage, "new", config)
+
+    if config["size"] == 40 and config["position"] == {"x": "center", "y": "center"} \
+            and storage.load("new")["version"] == 2:
+        print("[OK] 读取时迁移校验，写入时带版本号")
+        return True
+    print(f"[ERROR] 读取或写入错误: {config}, {storage.load('new')}")
+    return False
+
+
+if __name__ == "__main__":
+    success1 = test_backends() and test_incomplete_backend()
+    success2 = test_read_preset()
+
+    if success1 and success2:
+        print("\n[SUCCESS] 预设存储测试通过！")
+    else:
+        print("\n[FAILED] 预设存储测试失败！")
+
+    sys.exit(0 if (success1 and success2) else 1)
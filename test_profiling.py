@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试可选的性能分析钩子
+"""
+
+import sys
+import os
+import json
+import pstats
+import tempfile
+import subprocess
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+# 在子进程中创建覆盖层并绘制几帧，输出绘制函数是否被包装
+CHILD_CODE = """
+import sys
+from PySide6.QtWidgets import QApplication
+from overlay_window_pyside6 import OverlayWindow
+app = QApplication(sys.argv)
+overlay = OverlayWindow({"size": 20, "color": "#FF0000", "shape": "cross", "thickness": 2,
+                         "opacity": 0.8, "position": {"x": "center", "y": "center"}})
+overlay.showFullScreen()
+app.processEvents()
+for size in range(20, 80):
+    overlay.updateConfig(dict(overlay.config, size=size))
+    overlay.grab()
+print(hasattr(OverlayWindow.paintEvent, "__wrapped__"))
+overlay.close()
+"""
+
+
+def run_child(mode, directory):
+    """在子进程中运行，返回是否包装了绘制函数"""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", CROSSHAIR_PROFILE_DIR=directory)
+    env.pop("CROSSHAIR_PROFILE", None)
+    if mode:
+        env["CROSSHAIR_PROFILE"] = mode
+    result = subprocess.run([sys.executable, "-c", CHILD_CODE], capture_output=True, text=True,
+                            env=env, cwd=os.path.dirname(os.path.abspath(__file__)))
+    return result.stdout.strip().splitlines()[-1:] == ["True"]
+
+
+def test_disabled():
+    """测试未启用时不包装任何函数"""
+    directory = tempfile.mkdtemp()
+    wrapped = run_child(None, directory)
+    if not wrapped and not os.listdir(directory):
+        print("[OK] 未启用时不包装函数、不写文件")
+        return True
+    print("[ERROR] 未启用时不应包装函数")
+    return False
+
+
+def test_cprofile():
+    """测试 cProfile 输出可以用 pstats 读取"""
+    directory = tempfile.mkdtemp()
+    wrapped = run_child("cprofile", directory)
+    files = [f for f in os.listdir(directory) if f.endswith(".prof")]
+    if not wrapped or not files:
+        print(f"[ERROR] 没有生成 cProfile 文件: {files}")
+        return False
+    stats = pstats.Stats(os.path.join(directory, files[0]))
+    names = {func[2] for func in stats.stats}
+    if "paintEvent" in names and "updateConfig" in names:
+        print(f"[OK] cProfile 文件包含绘制函数: {files[0]}")
+        return True
+    print(f"[ERROR] cProfile 文件缺少绘制函数: {sorted(names)[:20]}")
+    return False
+
+
+def test_sample():
+    """测试采样输出为 speedscope 格式"""
+    directory = tempfile.mkdtemp()
+    wrapped = run_child("sample", directory)
+    files = [f for f in os.listdir(directory) if f.endswith(".speedscope.json")]
+    if not wrapped or not files:
+        print(f"[ERROR] 没有生成采样文件: {files}")
+        return False
+    with open(os.path.join(directory, files[0]), encoding="utf-8") as f:
+        data = json.load(f)
+    profile = data["profiles"][0]
+    if profile["type"] == "sampled" and len(profile["samples"]) == len(profile["weights"]):
+        print(f"[OK] 采样文件格式正确: {len(profile['samples'])} 个调用栈")
+        return True
+    print("[ERROR] 采样文件格式错误")
+    return False
+
+
+def test_rotation():
+    """测试只保留最近的文件"""
+    from profiling import RotatingFiles
+
+    files = RotatingFiles(tempfile.mkdtemp(), ".prof", keep=3)
+    for _ in range(5):
+        with open(files.next_path(), "w") as f:
+            f.write("x")
+    if len(files.files()) == 3:
+        print("[OK] 只保留最近 3 个文件")
+        return True
+    print(f"[ERROR] 文件数错误: {len(files.files())}")
+    return False
+
+
+def test_collector_interface():
+    """测试没有实现 dump 的采集器在创建时就报错"""
+    from profiling import _Collector
+
+    class Incomplete(_Collector):
+        pass
+
+    try:
+        Incomplete(tempfile.mkdtemp(), 60.0, 3)
+    except TypeError:
+        print("[OK] 缺少 dump 的采集器无法创建")
+        return True
+    print("[ERROR] 缺少 dump 的采集器仍然可以创建")
+    return False
+
+
+if __name__ == "__main__":
+    results = [test_disabled(), test_cprofile(), test_sample(), test_rotation(), test_collector_interface()]
+
+    if all(results):
+        print("\n[SUCCESS] 性能分析测试通过！")
+    else:
+        print("\n[FAILED] 性能分析测试失败！")
+
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试覆盖层的配置变化检测
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QPoint
+
+
+def test_update_outcomes():
+    """测试 updateConfig 按变化程度分类处理"""
+    from overlay_window_pyside6 import OverlayWindow
+
+    config = {
+        "size": 20,
+        "color": "#FF0000",
+        "shape": "cross",
+        "thickness": 2,
+        "opacity": 0.8,
+        "position": {"x": "center", "y": "center"},
+    }
+    overlay = OverlayWindow(config)
+    overlay.showFullScreen()
+    stats = overlay.update_stats
+
+    all_correct = True
+
+    def expect(name, key, count):
+        nonlocal all_correct
+        if stats[key] == count:
+            print(f"[OK] {name}: {key} = {count}")
+        else:
+            print(f"[ERROR] {name}: 期望 {key} = {count}, 实际 {stats}")
+            all_correct = False
+
+    # 内容相同的新字典
+    overlay.updateConfig(dict(config))
+    expect("相同配置", "noop", 1)
+
+    # 原地修改位置（ConfigUI 的用法）
+    config = overlay.config
+    config["position"] = {"x": 300, "y": 400}
+    overlay.updateConfig(config)
+    expect("只移动位置", "position", 1)
+    expect("只移动位置不重建", "rebuild", 0)
+    if overlay.get_crosshair_position() != (300, 400):
+        print(f"[ERROR] 位置错误: {overlay.get_crosshair_position()}")
+        all_correct = False
+
+    config["power_profile"] = "battery"
+    overlay.updateConfig(config)
+    expect("功耗档位", "settings", 1)
+    expect("功耗档位不重建", "rebuild", 0)
+    if overlay.governor.profile != "battery":
+        print("[ERROR] 功耗档位没有应用到调节器")
+        all_correct = False
+
+    config["size"] = 35
+    overlay.updateConfig(config)
+    expect("修改大小", "rebuild", 1)
+
+    # 拖动后的位置即使配置相同也要重置
+    overlay.crosshair_pos = QPoint(100, 200)
+    overlay.updateConfig(config)
+    if overlay.crosshair_pos is None:
+        print("[OK] updateConfig 仍然重置 crosshair_pos")
+    else:
+        print("[ERROR] updateConfig 没有重置 crosshair_pos")
+        all_correct = False
+
+    overlay.close()
+    return all_correct
+
+
+def test_load_same_preset():
+    """测试重复加载同一个预设不重建、不隐藏窗口"""
+    from config_ui_pyside6 import ConfigUI
+    from preset_storage import MemoryStorage
+
+    storage = MemoryStorage({"test": {"size": 30, "shape": "dot"}})
+    main_window = ConfigUI(storage)
+    main_window.show_crosshair()
+    overlay = main_window.overlay_window
+
+    main_window.preset_combo.setCurrentText("test")
+    main_window.load_preset()
+    rebuilds = overlay.update_stats["rebuild"]
+
+    hidden = []
+    overlay.hideEvent = lambda event: hidden.append(True)
+    main_window.load_preset()
+    main_window.load_preset()
+
+    if overlay.update_stats["rebuild"] == rebuilds and not hidden:
+        print(f"[OK] 重复加载同一预设: {overlay.update_stats}")
+        result = True
+    else:
+        print(f"[ERROR] 重复加载同一预设时重建或隐藏了窗口: {overlay.update_stats}, {hidden}")
+        result = False
+    overlay.close()
+    return result
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    success1 = test_update_outcomes()
+    success2 = test_load_same_preset()
+
+    if success1 and success2:
+        print("\n[SUCCESS] 配置变化检测测试通过！")
+    else:
+        print("\n[FAILED] 配置变化检测测试失败！")
+
+    sys.exit(0 if (success1 and success2) else 1)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试准星放大镜
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication, QLabel
+from PySide6.QtGui import QImage, QPixmap, QColor, QPainter
+
+
+CONFIG = {
+    "size": 20,
+    "color": "#FF0000",
+    "shape": "cross",
+    "thickness": 2,
+    "opacity": 1.0,
+    "position": {"x": "center", "y": "center"},
+    "power_profile": "performance",
+}
+
+
+def split_background(label, left, right):
+    """左右两种颜色的背景，分界线在屏幕中心"""
+    size = QApplication.primaryScreen().size()
+    image = QImage(size.width(), size.height(), QImage.Format_RGB32)
+    image.fill(QColor(right))
+    painter = QPainter(image)
+    painter.fillRect(0, 0, size.width() // 2, size.height(), QColor(left))
+    painter.end()
+    label.setPixmap(QPixmap.fromImage(image))
+
+
+def test_scope():
+    """测试放大镜的开关、最近邻放大、增量截取和统计"""
+    from overlay_window_pyside6 import OverlayWindow
+
+    app = QApplication.instance()
+    overlay = OverlayWindow(dict(CONFIG))
+    overlay.showFullScreen()
+    # offscreen 平台把透明的覆盖层合成为黑色，背景窗口放在覆盖层上面代替游戏画面
+    background = QLabel()
+    background.setGeometry(QApplication.primaryScreen().geometry())
+    split_background(background, "#204080", "#C0A000")
+    background.show()
+    app.processEvents()
+    all_correct = True
+
+    if overlay.scope is None and overlay.governor.evaluate() == ("static", 0.0) \
+            and overlay.scope_stats() == {"enabled": False}:
+        print("[OK] 放大镜关闭时不创建、不需要帧率")
+    else:
+        print(f"[ERROR] 放大镜关闭时仍有开销: {overlay.scope}, {overlay.governor.evaluate()}")
+        all_correct = False
+
+    config = dict(CONFIG, scope="on", scope_zoom=4, scope_size=120, scope_fps=50)
+    overlay.updateConfig(config)
+    mode, fps = overlay.governor.evaluate()
+    if overlay.scope is not None and overlay.scope.source_side == 30 and mode == "active" and fps == 50:
+        print(f"[OK] 放大镜开启后按 {fps} FPS 截取 {overlay.scope.source_side} 像素的区域")
+    else:
+        print(f"[ERROR] 放大镜开启错误: {mode}, {fps}")
+        all_correct = False
+
+    overlay.on_frame_tick()
+    image = overlay.scope.image
+    row = [image.pixelColor(x, image.height() // 2).name() for x in range(image.width())]
+    if set(row) == {"#204080", "#c0a000"} and row[0] == "#204080" and row[-1] == "#c0a000":
+        print("[OK] 最近邻放大，分界处没有混合颜色")
+    else:
+        print(f"[ERROR] 放大后的颜色错误: {sorted(set(row))[:6]}")
+        all_correct = False
+
+    overlay.on_frame_tick()
+    stats = overlay.scope_stats()
+    if stats["frames"] == 1 and stats["unchanged"] == 1:
+        print("[OK] 画面没有变化时不重新缩放")
+    else:
+        print(f"[ERROR] 增量截取错误: {stats}")
+        all_correct = False
+
+    split_background(background, "#00FF00", "#00FF00")
+    app.processEvents()
+    overlay.on_frame_tick()
+    overlay.repaint()
+    stats = overlay.scope_stats()
+    if image.pixelColor(0, 0).name() == "#00ff00" and stats["frames"] == 2 and stats["last_latency_ms"] > 0:
+        print(f"[OK] 每帧统计: 截取 {stats['capture_ms']} ms，缩放 {stats['scale_ms']} ms，"
+              f"CPU {stats['cpu_ms_per_tick']} ms，延迟 {stats['last_latency_ms']} ms")
+    else:
+        print(f"[ERROR] 背景变化后没有更新: {stats}")
+        all_correct = False
+
+    overlay.updateConfig(dict(CONFIG))
+    if overlay.scope is None and overlay.governor.evaluate() == ("static", 0.0):
+        print("[OK] 关闭放大镜后恢复静态模式")
+    else:
+        print(f"[ERROR] 关闭放大镜后仍在重绘: {overlay.governor.evaluate()}")
+        all_correct = False
+
+    overlay.close()
+    background.close()
+    return all_correct
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    success = test_scope()
+
+    if success:
+        print("\n[SUCCESS] 放大镜测试通过！")
+    else:
+        print("\n[FAILED] 放大镜测试失败！")
+
+    sys.exit(0 if success else 1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试单实例检测和参数转发
+"""
+
+import sys
+import os
+import time
+import tempfile
+import threading
+import subprocess
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication
+
+
+def test_lazy_qt_import():
+    """测试转发路径不导入 Qt"""
+    code = "import sys, crosshair_pyside6; print('PySide6' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    if output == "False":
+        print("[OK] 启动入口在转发前不导入 PySide6")
+        return True
+    print(f"[ERROR] 启动入口导入了 PySide6: {output}")
+    return False
+
+
+def test_forward_commands():
+    """测试启动参数到命令的转换"""
+    from crosshair_pyside6 import parse_args, forward_commands
+
+    checks = [
+        ("无参数", forward_commands(parse_args([])), [("open_ui",)]),
+        ("守护模式无参数", forward_commands(parse_args(["--no-ui"])), [("show",)]),
+        ("预设和隐藏", forward_commands(parse_args(["--preset", "csgo", "--hide"])),
+         [("load_preset", "csgo"), ("hide",)]),
+    ]
+    all_correct = True
+    for name, actual, expected in checks:
+        if actual == expected:
+            print(f"[OK] {name}: {actual}")
+        else:
+            print(f"[ERROR] {name}: 期望 {expected}, 实际 {actual}")
+            all_correct = False
+    return all_correct
+
+
+def test_forward_to_running_instance():
+    """测试第二次启动把参数转发给已有实例"""
+    from crosshair_pyside6 import parse_args, forward_to_running_instance
+    from control_server_pyside6 import ControlServer
+    from overlay_daemon_pyside6 import OverlayDaemon
+    from preset_storage import MemoryStorage
+
+    if sys.platform == "win32":
+        address = f"CrosshairSingleTest-{os.getpid()}"
+    else:
+        address = os.path.join(tempfile.gettempdir(), f"crosshair-single-{os.getpid()}.sock")
+
+    all_correct = True
+    start = time.perf_counter()
+    if forward_to_running_instance(parse_args([]), address) is None:
+        print(f"[OK] 没有运行中的实例 ({(time.perf_counter() - start) * 1000:.1f} ms)")
+    else:
+        print("[ERROR] 没有运行中的实例时应返回 None")
+        all_correct = False
+
+    daemon = OverlayDaemon("default", MemoryStorage({"csgo": {"size": 27}}))
+    daemon.show_crosshair()
+    server = ControlServer(daemon, address)
+    if not server.start():
+        print("[ERROR] 控制服务启动失败")
+        return False
+
+    # 第二个实例检测到地址已被占用
+    second = ControlServer(daemon, address)
+    if not second.start() and second.already_running:
+        print("[OK] 第二个实例检测到已有实例")
+    else:
+        print("[ERROR] 第二个实例没有检测到已有实例")
+        all_correct = False
+
+    results = {}
+
+    def forward():
+        started = time.perf_counter()
+        results["forwarded"] = forward_to_running_instance(
+            parse_args(["--preset", "csgo", "--hide"]), address)
+        results["ms"] = (time.perf_counter() - started) * 1000
+
+    thread = threading.Thread(target=forward)
+    thread.start()
+    deadline = time.time() + 10
+    while thread.is_alive() and time.time() < deadline:
+        QApplication.processEvents()
+        time.sleep(0.001)
+    thread.join(1)
+    server.close()
+
+    state = daemon.get_state()
+    if results.get("forwarded") and state["preset"] == "csgo" and not state["shown"]:
+        print(f"[OK] 参数已转发给已有实例 ({results['ms']:.1f} ms)")
+    else:
+        print(f"[ERROR] 参数转发失败: {results}, {state}")
+        all_correct = False
+
+    daemon.overlay_window.close()
+    return all_correct
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    success1 = test_lazy_qt_import()
+    success2 = test_forward_commands()
+    success3 = test_forward_to_running_instance()
+
+    if success1 and success2 and success3:
+        print("\n[SUCCESS] 单实例测试通过！")
+    else:
+        print("\n[FAILED] 单实例测试失败！")
+
+    sys.exit(0 if (success1 and success2 and success3) else 1)
@@ -13,10 +13,11 @@ def test_size_range():
     """测试准星大小范围"""
     try:
         from config_ui_pyside6 import ConfigUI
+        from preset_storage import MemoryStorage
         from PySide6.QtWidgets import QApplication
         
         app = QApplication([])
-        main_window = ConfigUI()
+        main_window = ConfigUI(MemoryStorage())
         
         # 检查大小滑块范围
         min_size = main_window.size_slider.minimum()
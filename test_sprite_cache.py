@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试预渲染准星的磁盘缓存
+"""
+
+import sys
+import os
+import time
+import shutil
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication
+
+
+CONFIG = {
+    "size": 20,
+    "color": "#00FF00",
+    "shape": "hollow_cross_dot",
+    "thickness": 2,
+    "opacity": 0.8,
+    "hollow_gap": 6,
+    "position": {"x": "center", "y": "center"},
+}
+
+
+def test_round_trip(directory):
+    """测试保存后映射加载的图集和绘制的一致"""
+    from sprite_atlas_pyside6 import build_atlas
+    from sprite_cache_pyside6 import SpriteDiskCache
+
+    cache = SpriteDiskCache(directory)
+    all_correct = True
+    for name, config in [("静态", dict(CONFIG)), ("动画", dict(CONFIG, animation="rotate", animation_frames=6))]:
+        atlas = build_atlas(config, 1.5)
+        if not cache.store(atlas):
+            print(f"[ERROR] {name}图集保存失败")
+            return False
+        loaded = cache.load(atlas.key)
+        if loaded is None:
+            print(f"[ERROR] {name}图集加载失败")
+            return False
+        same = (loaded.image == atlas.image and loaded.extent == atlas.extent
+                and loaded.frame_count == atlas.frame_count and loaded.dpr == 1.5
+                and loaded.image.devicePixelRatio() == 1.5)
+        if same and loaded.mapping is not None:
+            print(f"[OK] {name}图集从映射文件加载，像素一致: {loaded.frame_count} 帧")
+        else:
+            print(f"[ERROR] {name}图集加载后不一致")
+            all_correct = False
+
+    # 损坏的文件视为没有缓存并删除
+    key = "broken@1"
+    with open(cache.path(key), "wb") as f:
+        f.write(b"not a sprite")
+    if cache.load(key) is None and not os.path.exists(cache.path(key)):
+        print("[OK] 损坏的缓存文件被丢弃")
+    else:
+        print("[ERROR] 损坏的缓存文件没有被丢弃")
+        all_correct = False
+    return all_correct
+
+
+def test_manager_uses_disk(directory):
+    """测试新的管理器（模拟冷启动）从磁盘映射图集，预设修改后重新绘制"""
+    from sprite_atlas_pyside6 import AtlasManager, sprite_key
+    from sprite_cache_pyside6 import SpriteDiskCache
+
+    class RecordingDiskCache(SpriteDiskCache):
+        """记录写入磁盘时所在的线程"""
+        threads = []
+
+        def store(self, atlas):
+            self.threads.append(threading.current_thread())
+            return super().store(atlas)
+
+    first = AtlasManager(disk_cache=RecordingDiskCache(directory))
+    started = time.perf_counter()
+    built = first.sprite(CONFIG)
+    build_ms = (time.perf_counter() - started) * 1000
+    first.thread_pool.waitForDone()
+    all_correct = True
+    if RecordingDiskCache.threads and threading.main_thread() not in RecordingDiskCache.threads:
+        print("[OK] 静态图集在后台线程中写入磁盘")
+    else:
+        print(f"[ERROR] 静态图集在 GUI 线程中写入磁盘: {RecordingDiskCache.threads}")
+        all_correct = False
+
+    cold = AtlasManager(disk_cache=SpriteDiskCache(directory))
+    started = time.perf_counter()
+    loaded = cold.sprite(CONFIG)
+    load_ms = (time.perf_counter() - started) * 1000
+    if cold.disk_cache.hits == 1 and loaded.image == built.image:
+        print(f"[OK] 冷启动从磁盘映射图集: {load_ms:.2f} ms（绘制 {build_ms:.2f} ms）")
+    else:
+        print(f"[ERROR] 冷启动没有使用磁盘缓存: hits={cold.disk_cache.hits}")
+        all_correct = False
+
+    # 预设修改后外观哈希不同，不会读到旧的图集
+    changed = dict(CONFIG, color="#FF00FF")
+    atlas = cold.sprite(changed)
+    cold.thread_pool.waitForDone()
+    if cold.disk_cache.misses == 1 and atlas.key == sprite_key(changed) and atlas.image != built.image:
+        print("[OK] 预设修改后重新绘制并缓存")
+    else:
+        print(f"[ERROR] 预设修改后缓存失效错误: misses={cold.disk_cache.misses}")
+        all_correct = False
+    if os.path.exists(cold.disk_cache.path(atlas.key)):
+        print("[OK] 新图集写入磁盘")
+    else:
+        print("[ERROR] 新图集没有写入磁盘")
+        all_correct = False
+    return all_correct
+
+
+def test_prune(directory):
+    """测试文件数超过上限时删除最久未使用的文件"""
+    from sprite_atlas_pyside6 import build_atlas
+    from sprite_cache_pyside6 import SpriteDiskCache, SUFFIX
+
+    cache = SpriteDiskCache(directory, max_files=3)
+    keys = []
+    for index, size in enumerate(range(10, 15)):
+        atlas = build_atlas(dict(CONFIG, size=size))
+        cache.store(atlas)
+        os.utime(cache.path(atlas.key), (index, index))
+        keys.append(atlas.key)
+    cache.prune()
+    remaining = sorted(name[:-len(SUFFIX)] for name in os.listdir(directory) if name.endswith(SUFFIX))
+    if remaining == sorted(keys[-3:]):
+        print("[OK] 超出上限时删除最久未使用的文件")
+        return True
+    print(f"[ERROR] 淘汰结果错误: {remaining}")
+    return False
+
+
+def test_failed_store(directory):
+    """测试保存失败时不留下临时文件"""
+    from sprite_atlas_pyside6 import build_atlas
+    from sprite_cache_pyside6 import SpriteDiskCache
+
+    cache = SpriteDiskCache(directory)
+    atlas = build_atlas(CONFIG)
+    # 目标位置是非空文件夹，改名会失败
+    os.makedirs(os.path.join(cache.path(atlas.key), "busy"))
+    stored = cache.store(atlas)
+    leftovers = [name for name in os.listdir(directory) if name.endswith(".tmp")]
+    if not stored and not leftovers:
+        print("[OK] 保存失败时删除临时文件")
+        return True
+    print(f"[ERROR] 保存失败后留下临时文件: stored={stored}, {leftovers}")
+    return False
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    directories = [tempfile.mkdtemp(prefix="crosshair-sprites-") for _ in range(4)]
+    try:
+        success1 = test_round_trip(directories[0])
+        success2 = test_manager_uses_disk(directories[1])
+        success3 = test_prune(directories[2])
+        success4 = test_failed_store(directories[3])
+    finally:
+        import gc
+        gc.collect()
+        for directory in directories:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    if success1 and success2 and success3 and success4:
+        print("\n[SUCCESS] 准星磁盘缓存测试通过！")
+    else:
+        print("\n[FAILED] 准星磁盘缓存测试失败！")
+
+    sys.exit(0 if (success1 and success2 and success3 and success4) else 1)
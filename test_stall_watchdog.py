@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试事件循环卡顿检测
+"""
+
+import sys
+import os
+import json
+import time
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer, QEventLoop
+
+
+def run_event_loop(ms):
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def slow_handler():
+    """模拟阻塞事件循环的处理函数（例如同步读写磁盘）"""
+    time.sleep(0.3)
+
+
+def test_opt_in():
+    """测试卡顿检测默认关闭，只在指定阈值时启用"""
+    from crosshair_pyside6 import parse_args
+
+    default = parse_args([]).stall_threshold
+    enabled = parse_args(["--stall-threshold", "250"]).stall_threshold
+    if not default and enabled == 250:
+        print("[OK] 卡顿检测默认关闭，--stall-threshold 250 时启用")
+        return True
+    print(f"[ERROR] 卡顿检测默认值错误: {default}, {enabled}")
+    return False
+
+
+def test_stall_capture():
+    """测试卡顿时记录 GUI 线程的调用栈"""
+    import stall_watchdog_pyside6
+
+    watchdog = stall_watchdog_pyside6.install(threshold_ms=80)
+    all_correct = True
+
+    # 空闲的事件循环不算卡顿
+    run_event_loop(500)
+    if watchdog.stall_count == 0:
+        print("[OK] 空闲时没有卡顿记录")
+    else:
+        print(f"[ERROR] 空闲时记录了卡顿: {watchdog.dump()}")
+        all_correct = False
+
+    # 短暂的忙碌不算卡顿
+    QTimer.singleShot(0, lambda: time.sleep(0.02))
+    run_event_loop(200)
+    if watchdog.stall_count == 0:
+        print("[OK] 短于阈值的忙碌不记录")
+    else:
+        print(f"[ERROR] 短于阈值的忙碌被记录: {watchdog.dump()}")
+        all_correct = False
+
+    QTimer.singleShot(0, slow_handler)
+    run_event_loop(200)
+    records = watchdog.dump()
+    if len(records) == 1 and any("slow_handler" in line for line in records[0]["stack"]):
+        print(f"[OK] 记录了卡顿位置: {records[0]['stack'][-2:]}")
+    else:
+        print(f"[ERROR] 卡顿记录错误: {records}")
+        return False
+
+    duration = records[0]["duration_ms"]
+    if duration is not None and 250 <= duration < 1000 and records[0]["blocked_ms"] <= duration:
+        print(f"[OK] 卡顿总时长: {duration} ms")
+    else:
+        print(f"[ERROR] 卡顿总时长错误: {records[0]}")
+        all_correct = False
+
+    path = watchdog.write_report(tempfile.gettempdir())
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    os.remove(path)
+    if report["stall_count"] == 1 and report["records"] == records:
+        print("[OK] 导出卡顿记录")
+    else:
+        print(f"[ERROR] 导出的卡顿记录错误: {report}")
+        all_correct = False
+    return all_correct
+
+
+def test_ipc_dump():
+    """测试通过控制协议导出卡顿记录"""
+    from control_server_pyside6 import ControlServer
+
+    server = ControlServer(None, name="unused")
+    ok, payload = server.dispatch("stalls", [])
+    if ok and payload["stall_count"] >= 1 and payload["records"]:
+        print("[OK] stalls 命令返回卡顿记录")
+        return True
+    print(f"[ERROR] stalls 命令返回错误: {ok}, {payload}")
+    return False
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    success1 = test_opt_in() and test_stall_capture()
+    success2 = test_ipc_dump()
+
+    import stall_watchdog_pyside6
+    stall_watchdog_pyside6.uninstall()
+
+    if success1 and success2:
+        print("\n[SUCCESS] 卡顿检测测试通过！")
+    else:
+        print("\n[FAILED] 卡顿检测测试失败！")
+
+    sys.exit(0 if (success1 and success2) else 1)
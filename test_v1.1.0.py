@@ -17,10 +17,11 @@ def test_version_number():
     
     try:
         from config_ui_pyside6 import ConfigUI
+        from preset_storage import MemoryStorage
         from PySide6.QtWidgets import QApplication
         
         app = QApplication(sys.argv)
-        main_window = ConfigUI()
+        main_window = ConfigUI(MemoryStorage())
         
         title = main_window.windowTitle()
         print(f"窗口标题: {title}")
@@ -90,12 +91,13 @@ def test_ui_drag_controls():
     
     try:
         from config_ui_pyside6 import ConfigUI
+        from preset_storage import MemoryStorage
         from PySide6.QtWidgets import QApplication
         
         app = QApplication.instance()
         if app is None:
             app = QApplication(sys.argv)
-        main_window = ConfigUI()
+        main_window = ConfigUI(MemoryStorage())
         
         # 检查拖动相关UI元素
         ui_elements_to_check = [